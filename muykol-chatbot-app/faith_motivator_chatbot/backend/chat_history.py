@@ -0,0 +1,75 @@
+"""Cursors and the message shape of the ``/chat/history`` API.
+
+History is read from FaithChatbot-ChatMessages by
+``ChatMessageRepository.history_page`` (newest-first pages through the
+``TimestampIndex`` LSI, ``session_id`` + ``timestamp``, so each request costs
+one bounded query regardless of how long the conversation is) and
+``history_after`` (messages newer than a client's high-water mark,
+oldest-first).
+
+Cursors are opaque, URL-safe encodings of a message's index key, and only
+the server issues them: every message carries its own ``cursor``, and every
+page carries ``next_cursor`` (the oldest message returned, while older ones
+exist) and ``prev_cursor`` (the newest message returned). Clients send them
+back unchanged.
+"""
+
+import base64
+import json
+from typing import Any, Dict, Optional
+
+TIMESTAMP_INDEX = "TimestampIndex"
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+_CURSOR_FIELDS = ("session_id", "message_id", "timestamp")
+
+
+def encode_cursor(session_id: str, message_id: str, timestamp: str) -> str:
+    """Encode the index key of a message into an opaque page cursor."""
+    raw = json.dumps(
+        {"session_id": session_id, "message_id": message_id, "timestamp": timestamp},
+        separators=(",", ":"),
+    )
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Dict[str, str]:
+    """Decode a page cursor back into a DynamoDB ``ExclusiveStartKey``.
+
+    Raises:
+        ValueError: If the cursor is malformed.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        key = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError) as e:
+        raise ValueError("Invalid history cursor") from e
+
+    if not isinstance(key, dict) or not all(
+        isinstance(key.get(field), str) for field in _CURSOR_FIELDS
+    ):
+        raise ValueError("Invalid history cursor")
+    return {field: key[field] for field in _CURSOR_FIELDS}
+
+
+def clamp_page_size(limit: Optional[int]) -> int:
+    """Bound a client-requested page size."""
+    if not limit or limit < 1:
+        return DEFAULT_PAGE_SIZE
+    return min(limit, MAX_PAGE_SIZE)
+
+
+def item_to_api_message(item: Dict[str, Any]) -> Dict[str, Any]:
+    """Map a ChatMessages item to the ``/chat/history`` message shape."""
+    cursor = encode_cursor(item["session_id"], item["message_id"], item["timestamp"])
+    return {
+        "id": item["message_id"],
+        "cursor": cursor,
+        "content": item["content"],
+        "role": item["role"],
+        "timestamp": item["timestamp"],
+        "emotion_classification": item.get("emotion_classification"),
+        "biblical_references": item.get("biblical_references", []),
+    }
@@ -0,0 +1,548 @@
+"""Concurrent chat-turn pipeline with per-stage deadlines.
+
+A chat turn needs several independent inputs before (or alongside)
+generation. ``ChatPipeline.run`` fans them out on one event loop instead
+of running them back to back:
+
+1. ``crisis``: the crisis check (``backend.crisis``) runs first, inline.
+   It takes microseconds, and a match answers the turn at once, so no
+   other work is started for it.
+2. ``classification``, ``session`` (the ConversationSessions summary) and
+   ``history`` (the newest ChatMessages) start together. ``retrieval``
+   starts as soon as classification resolves, since verses are filtered
+   by emotion.
+3. ``generation`` starts as soon as classification resolves. If a
+   context stage is still running, the call is speculative: it uses
+   whatever context has already arrived, and if the session or history
+   stage then brings context its prompt lacked, its reply is discarded
+   and generation restarts with the full prompt. Otherwise (context that
+   never came, or stages that missed their deadline) the speculative
+   reply is used and the turn saves the time those stages took.
+
+   A discarded call still runs to completion and holds a generation slot
+   and its tokens meanwhile, so the pipeline only speculates while
+   ``can_speculate()`` says there is spare generation capacity; under
+   load it waits for the context and generates once. Speculative calls
+   are flagged to ``generate`` so their replies are never cached.
+
+4. Once the reply is ready, the turn is saved in the background: both
+   messages go to ChatMessages, ConversationSessions counts them, and
+   when ``RollingSummarizer.should_fold`` says so the older turns are
+   folded into the session summary (``save_summary``, conditional on the
+   count read). The reply does not wait for any of this.
+
+Every stage has its own deadline. An optional stage that errors or
+misses it falls back (no emotion, default verses, no context) rather than
+failing the turn; only generation errors reach the caller. Each turn
+returns a per-stage timing breakdown (start offset, duration, outcome),
+and stage durations are recorded in ``chat_stage_seconds``.
+
+Stages are callables supplied by the app. Session context is read and
+written through the async repositories (``backend.repositories``) when the
+app passes them. ``BackgroundLoop`` lets threaded request handlers run
+pipelines on one shared event loop.
+
+A blocking stage cannot be stopped once its thread starts: at the deadline
+the turn stops waiting, but the call runs on and keeps its thread. So each
+blocking stage with a deadline (classification, retrieval) gets its own
+pool of ``CHAT_STAGE_WORKERS`` threads. Stuck calls can exhaust only their
+own stage's pool, where later calls queue, miss the deadline and fall back
+without ever starting; generation and the saves keep the shared pool.
+"""
+
+import asyncio
+import logging
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from faith_motivator_chatbot.backend.crisis import CrisisMatch, detect_crisis
+from faith_motivator_chatbot.backend.metrics import (
+    LATENCY_BUCKETS,
+    METRICS,
+    describe_counter,
+    describe_histogram,
+)
+from faith_motivator_chatbot.backend.session_summary import (
+    MESSAGES_PER_TURN,
+    SYSTEM_PROMPT,
+    RollingSummarizer,
+    SessionSummary,
+)
+
+logger = logging.getLogger(__name__)
+
+# Per-stage deadlines in seconds; a stage that misses its deadline falls back
+CHAT_CLASSIFICATION_DEADLINE = float(
+    os.getenv("CHAT_CLASSIFICATION_DEADLINE", 0.1)
+)
+CHAT_RETRIEVAL_DEADLINE = float(os.getenv("CHAT_RETRIEVAL_DEADLINE", 0.25))
+CHAT_SESSION_DEADLINE = float(os.getenv("CHAT_SESSION_DEADLINE", 0.3))
+CHAT_HISTORY_DEADLINE = float(os.getenv("CHAT_HISTORY_DEADLINE", 0.3))
+
+# Threads shared by generation calls and turn saves
+CHAT_PIPELINE_WORKERS = int(os.getenv("CHAT_PIPELINE_WORKERS", 32))
+
+# Threads of each blocking stage with a deadline (classification, retrieval)
+CHAT_STAGE_WORKERS = int(os.getenv("CHAT_STAGE_WORKERS", 8))
+
+STAGE_METRIC = "chat_stage_seconds"
+SPECULATION_METRIC = "chat_speculative_generations_total"
+describe_histogram(
+    STAGE_METRIC, "Chat pipeline stage duration in seconds.", LATENCY_BUCKETS
+)
+describe_counter(
+    SPECULATION_METRIC,
+    "Turns with session context, by speculative generation outcome"
+    " (used, discarded, skipped, not_needed).",
+)
+
+
+class StageTimings:
+    """Start offset, duration and outcome of each stage of one turn."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.stages: Dict[str, Dict[str, Any]] = {}
+
+    def record(self, name: str, started: float, status: str):
+        duration = time.perf_counter() - started
+        self.stages[name] = {
+            "status": status,
+            "start_ms": round((started - self.started) * 1000, 3),
+            "duration_ms": round(duration * 1000, 3),
+        }
+        METRICS.observe(STAGE_METRIC, duration, f'stage="{name}"')
+
+    def skip(self, name: str):
+        self.stages[name] = {
+            "status": "skipped",
+            "start_ms": None,
+            "duration_ms": 0.0,
+        }
+
+    def as_dict(self) -> Dict[str, Any]:
+        total = time.perf_counter() - self.started
+        return {"stages": self.stages, "total_ms": round(total * 1000, 3)}
+
+
+class ChatTurn:
+    """Everything the pipeline produced for one message."""
+
+    __slots__ = (
+        "crisis",
+        "emotion",
+        "verses",
+        "reply",
+        "cached",
+        "speculation",
+        "timings",
+        "saved",
+    )
+
+    def __init__(
+        self,
+        timings: StageTimings,
+        crisis: Optional[CrisisMatch] = None,
+        emotion: Optional[str] = None,
+        verses: Sequence[Dict[str, Any]] = (),
+        reply: Optional[str] = None,
+        cached: bool = False,
+        speculation: Optional[str] = None,
+    ):
+        self.timings = timings
+        self.crisis = crisis
+        self.emotion = emotion
+        self.verses = list(verses)
+        self.reply = reply
+        self.cached = cached
+        self.speculation = speculation
+        # Background task saving the turn, when session context is stored
+        self.saved: Optional[asyncio.Future] = None
+
+
+class ChatPipeline:
+    """Runs the stages of a chat turn concurrently.
+
+    ``classify(message) -> emotion or None`` and ``retrieve(message,
+    emotion) -> verses`` prepare the turn; ``generate(message, emotion,
+    prompt, personalized, speculative) -> (reply, cached)`` produces the
+    reply text. The session and history stages, and saving the turn, run
+    only when ``repositories`` (``backend.repositories.Repositories``) are
+    given. ``can_speculate() -> bool`` gates speculative generation.
+    """
+
+    def __init__(
+        self,
+        classify: Callable[[str], Optional[str]],
+        retrieve: Callable[[str, Optional[str]], List[Dict[str, Any]]],
+        generate: Callable[[str, Optional[str], str, bool, bool], Tuple[str, bool]],
+        default_verses: Sequence[Dict[str, Any]] = (),
+        repositories=None,
+        summarizer: Optional[RollingSummarizer] = None,
+        deadlines: Optional[Dict[str, float]] = None,
+        can_speculate: Callable[[], bool] = lambda: True,
+    ):
+        self.classify = classify
+        self.retrieve = retrieve
+        self.generate = generate
+        self.default_verses = list(default_verses)
+        self.repositories = repositories
+        self.summarizer = summarizer or RollingSummarizer()
+        self.deadlines = {
+            "classification": CHAT_CLASSIFICATION_DEADLINE,
+            "retrieval": CHAT_RETRIEVAL_DEADLINE,
+            "session": CHAT_SESSION_DEADLINE,
+            "history": CHAT_HISTORY_DEADLINE,
+        }
+        self.deadlines.update(deadlines or {})
+        self.can_speculate = can_speculate
+        # Strong references, so pending saves are not garbage collected
+        self._saving = set()
+        # One bounded pool per blocking stage, created on first use
+        self._executors: Dict[str, ThreadPoolExecutor] = {}
+
+    async def run(
+        self,
+        message: str,
+        session_id: Optional[str] = None,
+        personalized: bool = False,
+    ) -> ChatTurn:
+        """Run one turn; raises only what ``generate`` raises."""
+        timings = StageTimings()
+        received_at = datetime.now(timezone.utc)
+        started = time.perf_counter()
+        crisis = detect_crisis(message)
+        timings.record("crisis", started, "matched" if crisis else "ok")
+        if crisis is not None:
+            for name in (
+                "classification",
+                "session",
+                "history",
+                "retrieval",
+                "generation",
+            ):
+                timings.skip(name)
+            return ChatTurn(timings, crisis=crisis)
+
+        classification = asyncio.ensure_future(
+            self._stage(
+                timings, "classification", self.classify, message, fallback=None
+            )
+        )
+        session_task = history_task = None
+        stored = bool(session_id) and self.repositories is not None
+        if stored:
+            session_task = asyncio.ensure_future(
+                self._stage(
+                    timings, "session", self._load_session, session_id, fallback=None
+                )
+            )
+        else:
+            timings.skip("session")
+        if stored:
+            history_task = asyncio.ensure_future(
+                self._stage(
+                    timings, "history", self._load_history, session_id, fallback=[]
+                )
+            )
+        else:
+            timings.skip("history")
+
+        emotion = await classification
+        speculation = None
+        retrieval = asyncio.ensure_future(
+            self._stage(
+                timings, "retrieval", self.retrieve, message, emotion, fallback=None
+            )
+        )
+
+        context_tasks = [
+            task for task in (session_task, history_task) if task is not None
+        ]
+        pending = [task for task in context_tasks if not task.done()]
+        if pending and self.can_speculate():
+            reply, cached, speculation = await self._speculate(
+                timings,
+                message,
+                emotion,
+                personalized,
+                session_id,
+                session_task,
+                history_task,
+                pending,
+            )
+        else:
+            if pending:
+                # No spare capacity for a call that may be thrown away
+                speculation = "skipped"
+                await asyncio.wait(pending)
+            elif context_tasks:
+                speculation = "not_needed"
+            context = self._context(session_task, history_task, session_id)
+            prompt = self._prompt(message, emotion, *context)
+            reply, cached = await self._generation(
+                timings,
+                "generation",
+                message,
+                emotion,
+                prompt,
+                personalized,
+                speculative=False,
+            )
+        if speculation is not None:
+            METRICS.increment(SPECULATION_METRIC, f'result="{speculation}"')
+
+        verses = await retrieval
+        turn = ChatTurn(
+            timings,
+            emotion=emotion,
+            verses=verses or self.default_verses,
+            reply=reply,
+            cached=cached,
+            speculation=speculation,
+        )
+        if stored:
+            turn.saved = asyncio.ensure_future(
+                self.save_turn(session_id, message, received_at, turn)
+            )
+            self._saving.add(turn.saved)
+            turn.saved.add_done_callback(self._saved)
+        return turn
+
+    async def save_turn(
+        self, session_id: str, message: str, received_at: datetime, turn: ChatTurn
+    ) -> SessionSummary:
+        """Store the turn's messages, count them and fold older turns when due.
+
+        Returns the session's summary state after the update.
+        """
+        from faith_motivator_chatbot.backend.repositories import ChatMessage
+
+        messages = self.repositories.messages
+        sessions = self.repositories.sessions
+        await messages.batch_put([
+            ChatMessage(
+                session_id,
+                f"msg_{uuid.uuid4().hex}",
+                received_at.isoformat(),
+                "user",
+                message,
+                emotion_classification=turn.emotion,
+            ),
+            ChatMessage(
+                session_id,
+                f"msg_{uuid.uuid4().hex}",
+                datetime.now(timezone.utc).isoformat(),
+                "assistant",
+                turn.reply,
+                biblical_references=[verse["reference"] for verse in turn.verses],
+            ),
+        ])
+        counted = await sessions.add_messages(session_id, MESSAGES_PER_TURN)
+        session = counted.to_session_summary()
+        if not self.summarizer.should_fold(session):
+            return session
+
+        # Bounded by the fold policy, so this is a single history page
+        page = await messages.history_page(session_id, limit=session.pending_count)
+        # A model summarizer blocks on a generation call
+        folded = await asyncio.get_running_loop().run_in_executor(
+            None, self.summarizer.fold, session, page["messages"]
+        )
+        if not await sessions.save_summary(folded, session.summarized_count):
+            # Another turn folded these messages first; its summary stands
+            return session
+        return folded
+
+    def _saved(self, task: asyncio.Future):
+        self._saving.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning("Saving chat turn failed: %s", task.exception())
+
+    async def _speculate(
+        self,
+        timings,
+        message,
+        emotion,
+        personalized,
+        session_id,
+        session_task,
+        history_task,
+        pending,
+    ):
+        """Generate with the context so far while ``pending`` stages finish.
+
+        Generation restarts when those stages add context.
+        """
+        context = self._context(session_task, history_task, session_id)
+        speculative_prompt = self._prompt(message, emotion, *context)
+        speculated_at = time.perf_counter()
+        speculative = asyncio.ensure_future(
+            self._generation(
+                timings,
+                "generation",
+                message,
+                emotion,
+                speculative_prompt,
+                personalized,
+                speculative=True,
+            )
+        )
+        await asyncio.wait(pending)
+        context = self._context(session_task, history_task, session_id)
+        prompt = self._prompt(message, emotion, *context)
+        if prompt == speculative_prompt:
+            reply, cached = await speculative
+            return reply, cached, "used"
+
+        if speculative.done():
+            # Retrieve (and drop) its outcome, even an error
+            speculative.exception()
+        else:
+            # The call's thread finishes on its own; its reply is ignored
+            speculative.cancel()
+        timings.stages.pop("generation", None)
+        timings.record("speculative_generation", speculated_at, "discarded")
+        reply, cached = await self._generation(
+            timings,
+            "generation",
+            message,
+            emotion,
+            prompt,
+            personalized,
+            speculative=False,
+        )
+        return reply, cached, "discarded"
+
+    def _executor(self, name: str) -> ThreadPoolExecutor:
+        """The thread pool of blocking stage ``name``."""
+        executor = self._executors.get(name)
+        if executor is None:
+            executor = ThreadPoolExecutor(
+                max_workers=CHAT_STAGE_WORKERS, thread_name_prefix=f"chat-{name}"
+            )
+            self._executors[name] = executor
+        return executor
+
+    async def _stage(
+        self, timings: StageTimings, name: str, func, *args, fallback=None
+    ):
+        """Run a stage within its deadline, falling back on timeout or error.
+
+        Blocking stages run on the stage's own pool (see the module docstring);
+        a call still queued there at the deadline is cancelled unstarted.
+        """
+        started = time.perf_counter()
+        loop = asyncio.get_running_loop()
+        try:
+            if asyncio.iscoroutinefunction(func):
+                work = func(*args)
+            else:
+                work = loop.run_in_executor(self._executor(name), func, *args)
+            result = await asyncio.wait_for(work, self.deadlines[name])
+        except asyncio.TimeoutError:
+            timings.record(name, started, "timeout")
+            return fallback
+        except Exception as e:
+            logger.warning("Chat stage %s failed: %s", name, e)
+            timings.record(name, started, "error")
+            return fallback
+        timings.record(name, started, "ok")
+        return result
+
+    async def _generation(
+        self, timings, name, message, emotion, prompt, personalized, speculative
+    ):
+        """Generate the reply; errors propagate.
+
+        The generation client bounds its own time, so the call needs no
+        deadline or pool of its own.
+        """
+        started = time.perf_counter()
+        loop = asyncio.get_running_loop()
+        try:
+            result = await loop.run_in_executor(
+                None, self.generate, message, emotion, prompt, personalized, speculative
+            )
+        except Exception:
+            timings.record(name, started, "error")
+            raise
+        timings.record(name, started, "ok")
+        return result
+
+    async def _load_session(self, session_id: str) -> Optional[SessionSummary]:
+        session = await self.repositories.sessions.get(session_id)
+        return session.to_session_summary() if session else None
+
+    async def _load_history(self, session_id: str) -> List[Dict[str, Any]]:
+        # Enough to cover every message a summary can leave uncovered
+        limit = self.summarizer.recent_messages + self.summarizer.every_messages
+        page = await self.repositories.messages.history_page(session_id, limit=limit)
+        return page["messages"]
+
+    def _context(
+        self, session_task, history_task, session_id
+    ) -> Tuple[SessionSummary, List[Dict[str, Any]]]:
+        """The summary and uncovered messages from the context stages so far."""
+        session = None
+        if session_task is not None and session_task.done():
+            session = session_task.result()
+        history = []
+        if history_task is not None and history_task.done():
+            history = history_task.result()
+        if session is None:
+            # Without the summary state, send only the recent window
+            recent = history[-self.summarizer.recent_messages:] if history else []
+            return SessionSummary(session_id or ""), recent
+        pending = history[-session.pending_count:] if session.pending_count > 0 else []
+        return session, pending
+
+    def _prompt(
+        self,
+        message: str,
+        emotion: Optional[str],
+        session: SessionSummary,
+        pending,
+    ) -> str:
+        system = SYSTEM_PROMPT
+        if emotion:
+            system += f" The user seems to be feeling {emotion}."
+        return self.summarizer.build_prompt(session, pending, message, system=system)
+
+
+class BackgroundLoop:
+    """An event loop on a daemon thread, for running pipelines from threads.
+
+    Started on first use, so a server that forks workers after import
+    gets one loop per worker process.
+    """
+
+    def __init__(self, workers: int = CHAT_PIPELINE_WORKERS):
+        self.workers = workers
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._lock = threading.Lock()
+
+    def _start(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                loop.set_default_executor(
+                    ThreadPoolExecutor(
+                        max_workers=self.workers, thread_name_prefix="chat-stage"
+                    )
+                )
+                threading.Thread(
+                    target=loop.run_forever, name="chat-pipeline", daemon=True
+                ).start()
+                self._loop = loop
+        return self._loop
+
+    def run(self, coroutine, timeout: Optional[float] = None):
+        """Run ``coroutine`` on the loop and wait for its result."""
+        loop = self._loop or self._start()
+        return asyncio.run_coroutine_threadsafe(coroutine, loop).result(timeout)
@@ -0,0 +1,281 @@
+"""Compiled, memory-mapped store of the biblical content used in replies.
+
+``content/biblical_content.json`` is the editable source: for each emotion,
+its verses (reference, text, theme), reflections and action steps.
+``compile_content`` turns it into one binary file that is opened with
+``mmap``, so every worker process shares the same page-cache pages and
+nothing is parsed or copied at load time.
+
+The compiled file is a build artifact, written to ``CONTENT_STORE_PATH``
+(by default under the user cache directory, never into the installed
+package). Deploys build it ahead of time with ``scripts/seed_database.py``
+or ``python -m faith_motivator_chatbot.backend.content_store``; a process
+that finds it missing or older than the source compiles it once as a
+fallback.
+
+File layout (little-endian)::
+
+    header    magic, version, record/key counts, section offsets
+    records   fixed-size (kind, text, reference, theme) string slices
+    keys      fixed-size (key slice, postings start, postings count)
+    postings  uint32 record ids, grouped per key
+    strings   UTF-8 string pool (repeated strings stored once)
+
+The inverted index has one key per ``emotion:<name>:<kind>`` and per
+``theme:<name>:verse``. Opening the store reads only the small key table
+into a dict, so a lookup is a dict hit plus a slice of postings; strings
+are decoded straight from the mapped pages when a record is returned.
+"""
+
+import json
+import logging
+import mmap
+import os
+import struct
+import sys
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_CONTENT_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "content")
+_CACHE_HOME = os.getenv("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+_CACHE_DIR = os.path.join(_CACHE_HOME, "faith_motivator_chatbot")
+
+# Editable source of the biblical content
+CONTENT_SOURCE_PATH = os.getenv("CONTENT_SOURCE_PATH", os.path.join(_CONTENT_DIR, "biblical_content.json"))
+
+# Compiled store, built at deploy time (outside the package directory)
+CONTENT_STORE_PATH = os.getenv(
+    "CONTENT_STORE_PATH", os.path.join(_CACHE_DIR, "biblical_content.fmcs")
+)
+
+MAGIC = b"FMCS"
+VERSION = 1
+
+VERSE, REFLECTION, ACTION_STEP = 0, 1, 2
+KIND_NAMES = {VERSE: "verse", REFLECTION: "reflection", ACTION_STEP: "action_step"}
+
+_HEADER = struct.Struct("<4sHHIIIIII")
+# kind, then (offset, length) of text, reference and theme
+_RECORD = struct.Struct("<B3xIIIIII")
+# (offset, length) of the key, then postings start and count
+_KEY = struct.Struct("<IIII")
+
+
+class ContentStoreError(Exception):
+    """The compiled content file is missing, corrupt or from another version."""
+
+
+class _StringPool:
+    """Accumulates UTF-8 strings, storing each distinct string once."""
+
+    def __init__(self):
+        self.data = bytearray()
+        self._offsets: Dict[str, Tuple[int, int]] = {}
+
+    def add(self, value: str) -> Tuple[int, int]:
+        if value not in self._offsets:
+            encoded = value.encode("utf-8")
+            self._offsets[value] = (len(self.data), len(encoded))
+            self.data += encoded
+        return self._offsets[value]
+
+
+def compile_content(source: Dict[str, Dict[str, Any]], path: str = CONTENT_STORE_PATH):
+    """Serialise ``emotion -> {verses, reflections, action_steps}`` to ``path``.
+
+    The file is written to a temporary name and renamed into place, so
+    processes that already mapped the old file keep a consistent view.
+    Missing parent directories are created.
+    """
+    pool = _StringPool()
+    records: List[bytes] = []
+    index: Dict[str, List[int]] = {}
+
+    def add(kind: int, text: str, reference: str = "", theme: str = "") -> int:
+        records.append(_RECORD.pack(kind, *pool.add(text), *pool.add(reference), *pool.add(theme)))
+        return len(records) - 1
+
+    for emotion in sorted(source):
+        entry = source[emotion]
+        for verse in entry.get("verses", []):
+            record = add(VERSE, verse["text"], verse["reference"], verse.get("theme", ""))
+            index.setdefault(f"emotion:{emotion}:verse", []).append(record)
+            if verse.get("theme"):
+                index.setdefault(f"theme:{verse['theme']}:verse", []).append(record)
+        for kind, field in ((REFLECTION, "reflections"), (ACTION_STEP, "action_steps")):
+            for text in entry.get(field, []):
+                index.setdefault(f"emotion:{emotion}:{KIND_NAMES[kind]}", []).append(add(kind, text))
+
+    keys: List[bytes] = []
+    postings: List[int] = []
+    for key in sorted(index):
+        keys.append(_KEY.pack(*pool.add(key), len(postings), len(index[key])))
+        postings.extend(index[key])
+
+    records_offset = _HEADER.size
+    keys_offset = records_offset + _RECORD.size * len(records)
+    postings_offset = keys_offset + _KEY.size * len(keys)
+    strings_offset = postings_offset + 4 * len(postings)
+    header = _HEADER.pack(
+        MAGIC, VERSION, 0, len(records), len(keys),
+        records_offset, keys_offset, postings_offset, strings_offset,
+    )
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with open(temp_path, "wb") as handle:
+        handle.write(header)
+        handle.write(b"".join(records))
+        handle.write(b"".join(keys))
+        handle.write(struct.pack(f"<{len(postings)}I", *postings))
+        handle.write(pool.data)
+    os.replace(temp_path, path)
+
+
+class ContentStore:
+    """Read-only view of a compiled content file."""
+
+    def __init__(self, path: str = CONTENT_STORE_PATH):
+        try:
+            with open(path, "rb") as handle:
+                self._mmap = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError) as e:
+            raise ContentStoreError(f"Cannot open content store {path}: {e}")
+        self.path = path
+        self._view = memoryview(self._mmap)
+
+        if len(self._view) < _HEADER.size:
+            raise ContentStoreError(f"{path} is not a content store")
+        (magic, version, _, self._record_count, key_count, self._records_offset,
+         keys_offset, postings_offset, self._strings_offset) = _HEADER.unpack_from(self._view)
+        if magic != MAGIC or version != VERSION:
+            raise ContentStoreError(f"{path} is not a version {VERSION} content store")
+
+        postings = self._view[postings_offset:self._strings_offset]
+        # The file is little-endian; decode postings in place only on matching hosts
+        self._postings = postings.cast("I") if sys.byteorder == "little" else None
+        self._index: Dict[str, Tuple[int, int]] = {}
+        for position in range(key_count):
+            key_offset, key_length, start, count = _KEY.unpack_from(self._view, keys_offset + position * _KEY.size)
+            self._index[self._string(key_offset, key_length)] = (start, count)
+        self._postings_offset = postings_offset
+
+    def _string(self, offset: int, length: int) -> str:
+        start = self._strings_offset + offset
+        return str(self._view[start:start + length], "utf-8")
+
+    def _record_ids(self, key: str) -> List[int]:
+        start, count = self._index.get(key, (0, 0))
+        if self._postings is not None:
+            return self._postings[start:start + count].tolist()
+        return list(struct.unpack_from(f"<{count}I", self._view, self._postings_offset + 4 * start))
+
+    def _record(self, record_id: int) -> Tuple[int, str, str, str]:
+        kind, text_offset, text_length, ref_offset, ref_length, theme_offset, theme_length = _RECORD.unpack_from(
+            self._view, self._records_offset + record_id * _RECORD.size
+        )
+        return (
+            kind,
+            self._string(text_offset, text_length),
+            self._string(ref_offset, ref_length),
+            self._string(theme_offset, theme_length),
+        )
+
+    def verses(self, emotion: Optional[str] = None, theme: Optional[str] = None) -> List[Dict[str, str]]:
+        """Verses for an emotion or a theme (both given: verses matching both)."""
+        if emotion is None and theme is None:
+            raise ValueError("Pass an emotion or a theme")
+        if emotion is not None:
+            ids = self._record_ids(f"emotion:{emotion}:verse")
+            if theme is not None:
+                themed = set(self._record_ids(f"theme:{theme}:verse"))
+                ids = [i for i in ids if i in themed]
+        else:
+            ids = self._record_ids(f"theme:{theme}:verse")
+        verses = []
+        for record_id in ids:
+            _, text, reference, verse_theme = self._record(record_id)
+            verses.append({"reference": reference, "text": text, "theme": verse_theme})
+        return verses
+
+    def reflections(self, emotion: str) -> List[str]:
+        """Reflections written for an emotion."""
+        return [self._record(i)[1] for i in self._record_ids(f"emotion:{emotion}:reflection")]
+
+    def action_steps(self, emotion: str) -> List[str]:
+        """Suggested action steps for an emotion."""
+        return [self._record(i)[1] for i in self._record_ids(f"emotion:{emotion}:action_step")]
+
+    def for_emotion(self, emotion: str) -> Dict[str, list]:
+        """Everything for an emotion, in the source file's shape."""
+        return {
+            "verses": self.verses(emotion),
+            "reflections": self.reflections(emotion),
+            "action_steps": self.action_steps(emotion),
+        }
+
+    def emotions(self) -> List[str]:
+        """Emotions that have any content."""
+        return sorted({key.split(":")[1] for key in self._index if key.startswith("emotion:")})
+
+    def themes(self) -> List[str]:
+        """Verse themes in the index."""
+        return sorted(key.split(":")[1] for key in self._index if key.startswith("theme:"))
+
+    def close(self):
+        """Release the mapping."""
+        if self._postings is not None:
+            self._postings.release()
+        self._view.release()
+        self._mmap.close()
+
+
+def load_source(path: str = CONTENT_SOURCE_PATH) -> Dict[str, Dict[str, Any]]:
+    """Read the editable JSON source."""
+    with open(path, encoding="utf-8") as handle:
+        return json.load(handle)
+
+
+def build(source_path: str = CONTENT_SOURCE_PATH, store_path: str = CONTENT_STORE_PATH):
+    """Compile the JSON source into the store file."""
+    compile_content(load_source(source_path), store_path)
+
+
+_store: Optional[ContentStore] = None
+_store_lock = threading.Lock()
+
+
+def _needs_build(source_path: str, store_path: str) -> bool:
+    """True when the store is missing or older than its source."""
+    if not os.path.exists(store_path):
+        return True
+    return os.path.exists(source_path) and (
+        os.path.getmtime(source_path) > os.path.getmtime(store_path)
+    )
+
+
+def get_content_store() -> ContentStore:
+    """The process-wide store, opened from the prebuilt file.
+
+    A store missing or older than its source is compiled first, with a
+    warning, since deploys are expected to have built it.
+    """
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                if _needs_build(CONTENT_SOURCE_PATH, CONTENT_STORE_PATH):
+                    logger.warning(
+                        "Content store %s is missing or stale; compiling it now",
+                        CONTENT_STORE_PATH,
+                    )
+                    build(CONTENT_SOURCE_PATH, CONTENT_STORE_PATH)
+                _store = ContentStore(CONTENT_STORE_PATH)
+    return _store
+
+
+if __name__ == "__main__":
+    build()
+    print(f"Compiled {CONTENT_SOURCE_PATH} -> {CONTENT_STORE_PATH}")
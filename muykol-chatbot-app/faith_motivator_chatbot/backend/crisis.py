@@ -0,0 +1,154 @@
+"""Crisis detection on every inbound chat message.
+
+A message that mentions suicide, self-harm, abuse or danger to others gets
+an immediate, fixed safety response with crisis resources. It is answered
+before emotion classification, verse retrieval or generation, so the reply
+never waits on (or fails because of) any of them.
+
+Detection is one pass of a word-level Aho-Corasick automaton compiled at
+import from ``CRISIS_PHRASES``. Messages are normalised first (Unicode
+compatibility forms, case, apostrophes, common digit/symbol letter
+substitutions, punctuation), so "I can’t go on!!" and "i cant go on"
+match the same phrase. The automaton's transitions are precomputed (no
+failure links are followed at match time), so the cost is one dict lookup
+per word: a few microseconds per message.
+
+Matches are counted in ``crisis_detections_total`` by category and every
+scan is timed in ``crisis_detection_seconds``.
+"""
+
+import re
+import time
+import unicodedata
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from faith_motivator_chatbot.backend.metrics import METRICS, describe_counter, describe_histogram
+
+# Category -> phrases that signal it (written as a user would type them)
+CRISIS_PHRASES: Dict[str, Sequence[str]] = {
+    "suicide": (
+        "suicide", "suicidal", "kill myself", "killing myself", "end my life", "ending my life",
+        "take my own life", "take my life", "want to die", "wanna die", "wish i was dead",
+        "wish i were dead", "better off dead", "better off without me", "no reason to live",
+        "dont want to live", "do not want to live", "dont want to be alive",
+        "dont want to be here anymore", "end it all", "cant go on", "going to jump",
+        "hang myself", "not worth living",
+    ),
+    "self_harm": (
+        "hurt myself", "hurting myself", "harm myself", "harming myself", "self harm",
+        "cut myself", "cutting myself", "overdose", "starve myself",
+    ),
+    "abuse": (
+        "being abused", "he hits me", "she hits me", "he beats me", "she beats me",
+        "afraid to go home", "raped", "sexually abused",
+    ),
+    "harm_to_others": (
+        "kill him", "kill her", "hurt someone", "hurt somebody",
+    ),
+}
+
+# Digit and symbol stand-ins for letters ("k1ll", "$uicide"); apostrophes are dropped
+_SUBSTITUTIONS = str.maketrans({
+    "0": "o", "1": "i", "3": "e", "4": "a", "5": "s", "7": "t", "@": "a", "$": "s",
+    "’": "", "‘": "", "'": "", "`": "",
+})
+
+_WORD = re.compile(r"[a-z]+")
+
+# Shown instead of a generated reply when a crisis phrase is detected
+CRISIS_RESPONSE = (
+    "I'm really glad you told me, and I'm so sorry you're carrying this. You matter, "
+    "and you don't have to face this alone. If you are in immediate danger, please call "
+    "your local emergency number (911 in the US) now. You can call or text 988 to reach "
+    "the Suicide & Crisis Lifeline, or text HOME to 741741 to reach the Crisis Text Line, "
+    "any time, day or night. Please reach out to someone you trust as well. "
+    "\"The LORD is close to the brokenhearted and saves those who are crushed in spirit.\" "
+    "(Psalm 34:18)"
+)
+
+DETECTIONS_METRIC = "crisis_detections_total"
+DURATION_METRIC = "crisis_detection_seconds"
+describe_counter(DETECTIONS_METRIC, "Chat messages answered with the crisis response, by category.")
+describe_histogram(
+    DURATION_METRIC,
+    "Time to scan a chat message for crisis phrases, in seconds.",
+    (0.000005, 0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.001),
+)
+
+
+def normalize(text: str) -> List[str]:
+    """Lowercase words of ``text`` with letter stand-ins and punctuation resolved."""
+    if not text.isascii():
+        text = unicodedata.normalize("NFKD", text)
+    text = text.lower().translate(_SUBSTITUTIONS)
+    return _WORD.findall(text)
+
+
+class CrisisMatch:
+    """The first crisis phrase found in a message."""
+
+    __slots__ = ("category", "phrase")
+
+    def __init__(self, category: str, phrase: str):
+        self.category = category
+        self.phrase = phrase
+
+
+class CrisisDetector:
+    """Word-level Aho-Corasick automaton over a set of phrases."""
+
+    def __init__(self, phrases: Dict[str, Sequence[str]] = CRISIS_PHRASES):
+        # Trie: state -> {word: next state}; state 0 is the root
+        goto: List[Dict[str, int]] = [{}]
+        outputs: List[Optional[Tuple[str, str]]] = [None]
+        for category, category_phrases in phrases.items():
+            for phrase in category_phrases:
+                state = 0
+                for word in normalize(phrase):
+                    if word not in goto[state]:
+                        goto.append({})
+                        outputs.append(None)
+                        goto[state][word] = len(goto) - 1
+                    state = goto[state][word]
+                if outputs[state] is None:
+                    outputs[state] = (category, phrase)
+
+        # Breadth-first: fold each state's failure transitions and outputs
+        # into it, so matching never walks failure links
+        fail = [0] * len(goto)
+        self._delta: List[Dict[str, int]] = [dict(goto[0])] + [{} for _ in goto[1:]]
+        queue = list(goto[0].values())
+        for state in queue:
+            fallback = fail[state]
+            if outputs[state] is None:
+                outputs[state] = outputs[fallback]
+            delta = dict(self._delta[fallback])
+            delta.update(goto[state])
+            self._delta[state] = delta
+            for word, child in goto[state].items():
+                fail[child] = self._delta[fallback].get(word, 0)
+                queue.append(child)
+        self._outputs = outputs
+
+    def scan(self, text: str) -> Optional[CrisisMatch]:
+        """The first crisis phrase in ``text``, or None."""
+        delta, outputs = self._delta, self._outputs
+        state = 0
+        for word in normalize(text):
+            state = delta[state].get(word, 0)
+            if outputs[state] is not None:
+                return CrisisMatch(*outputs[state])
+        return None
+
+
+DETECTOR = CrisisDetector()
+
+
+def detect_crisis(text: str) -> Optional[CrisisMatch]:
+    """Scan a message with the shared detector, recording timing and matches."""
+    started = time.perf_counter()
+    match = DETECTOR.scan(text)
+    METRICS.observe(DURATION_METRIC, time.perf_counter() - started)
+    if match is not None:
+        METRICS.increment(DETECTIONS_METRIC, f'category="{match.category}"')
+    return match
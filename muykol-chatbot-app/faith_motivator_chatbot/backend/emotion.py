@@ -0,0 +1,235 @@
+"""Local lexicon-based emotion classification, scored with NumPy.
+
+Each message is tokenised into words and adjacent word pairs; every
+token found in the lexicon contributes its weights to one or more
+emotion labels. The lexicon is compiled once into a dense
+``(vocabulary, labels)`` weight matrix, so scoring a message is a row
+gather and a sum, and scoring a batch is one weighted ``bincount`` over
+all of its tokens. There is no model download and no remote call, so
+``classify`` is cheap enough to run inline on the chat path.
+
+A token within ``NEGATION_WINDOW`` words after a negator ("not",
+"never", "don't", ...) is ignored, so "I'm not worried" does not count
+as anxiety. Messages with no label scoring at least ``MIN_SCORE`` are
+``"neutral"``.
+"""
+
+import re
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+NEUTRAL = "neutral"
+
+# Labels in score-column order; these match the labels stored on chat
+# messages and sessions (see scripts/seed_database.py)
+EMOTION_LABELS = (
+    "anxiety",
+    "sadness",
+    "fear",
+    "anger",
+    "loneliness",
+    "guilt",
+    "gratitude",
+    "joy",
+    "hope",
+)
+
+# Lowest top score that is not reported as neutral
+MIN_SCORE = 0.75
+
+# Words after a negator that it cancels
+NEGATION_WINDOW = 3
+
+NEGATORS = frozenset(
+    "not no never nothing nobody hardly don't dont doesn't doesnt didn't didnt isn't isnt "
+    "aren't arent wasn't wasnt won't wont can't cant cannot without".split()
+)
+
+# label -> {word or "word pair": weight}. Strong, unambiguous words weigh
+# 1.0; words that lean towards an emotion without naming it weigh less.
+LEXICON: Dict[str, Dict[str, float]] = {
+    "anxiety": {
+        **dict.fromkeys(
+            "anxious anxiety worried worry worrying worries nervous stressed stress stressful "
+            "overwhelmed panic panicking uneasy restless tense dread".split(),
+            1.0,
+        ),
+        **dict.fromkeys("deadline deadlines pressure overthinking uncertain unsure".split(), 0.5),
+        "can't sleep": 1.0,
+        "cant sleep": 1.0,
+        "what if": 0.5,
+    },
+    "sadness": {
+        **dict.fromkeys(
+            "sad sadness depressed depression grief grieving heartbroken miserable crying cried "
+            "tears hopeless empty devastated mourning sorrow unhappy hurting".split(),
+            1.0,
+        ),
+        **dict.fromkeys("loss lost died funeral disappointed tired broken down".split(), 0.5),
+        "give up": 1.0,
+        "passed away": 1.0,
+    },
+    "fear": {
+        **dict.fromkeys(
+            "afraid scared fear fearful frightened terrified terrifying threatened unsafe".split(),
+            1.0,
+        ),
+        **dict.fromkeys("danger dangerous diagnosis surgery nightmare".split(), 0.5),
+    },
+    "anger": {
+        **dict.fromkeys(
+            "angry anger furious mad rage resentful resentment bitter frustrated frustrating "
+            "frustration annoyed irritated hate betrayed".split(),
+            1.0,
+        ),
+        **dict.fromkeys("unfair injustice argument fight fighting".split(), 0.5),
+    },
+    "loneliness": {
+        **dict.fromkeys(
+            "lonely loneliness alone isolated isolation abandoned rejected unloved forgotten "
+            "unwanted".split(),
+            1.0,
+        ),
+        "no friends": 1.0,
+        "no one": 0.75,
+        "nobody cares": 1.0,
+    },
+    "guilt": {
+        **dict.fromkeys(
+            "guilty guilt ashamed shame regret regrets sinned sin sinful unworthy".split(),
+            1.0,
+        ),
+        **dict.fromkeys("mistake mistakes forgive forgiveness failed failure".split(), 0.5),
+        "my fault": 1.0,
+    },
+    "gratitude": {
+        **dict.fromkeys(
+            "grateful gratitude thankful thanks thank blessed blessing blessings appreciate "
+            "appreciative".split(),
+            1.0,
+        ),
+        **dict.fromkeys("answered provided provision".split(), 0.5),
+        "thank god": 1.5,
+        "praise god": 1.5,
+        "thank you": 1.0,
+    },
+    "joy": {
+        **dict.fromkeys(
+            "happy joy joyful excited rejoice rejoicing delighted glad wonderful amazing "
+            "celebrate celebrating thrilled overjoyed".split(),
+            1.0,
+        ),
+        **dict.fromkeys("good great love loving peace peaceful beautiful".split(), 0.5),
+        "good news": 1.0,
+    },
+    "hope": {
+        **dict.fromkeys(
+            "hope hoping hopeful optimistic trust trusting faith believe encouraged".split(),
+            1.0,
+        ),
+        **dict.fromkeys("future pray praying prayer better healing strength".split(), 0.5),
+        "looking forward": 1.0,
+        "getting better": 1.0,
+    },
+}
+
+_WORD = re.compile(r"[a-z]+(?:'[a-z]+)?")
+
+
+def _compile(lexicon: Dict[str, Dict[str, float]]) -> Tuple[Dict[str, int], np.ndarray]:
+    """Build the token -> row index and the ``(vocabulary, labels)`` weight matrix."""
+    vocabulary: Dict[str, int] = {}
+    for terms in lexicon.values():
+        for term in terms:
+            vocabulary.setdefault(term, len(vocabulary))
+    weights = np.zeros((len(vocabulary), len(EMOTION_LABELS)), dtype=np.float32)
+    for column, label in enumerate(EMOTION_LABELS):
+        for term, weight in lexicon[label].items():
+            weights[vocabulary[term], column] = weight
+    return vocabulary, weights
+
+
+VOCABULARY, WEIGHTS = _compile(LEXICON)
+
+
+class Classification:
+    """The emotion label of one message, with its confidence and raw scores."""
+
+    __slots__ = ("label", "confidence", "scores")
+
+    def __init__(self, label: str, confidence: float, scores: Dict[str, float]):
+        self.label = label
+        self.confidence = confidence
+        self.scores = scores
+
+    def __repr__(self):
+        return f"Classification({self.label!r}, {self.confidence:.2f})"
+
+
+def token_indices(text: str) -> List[int]:
+    """Vocabulary rows of the words and word pairs in ``text``, minus negated ones."""
+    words = _WORD.findall(text.lower().replace("\u2019", "'"))
+    indices: List[int] = []
+    negated_until = -1
+    for position, word in enumerate(words):
+        if word in NEGATORS:
+            negated_until = position + NEGATION_WINDOW
+            # A negator can still start a lexicon pair ("no one", "nobody cares")
+            if position + 1 < len(words):
+                pair = VOCABULARY.get(f"{word} {words[position + 1]}")
+                if pair is not None:
+                    indices.append(pair)
+            continue
+        if position <= negated_until:
+            continue
+        index = VOCABULARY.get(word)
+        if index is not None:
+            indices.append(index)
+        if position + 1 < len(words):
+            pair = VOCABULARY.get(f"{word} {words[position + 1]}")
+            if pair is not None:
+                indices.append(pair)
+    return indices
+
+
+def _result(scores: np.ndarray) -> Classification:
+    best = int(scores.argmax())
+    top = float(scores[best])
+    by_label = {label: float(score) for label, score in zip(EMOTION_LABELS, scores) if score > 0}
+    if top < MIN_SCORE:
+        return Classification(NEUTRAL, 0.0, by_label)
+    return Classification(EMOTION_LABELS[best], top / float(scores[scores > 0].sum()), by_label)
+
+
+def classify(text: str) -> Classification:
+    """Classify the emotion of one message."""
+    indices = token_indices(text)
+    if not indices:
+        return Classification(NEUTRAL, 0.0, {})
+    return _result(WEIGHTS[indices].sum(axis=0))
+
+
+def classify_batch(texts: Sequence[str]) -> List[Classification]:
+    """Classify many messages with one vectorised scoring pass."""
+    rows: List[int] = []
+    indices: List[int] = []
+    for row, text in enumerate(texts):
+        found = token_indices(text)
+        indices.extend(found)
+        rows.extend([row] * len(found))
+    return [_result(row_scores) for row_scores in score_matrix(rows, indices, len(texts))]
+
+
+def score_matrix(rows: Sequence[int], indices: Sequence[int], count: int) -> np.ndarray:
+    """Sum token weights into a ``(count, labels)`` score matrix.
+
+    ``rows[i]`` is the message that token ``indices[i]`` belongs to.
+    """
+    labels = len(EMOTION_LABELS)
+    if not indices:
+        return np.zeros((count, labels), dtype=np.float32)
+    contributions = WEIGHTS[np.asarray(indices)]
+    cells = np.asarray(rows)[:, None] * labels + np.arange(labels)
+    scores = np.bincount(cells.ravel(), weights=contributions.ravel(), minlength=count * labels)
+    return scores.reshape(count, labels)
@@ -0,0 +1,403 @@
+"""Concurrency-limited, rate-aware client for reply generation.
+
+Every generation call goes through one ``GenerationClient``, which keeps
+a burst of chat traffic from turning into provider throttling and long
+client-side timeouts:
+
+- at most ``GENERATION_MAX_CONCURRENCY`` calls run at once; further calls
+  wait in a FIFO queue of at most ``GENERATION_MAX_QUEUE`` (beyond that they
+  are refused at once with ``GenerationOverloaded``);
+- two token buckets pace calls to the provider's quotas, one for requests
+  per second and one for model tokens per second (estimated from the
+  prompt and ``max_tokens``, corrected with the real usage afterwards);
+- every call has a deadline covering queueing, pacing and the call
+  itself. A call that cannot finish in time fails fast with
+  ``GenerationTimeout`` rather than holding a slot;
+- provider throttling is retried once with jittered backoff if the
+  deadline allows.
+
+Backends are pluggable: ``BedrockBackend`` for Amazon Bedrock and
+``HTTPModelBackend`` for any server speaking the stand-in protocol of
+``backend.model_standin``, a local fake model with configurable latency
+used for load tests.
+"""
+
+import json
+import os
+import random
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Optional
+
+from faith_motivator_chatbot.backend.metrics import METRICS, describe_counter
+
+# "none" (built-in placeholder reply), "local" (stand-in server) or "bedrock"
+GENERATION_BACKEND = os.getenv("GENERATION_BACKEND", "none").lower()
+
+# Generation calls in flight at once
+GENERATION_MAX_CONCURRENCY = int(os.getenv("GENERATION_MAX_CONCURRENCY", 8))
+
+# Calls allowed to wait for a slot; more are refused immediately
+GENERATION_MAX_QUEUE = int(os.getenv("GENERATION_MAX_QUEUE", 64))
+
+# Provider request quota (requests per second, burst)
+GENERATION_REQUESTS_PER_SECOND = float(os.getenv("GENERATION_REQUESTS_PER_SECOND", 10))
+GENERATION_REQUEST_BURST = float(os.getenv("GENERATION_REQUEST_BURST", 20))
+
+# Provider token quota (input + output tokens per second, burst)
+GENERATION_TOKENS_PER_SECOND = float(os.getenv("GENERATION_TOKENS_PER_SECOND", 5000))
+GENERATION_TOKEN_BURST = float(os.getenv("GENERATION_TOKEN_BURST", 20000))
+
+# Seconds a call may take end to end, queueing included
+GENERATION_TIMEOUT = float(os.getenv("GENERATION_TIMEOUT", 20))
+
+# Output token limit per reply
+GENERATION_MAX_TOKENS = int(os.getenv("GENERATION_MAX_TOKENS", 400))
+
+# Stand-in model server used by the "local" backend
+GENERATION_LOCAL_URL = os.getenv("GENERATION_LOCAL_URL", "http://127.0.0.1:8100")
+
+# Bedrock model used by the "bedrock" backend
+BEDROCK_MODEL_ID = os.getenv("BEDROCK_MODEL_ID", "anthropic.claude-3-haiku-20240307-v1:0")
+
+REQUESTS_METRIC = "generation_requests_total"
+describe_counter(REQUESTS_METRIC, "Generation calls, by result.")
+
+
+class GenerationError(Exception):
+    """Base class for generation failures; ``status`` is the HTTP status to return."""
+
+    status = 502
+
+
+class GenerationOverloaded(GenerationError):
+    """Every slot is busy and the wait queue is full."""
+
+    status = 503
+
+
+class GenerationTimeout(GenerationError):
+    """The call could not finish before its deadline."""
+
+    status = 504
+
+
+class GenerationThrottled(GenerationError):
+    """The provider refused the call for exceeding its quota."""
+
+    status = 429
+
+
+class GenerationResult:
+    """Generated text and the tokens it used."""
+
+    __slots__ = ("text", "input_tokens", "output_tokens", "latency")
+
+    def __init__(self, text: str, input_tokens: int, output_tokens: int, latency: float = 0.0):
+        self.text = text
+        self.input_tokens = input_tokens
+        self.output_tokens = output_tokens
+        self.latency = latency
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (about four characters per token)."""
+    return max(1, len(text) // 4)
+
+
+class TokenBucket:
+    """Token bucket that hands out reservations instead of blocking.
+
+    ``reserve`` takes the tokens at once, letting the balance go negative,
+    and returns how long the caller must wait before using them, so
+    concurrent callers are paced in the order they reserved.
+    """
+
+    def __init__(self, rate: float, capacity: float, clock: Callable[[], float] = time.monotonic):
+        self.rate = rate
+        self.capacity = capacity
+        self._clock = clock
+        self._tokens = capacity
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = self._clock()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def reserve(self, amount: float) -> float:
+        """Take ``amount`` tokens; return the seconds to wait before using them."""
+        with self._lock:
+            self._refill()
+            self._tokens -= amount
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+    def refund(self, amount: float):
+        """Give back tokens that were reserved but not used."""
+        with self._lock:
+            self._refill()
+            self._tokens = min(self.capacity, self._tokens + amount)
+
+
+class _Waiter:
+    __slots__ = ("granted",)
+
+    def __init__(self):
+        self.granted = threading.Event()
+
+
+class ConcurrencyGate:
+    """A semaphore whose waiters are served first-in, first-out, with deadlines.
+
+    A released slot is handed directly to the oldest waiter, so a newly
+    arriving call can never overtake one that has been queueing.
+    """
+
+    def __init__(self, limit: int, max_queue: int):
+        self.limit = limit
+        self.max_queue = max_queue
+        self.active = 0
+        self._queue: Deque[_Waiter] = deque()
+        self._lock = threading.Lock()
+
+    @property
+    def queued(self) -> int:
+        return len(self._queue)
+
+    def acquire(self, deadline: float):
+        """Take a slot, waiting until ``deadline`` (a ``time.monotonic`` value).
+
+        Raises:
+            GenerationOverloaded: If the wait queue is full.
+            GenerationTimeout: If no slot freed up before the deadline.
+        """
+        with self._lock:
+            if self.active < self.limit and not self._queue:
+                self.active += 1
+                return
+            if len(self._queue) >= self.max_queue:
+                raise GenerationOverloaded("Too many replies are being generated; try again shortly")
+            waiter = _Waiter()
+            self._queue.append(waiter)
+
+        if waiter.granted.wait(max(0.0, deadline - time.monotonic())):
+            return
+        with self._lock:
+            if waiter.granted.is_set():
+                # Granted just as the wait timed out: the slot is ours
+                return
+            self._queue.remove(waiter)
+        raise GenerationTimeout("Timed out waiting for a generation slot")
+
+    def release(self):
+        """Free a slot, handing it to the oldest waiter if there is one."""
+        with self._lock:
+            if self._queue:
+                # The slot passes straight to the waiter; ``active`` is unchanged
+                self._queue.popleft().granted.set()
+            else:
+                self.active -= 1
+
+
+class GenerationBackend:
+    """A model that turns a prompt into text."""
+
+    def generate(self, prompt: str, max_tokens: int, timeout: float) -> GenerationResult:
+        """Generate a reply within ``timeout`` seconds.
+
+        Raises:
+            GenerationThrottled: If the provider rejected the call for quota.
+            GenerationError: For any other failure.
+        """
+        raise NotImplementedError
+
+
+class HTTPModelBackend(GenerationBackend):
+    """Client for the stand-in model protocol (``POST /generate``)."""
+
+    def __init__(self, url: str = GENERATION_LOCAL_URL, max_connections: int = GENERATION_MAX_CONCURRENCY):
+        import httpx
+
+        self.url = url.rstrip("/") + "/generate"
+        self._httpx = httpx
+        self._client = httpx.Client(
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+        )
+
+    def generate(self, prompt: str, max_tokens: int, timeout: float) -> GenerationResult:
+        try:
+            response = self._client.post(
+                self.url, json={"prompt": prompt, "max_tokens": max_tokens}, timeout=timeout
+            )
+        except self._httpx.TimeoutException:
+            raise GenerationTimeout("The model did not answer in time")
+        except self._httpx.HTTPError as e:
+            raise GenerationError(f"Model request failed: {e}")
+        if response.status_code == 429:
+            raise GenerationThrottled("The model is throttling requests")
+        if response.status_code != 200:
+            raise GenerationError(f"Model returned HTTP {response.status_code}")
+        data = response.json()
+        return GenerationResult(data["text"], data["input_tokens"], data["output_tokens"])
+
+    def close(self):
+        self._client.close()
+
+
+class BedrockBackend(GenerationBackend):
+    """Amazon Bedrock ``InvokeModel`` with an Anthropic messages model.
+
+    boto3 has no per-call timeout, so the client's connect and read
+    timeouts are set from ``timeout`` (``GENERATION_TIMEOUT``) instead of
+    botocore's 60 second default; a call can never outlive the generation
+    deadline by more than the time it spent queueing.
+    """
+
+    def __init__(
+        self,
+        model_id: str = BEDROCK_MODEL_ID,
+        client: Any = None,
+        max_connections: int = GENERATION_MAX_CONCURRENCY,
+        timeout: float = GENERATION_TIMEOUT,
+    ):
+        if client is None:
+            import boto3
+            from botocore.config import Config
+
+            # The generation client does its own retrying and pacing
+            client = boto3.client(
+                "bedrock-runtime",
+                config=Config(
+                    retries={"total_max_attempts": 1},
+                    max_pool_connections=max_connections,
+                    connect_timeout=timeout,
+                    read_timeout=timeout,
+                ),
+            )
+        self.model_id = model_id
+        self._client = client
+
+    def generate(self, prompt: str, max_tokens: int, timeout: float) -> GenerationResult:
+        from botocore.exceptions import BotoCoreError, ClientError
+
+        body = json.dumps({
+            "anthropic_version": "bedrock-2023-05-31",
+            "max_tokens": max_tokens,
+            "messages": [{"role": "user", "content": prompt}],
+        })
+        try:
+            response = self._client.invoke_model(modelId=self.model_id, body=body)
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") == "ThrottlingException":
+                raise GenerationThrottled("Bedrock is throttling requests")
+            raise GenerationError(f"Bedrock request failed: {e}")
+        except BotoCoreError as e:
+            raise GenerationError(f"Bedrock request failed: {e}")
+        data = json.loads(response["body"].read())
+        text = "".join(part.get("text", "") for part in data.get("content", []))
+        usage = data.get("usage", {})
+        return GenerationResult(text, usage.get("input_tokens", 0), usage.get("output_tokens", 0))
+
+
+class GenerationClient:
+    """Runs generation calls under concurrency, queue, rate and deadline limits."""
+
+    def __init__(
+        self,
+        backend: GenerationBackend,
+        max_concurrency: int = GENERATION_MAX_CONCURRENCY,
+        max_queue: int = GENERATION_MAX_QUEUE,
+        requests_per_second: float = GENERATION_REQUESTS_PER_SECOND,
+        request_burst: float = GENERATION_REQUEST_BURST,
+        tokens_per_second: float = GENERATION_TOKENS_PER_SECOND,
+        token_burst: float = GENERATION_TOKEN_BURST,
+        timeout: float = GENERATION_TIMEOUT,
+    ):
+        self.backend = backend
+        self.timeout = timeout
+        self.gate = ConcurrencyGate(max_concurrency, max_queue)
+        self.request_bucket = TokenBucket(requests_per_second, request_burst)
+        self.token_bucket = TokenBucket(tokens_per_second, token_burst)
+
+    def has_spare_capacity(self) -> bool:
+        """Whether a call started now would get a slot without queueing."""
+        return self.gate.active < self.gate.limit and not self.gate.queued
+
+    def generate(self, prompt: str, max_tokens: int = GENERATION_MAX_TOKENS, timeout: Optional[float] = None) -> GenerationResult:
+        """Generate a reply, failing fast when it cannot finish within ``timeout``.
+
+        Raises:
+            GenerationOverloaded: If too many calls are already waiting.
+            GenerationTimeout: If the deadline passes while queued, paced or running.
+            GenerationThrottled: If the provider keeps throttling.
+            GenerationError: For other backend failures.
+        """
+        started = time.monotonic()
+        deadline = started + (self.timeout if timeout is None else timeout)
+        try:
+            self.gate.acquire(deadline)
+        except GenerationError as e:
+            self._count(e)
+            raise
+        try:
+            result = self._generate_paced(prompt, max_tokens, deadline)
+        except GenerationError as e:
+            self._count(e)
+            raise
+        finally:
+            self.gate.release()
+        result.latency = time.monotonic() - started
+        METRICS.increment(REQUESTS_METRIC, 'result="ok"')
+        return result
+
+    def _generate_paced(self, prompt: str, max_tokens: int, deadline: float) -> GenerationResult:
+        estimate = estimate_tokens(prompt) + max_tokens
+        for attempt in range(2):
+            self._wait_for_quota(estimate, deadline)
+            try:
+                result = self.backend.generate(prompt, max_tokens, deadline - time.monotonic())
+            except GenerationThrottled:
+                backoff = random.uniform(0.25, 0.75) * (attempt + 1)
+                if attempt or time.monotonic() + backoff >= deadline:
+                    raise
+                time.sleep(backoff)
+                continue
+            # Settle the token estimate against what the call really used
+            used = result.input_tokens + result.output_tokens
+            if used < estimate:
+                self.token_bucket.refund(estimate - used)
+            elif used > estimate:
+                self.token_bucket.reserve(used - estimate)
+            return result
+        raise GenerationThrottled("The model is throttling requests")
+
+    def _wait_for_quota(self, tokens: int, deadline: float):
+        wait = max(self.request_bucket.reserve(1), self.token_bucket.reserve(tokens))
+        if time.monotonic() + wait >= deadline:
+            self.request_bucket.refund(1)
+            self.token_bucket.refund(tokens)
+            raise GenerationTimeout("The generation quota is exhausted until after the deadline")
+        if wait:
+            time.sleep(wait)
+
+    @staticmethod
+    def _count(error: GenerationError):
+        result = {
+            GenerationOverloaded: "overloaded",
+            GenerationTimeout: "timeout",
+            GenerationThrottled: "throttled",
+        }.get(type(error), "error")
+        METRICS.increment(REQUESTS_METRIC, f'result="{result}"')
+
+
+def make_backend(name: str = GENERATION_BACKEND) -> Optional[GenerationBackend]:
+    """The configured backend, or None for the built-in placeholder reply."""
+    if name == "none":
+        return None
+    if name == "local":
+        return HTTPModelBackend()
+    if name == "bedrock":
+        return BedrockBackend()
+    raise ValueError(f"Unknown GENERATION_BACKEND: {name}")
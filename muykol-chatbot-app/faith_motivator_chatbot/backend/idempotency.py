@@ -0,0 +1,276 @@
+"""Server-side deduplication of chat and prayer submissions.
+
+Clients send an ``Idempotency-Key`` header with every chat message and
+prayer request; the key stays the same across retries of one submission
+(double-clicks, retries after a timeout, reconnects). The API runs the
+work -- the model call, the prayer-request write and SQS publish -- once
+per key and replays the stored result for any repeat within the TTL:
+
+- a repeat arriving while the first request is still running waits for it
+  instead of starting a second invocation;
+- a repeat whose body differs from the original is rejected, so a key
+  cannot be reused for a different submission;
+- if the work fails, the key is released and the next retry runs again.
+
+Threads of one process coordinate in memory. Prefork workers (and hosts)
+do not share that memory, so a retry on a new connection can reach another
+worker; with a Redis client (the one the reply cache uses) the first worker
+claims the key there, the others wait for the result it stores, and a claim
+whose owner died lapses after ``IDEMPOTENCY_WAIT_SECONDS``. Redis errors
+fall back to the in-process cache. Keys are scoped by route so chat and
+prayer keys cannot collide.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Callable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# How long a completed result is replayed for a repeated key
+IDEMPOTENCY_TTL_SECONDS = float(os.getenv("IDEMPOTENCY_TTL_SECONDS", 24 * 60 * 60))
+
+# Most keys remembered at once; least recently used keys are dropped first
+IDEMPOTENCY_CACHE_SIZE = int(os.getenv("IDEMPOTENCY_CACHE_SIZE", 10000))
+
+# How long a repeat waits for the original request before giving up
+IDEMPOTENCY_WAIT_SECONDS = float(os.getenv("IDEMPOTENCY_WAIT_SECONDS", 60))
+
+# Seconds between checks of a key another process is still running
+IDEMPOTENCY_POLL_SECONDS = 0.05
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+MAX_KEY_LENGTH = 255
+REDIS_KEY_PREFIX = "faith:idempotency:"
+
+
+class IdempotencyError(Exception):
+    """Base class for idempotency failures; ``status`` is the HTTP status to return."""
+
+    status = 400
+
+
+class IdempotencyConflict(IdempotencyError):
+    """The key was already used for a request with a different body."""
+
+    status = 422
+
+
+class IdempotencyInProgress(IdempotencyError):
+    """The original request for the key is still running."""
+
+    status = 409
+
+
+def request_fingerprint(payload: Any) -> str:
+    """Stable hash of a JSON request body."""
+    canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+def validate_key(key: Optional[str]) -> Optional[str]:
+    """Return the stripped key, or None when absent.
+
+    Raises:
+        IdempotencyError: If the key is empty or too long.
+    """
+    if key is None:
+        return None
+    key = key.strip()
+    if not key or len(key) > MAX_KEY_LENGTH:
+        raise IdempotencyError(f"{IDEMPOTENCY_HEADER} must be 1-{MAX_KEY_LENGTH} characters")
+    return key
+
+
+class _Entry:
+    __slots__ = ("fingerprint", "done", "result", "expires_at")
+
+    def __init__(self, fingerprint: str):
+        self.fingerprint = fingerprint
+        self.done = threading.Event()
+        self.result: Any = None
+        self.expires_at: Optional[float] = None
+
+
+class IdempotencyCache:
+    """TTL + LRU store of results keyed by idempotency key.
+
+    With ``redis_client`` the key is also claimed in Redis, so processes
+    sharing it run each submission once; results must be JSON-serialisable.
+    """
+
+    def __init__(
+        self,
+        ttl: float = IDEMPOTENCY_TTL_SECONDS,
+        max_size: int = IDEMPOTENCY_CACHE_SIZE,
+        wait_timeout: float = IDEMPOTENCY_WAIT_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+        redis_client: Any = None,
+    ):
+        self.ttl = ttl
+        self.max_size = max_size
+        self.wait_timeout = wait_timeout
+        self.redis = redis_client
+        self._clock = clock
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def run(self, key: Optional[str], fingerprint: str, work: Callable[[], Any]) -> Tuple[Any, bool]:
+        """Run ``work`` once per key and return ``(result, replayed)``.
+
+        Without a key the work always runs. ``replayed`` is True when the
+        result came from an earlier request with the same key.
+
+        Raises:
+            IdempotencyConflict: If the key was used with a different body.
+            IdempotencyInProgress: If the original request did not finish
+                within ``wait_timeout``.
+        """
+        if key is None:
+            return work(), False
+
+        while True:
+            with self._lock:
+                entry = self._lookup(key)
+                if entry is None:
+                    entry = _Entry(fingerprint)
+                    self._entries[key] = entry
+                    self._evict()
+                    owner = True
+                else:
+                    owner = False
+                    if entry.fingerprint != fingerprint:
+                        raise IdempotencyConflict(
+                            f"{IDEMPOTENCY_HEADER} was already used for a different request"
+                        )
+
+            if owner:
+                return self._run_owned(key, entry, work)
+
+            if not entry.done.wait(self.wait_timeout):
+                raise IdempotencyInProgress("The original request is still being processed")
+            if entry.expires_at is not None:
+                return entry.result, True
+            # The original request failed and released the key; try again
+
+    def _run_owned(
+        self, key: str, entry: _Entry, work: Callable[[], Any]
+    ) -> Tuple[Any, bool]:
+        claim = None
+        try:
+            claim, stored = self._claim_shared(key, entry.fingerprint)
+            if stored is not None:
+                result, replayed = stored["result"], True
+            else:
+                result, replayed = work(), False
+                if claim is not None:
+                    self._store_shared(key, entry.fingerprint, result)
+        except BaseException:
+            with self._lock:
+                if self._entries.get(key) is entry:
+                    del self._entries[key]
+            entry.done.set()
+            if claim is not None:
+                self._release_shared(key, claim)
+            raise
+
+        with self._lock:
+            entry.result = result
+            entry.expires_at = self._clock() + self.ttl
+        entry.done.set()
+        return result, replayed
+
+    def _claim_shared(
+        self, key: str, fingerprint: str
+    ) -> Tuple[Optional[str], Optional[dict]]:
+        """Claim ``key`` in Redis: ``(claim, None)`` to run the work, or
+        ``(None, stored)`` to replay the result another process stored.
+
+        Without Redis, or when it fails, returns ``(None, None)`` and the
+        work runs under the in-process cache alone.
+
+        Raises:
+            IdempotencyConflict: If the key was used with a different body.
+            IdempotencyInProgress: If the owning process did not finish
+                within ``wait_timeout``.
+        """
+        if self.redis is None:
+            return None, None
+        name = REDIS_KEY_PREFIX + key
+        claim = json.dumps({"fingerprint": fingerprint, "owner": uuid.uuid4().hex})
+        deadline = time.monotonic() + self.wait_timeout
+        try:
+            while True:
+                # The claim lapses on its own if this process dies mid-request
+                lease = max(1, int(self.wait_timeout * 1000))
+                if self.redis.set(name, claim, nx=True, px=lease):
+                    return claim, None
+                raw = self.redis.get(name)
+                if raw is None:
+                    # Released or expired since the claim attempt; try again
+                    continue
+                stored = json.loads(raw)
+                if stored["fingerprint"] != fingerprint:
+                    raise IdempotencyConflict(
+                        f"{IDEMPOTENCY_HEADER} was already used for a different request"
+                    )
+                if "result" in stored:
+                    return None, stored
+                if time.monotonic() >= deadline:
+                    raise IdempotencyInProgress(
+                        "The original request is still being processed"
+                    )
+                time.sleep(IDEMPOTENCY_POLL_SECONDS)
+        except IdempotencyError:
+            raise
+        except Exception as e:
+            logger.warning("Idempotency Redis claim failed: %s", e)
+            return None, None
+
+    def _store_shared(self, key: str, fingerprint: str, result: Any):
+        try:
+            value = json.dumps({"fingerprint": fingerprint, "result": result})
+            self.redis.set(REDIS_KEY_PREFIX + key, value, ex=max(1, int(self.ttl)))
+        except Exception as e:
+            logger.warning("Idempotency Redis write failed: %s", e)
+
+    def _release_shared(self, key: str, claim: str):
+        """Drop this process's claim so the next retry runs again."""
+        name = REDIS_KEY_PREFIX + key
+        try:
+            raw = self.redis.get(name)
+            if raw is not None and raw.decode() == claim:
+                self.redis.delete(name)
+        except Exception as e:
+            logger.warning("Idempotency Redis release failed: %s", e)
+
+    def _lookup(self, key: str) -> Optional[_Entry]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry.expires_at is not None and self._clock() >= entry.expires_at:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def _evict(self):
+        while len(self._entries) > self.max_size:
+            # Drop the least recently used completed entry; requests that
+            # are still running are never dropped
+            victim = next(
+                (key for key, entry in self._entries.items() if entry.done.is_set()),
+                None,
+            )
+            if victim is None:
+                return
+            del self._entries[victim]
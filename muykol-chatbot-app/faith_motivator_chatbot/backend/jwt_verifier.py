@@ -0,0 +1,251 @@
+"""Local verification of Cognito-issued JWTs for the API tier.
+
+Tokens arrive on every chat, history and prayer call as the
+``Authorization: Bearer`` header built by ``AuthState.get_auth_headers``.
+Verification is done locally against the user pool's JWKS:
+
+- the JWKS is cached and rotated in the background, and refetched early
+  (rate-limited) when a token names a key id that is not cached yet;
+- claims of tokens that already verified are kept in an LRU keyed by the
+  SHA-256 of the token and never served past the token's ``exp``.
+
+A warm request therefore costs one hash and one dict lookup, with no
+network hop.
+"""
+
+import asyncio
+import hashlib
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+import httpx
+from jose import jwt
+from jose.exceptions import JOSEError
+
+
+class JWTVerificationError(Exception):
+    """Raised when a bearer token is missing, malformed or invalid."""
+
+
+class JWKSCache:
+    """Cached JSON Web Key Set with background rotation."""
+
+    def __init__(
+        self,
+        jwks_url: str,
+        refresh_interval: float = 3600.0,
+        min_refetch_interval: float = 30.0,
+        http_client: Optional[httpx.AsyncClient] = None,
+    ):
+        self.jwks_url = jwks_url
+        self.refresh_interval = refresh_interval
+        self.min_refetch_interval = min_refetch_interval
+        self._http_client = http_client
+        self._owns_client = http_client is None
+        self._keys: Dict[str, Dict[str, Any]] = {}
+        self._fetched_at = 0.0
+        self._lock = asyncio.Lock()
+        self._rotation_task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        """Load the key set and start background rotation."""
+        await self.refresh()
+        if self._rotation_task is None:
+            self._rotation_task = asyncio.create_task(self._rotate_forever())
+
+    async def stop(self):
+        """Stop background rotation and close the HTTP client we created."""
+        if self._rotation_task is not None:
+            self._rotation_task.cancel()
+            try:
+                await self._rotation_task
+            except asyncio.CancelledError:
+                pass
+            self._rotation_task = None
+        if self._owns_client and self._http_client is not None:
+            await self._http_client.aclose()
+            self._http_client = None
+
+    async def refresh(self):
+        """Fetch the key set now, replacing the cached keys."""
+        async with self._lock:
+            await self._fetch()
+
+    async def get_key(self, kid: str) -> Dict[str, Any]:
+        """Return the JWK for ``kid``, refetching once if it is unknown.
+
+        Raises:
+            JWTVerificationError: If no key with that id is published.
+        """
+        key = self._keys.get(kid)
+        if key is not None:
+            return key
+
+        async with self._lock:
+            key = self._keys.get(kid)
+            if key is None and time.monotonic() - self._fetched_at >= self.min_refetch_interval:
+                # Unknown kid: the pool may have rotated its signing keys
+                await self._fetch()
+                key = self._keys.get(kid)
+
+        if key is None:
+            raise JWTVerificationError("Token signed with an unknown key")
+        return key
+
+    async def _fetch(self):
+        if self._http_client is None:
+            self._http_client = httpx.AsyncClient(timeout=10.0)
+        response = await self._http_client.get(self.jwks_url)
+        response.raise_for_status()
+        keys = response.json().get("keys", [])
+        self._keys = {key["kid"]: key for key in keys if "kid" in key}
+        self._fetched_at = time.monotonic()
+
+    async def _rotate_forever(self):
+        while True:
+            await asyncio.sleep(self.refresh_interval)
+            try:
+                await self.refresh()
+            except Exception:
+                # Keep serving the previous keys; retry on the next cycle
+                pass
+
+
+class VerifiedTokenCache:
+    """LRU of verified token claims, keyed by token hash and bounded by ``exp``."""
+
+    def __init__(self, max_size: int = 10000):
+        self.max_size = max_size
+        self._entries: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, token_hash: str, now: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """Return cached claims, or None if absent or expired."""
+        entry = self._entries.get(token_hash)
+        if entry is None:
+            return None
+        expires_at, claims = entry
+        if (now if now is not None else time.time()) >= expires_at:
+            del self._entries[token_hash]
+            return None
+        self._entries.move_to_end(token_hash)
+        return claims
+
+    def put(self, token_hash: str, claims: Dict[str, Any], expires_at: float):
+        """Cache claims until ``expires_at`` (epoch seconds)."""
+        self._entries[token_hash] = (expires_at, claims)
+        self._entries.move_to_end(token_hash)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+
+class CognitoJWTVerifier:
+    """Verify Cognito access and ID tokens locally."""
+
+    def __init__(
+        self,
+        user_pool_id: str,
+        client_id: str,
+        region: str = "us-east-1",
+        issuer: Optional[str] = None,
+        jwks: Optional[JWKSCache] = None,
+        cache_size: int = 10000,
+        leeway: int = 0,
+    ):
+        self.client_id = client_id
+        self.issuer = issuer or f"https://cognito-idp.{region}.amazonaws.com/{user_pool_id}"
+        self.jwks = jwks or JWKSCache(f"{self.issuer}/.well-known/jwks.json")
+        self.cache = VerifiedTokenCache(cache_size)
+        self.leeway = leeway
+
+    @classmethod
+    def from_env(cls) -> "CognitoJWTVerifier":
+        """Build a verifier from the AWS_COGNITO_* settings.
+
+        Against LocalStack (``AWS_ENDPOINT_URL`` set) the issuer is the
+        LocalStack endpoint followed by the pool id, matching the pool
+        created by ``localstack/05-setup-cognito.sh``. ``AWS_COGNITO_ISSUER``
+        overrides the derived issuer.
+        """
+        user_pool_id = os.getenv("AWS_COGNITO_USER_POOL_ID", "")
+        issuer = os.getenv("AWS_COGNITO_ISSUER")
+        endpoint_url = os.getenv("AWS_ENDPOINT_URL")
+        if not issuer and endpoint_url:
+            issuer = f"{endpoint_url.rstrip('/')}/{user_pool_id}"
+        return cls(
+            user_pool_id=user_pool_id,
+            client_id=os.getenv("AWS_COGNITO_CLIENT_ID", ""),
+            region=os.getenv("AWS_REGION", "us-east-1"),
+            issuer=issuer,
+            cache_size=int(os.getenv("AUTH_VERIFIED_TOKEN_CACHE_SIZE", 10000)),
+        )
+
+    async def start(self):
+        """Warm the JWKS and start key rotation."""
+        await self.jwks.start()
+
+    async def stop(self):
+        """Stop key rotation."""
+        await self.jwks.stop()
+
+    async def verify_authorization_header(
+        self, authorization: Optional[str], token_use: str = "access"
+    ) -> Dict[str, Any]:
+        """Verify an ``Authorization: Bearer <token>`` header value."""
+        scheme, _, token = (authorization or "").partition(" ")
+        if scheme.lower() != "bearer" or not token:
+            raise JWTVerificationError("Missing bearer token")
+        return await self.verify(token.strip(), token_use=token_use)
+
+    async def verify(self, token: str, token_use: str = "access") -> Dict[str, Any]:
+        """Verify a token and return its claims.
+
+        Raises:
+            JWTVerificationError: If the signature, issuer, audience, expiry
+                or ``token_use`` claim do not check out.
+        """
+        token_hash = hashlib.sha256(token.encode()).hexdigest()
+        claims = self.cache.get(token_hash)
+        if claims is not None and claims.get("token_use") == token_use:
+            return claims
+
+        try:
+            header = jwt.get_unverified_header(token)
+        except JOSEError as e:
+            raise JWTVerificationError("Malformed token") from e
+
+        kid = header.get("kid")
+        if not kid:
+            raise JWTVerificationError("Token has no key id")
+        key = await self.jwks.get_key(kid)
+
+        try:
+            claims = jwt.decode(
+                token,
+                key,
+                algorithms=[key.get("alg", "RS256")],
+                issuer=self.issuer,
+                # ID tokens carry the client id in ``aud``; access tokens in
+                # ``client_id``, checked below
+                audience=self.client_id if token_use == "id" else None,
+                options={
+                    "verify_aud": token_use == "id",
+                    "verify_at_hash": False,
+                    "require_exp": True,
+                    "leeway": self.leeway,
+                },
+            )
+        except JOSEError as e:
+            raise JWTVerificationError(str(e)) from e
+
+        if claims.get("token_use") != token_use:
+            raise JWTVerificationError(f"Expected a Cognito {token_use} token")
+        if token_use == "access" and claims.get("client_id") != self.client_id:
+            raise JWTVerificationError("Token was issued to a different client")
+
+        self.cache.put(token_hash, claims, float(claims["exp"]))
+        return claims
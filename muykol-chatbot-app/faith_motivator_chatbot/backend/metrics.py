@@ -0,0 +1,325 @@
+"""In-process request metrics in the Prometheus text exposition format.
+
+Per route, the registry tracks:
+
+- ``http_requests_total`` by method and status;
+- ``http_request_duration_seconds`` latency histogram;
+- ``http_requests_in_flight`` gauge;
+- ``http_request_size_bytes`` / ``http_response_size_bytes`` histograms.
+
+Other modules count their own events with ``increment`` (for example the
+response cache's hits and misses), after naming them with
+``describe_counter``, and time their own work with ``observe`` on a
+histogram registered by ``describe_histogram``.
+
+Recording is lock-free on the hot path: every thread writes to its own
+shard (plain dicts and lists) and a scrape sums the shards. Only the first
+request on a new thread takes a lock, to register its shard.
+
+Prefork workers call ``share_via`` to publish their snapshot to a shared
+directory every ``METRICS_PUBLISH_INTERVAL`` seconds; ``collect`` merges
+every worker's file so a scrape of any worker sees the whole server.
+Snapshots of workers that have exited are folded into ``retired.json`` by
+``retire_snapshot`` so their counts are not lost.
+"""
+
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Optional, Tuple
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (64, 256, 1024, 4096, 16384, 65536, 262144, 1048576)
+
+HISTOGRAMS = {
+    "http_request_duration_seconds": ("Request latency in seconds.", LATENCY_BUCKETS),
+    "http_request_size_bytes": ("Request body size in bytes.", SIZE_BUCKETS),
+    "http_response_size_bytes": ("Response body size in bytes.", SIZE_BUCKETS),
+}
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Application counter name -> help text, see ``describe_counter``
+COUNTER_HELP: Dict[str, str] = {}
+
+# Application histogram name -> (help text, buckets), see ``describe_histogram``
+APP_HISTOGRAMS: Dict[str, Tuple[str, Tuple[float, ...]]] = {}
+
+# Seconds between snapshot publishes when metrics are shared across processes
+METRICS_PUBLISH_INTERVAL = float(os.getenv("METRICS_PUBLISH_INTERVAL", 1.0))
+
+RETIRED_SNAPSHOT = "retired.json"
+
+
+class _Shard:
+    """One thread's private counters."""
+
+    __slots__ = ("counters", "gauges", "histograms", "events")
+
+    def __init__(self):
+        # (route, method, status) -> count
+        self.counters: Dict[Tuple[str, str, str], int] = {}
+        # route -> in-flight delta (summed across shards)
+        self.gauges: Dict[str, int] = {}
+        # (metric, route or labels) -> bucket counts + [sum, count]
+        self.histograms: Dict[Tuple[str, str], List[float]] = {}
+        # "name\tlabels" -> count, for application counters
+        self.events: Dict[str, int] = {}
+
+
+class MetricsRegistry:
+    """Per-route request metrics with thread-sharded, lock-free recording."""
+
+    def __init__(self):
+        self._local = threading.local()
+        self._shards: List[_Shard] = []
+        self._lock = threading.Lock()
+        self.shared_dir: Optional[str] = None
+
+    def _shard(self) -> _Shard:
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = _Shard()
+            with self._lock:
+                self._shards.append(shard)
+            self._local.shard = shard
+        return shard
+
+    def request_started(self, route: str):
+        """Count a request as in flight."""
+        gauges = self._shard().gauges
+        gauges[route] = gauges.get(route, 0) + 1
+
+    def request_finished(
+        self,
+        route: str,
+        method: str,
+        status: int,
+        duration: float,
+        request_bytes: int = 0,
+        response_bytes: int = 0,
+    ):
+        """Record a completed request that was counted by ``request_started``."""
+        shard = self._shard()
+        shard.gauges[route] = shard.gauges.get(route, 0) - 1
+        key = (route, method, str(status))
+        shard.counters[key] = shard.counters.get(key, 0) + 1
+        self._observe(shard, "http_request_duration_seconds", route, duration)
+        self._observe(shard, "http_request_size_bytes", route, request_bytes)
+        self._observe(shard, "http_response_size_bytes", route, response_bytes)
+
+    def increment(self, name: str, labels: str = "", amount: int = 1):
+        """Add to an application counter; ``labels`` is preformatted, e.g. ``'result="hit"'``."""
+        events = self._shard().events
+        key = f"{name}\t{labels}"
+        events[key] = events.get(key, 0) + amount
+
+    def observe(self, name: str, value: float, labels: str = ""):
+        """Record a value in an application histogram; ``labels`` as for ``increment``."""
+        self._observe(self._shard(), name, labels, value)
+
+    def _observe(self, shard: _Shard, metric: str, route: str, value: float):
+        buckets = (HISTOGRAMS.get(metric) or APP_HISTOGRAMS[metric])[1]
+        series = shard.histograms.get((metric, route))
+        if series is None:
+            series = shard.histograms[(metric, route)] = [0] * (len(buckets) + 1) + [0.0, 0]
+        # Index len(buckets) is the +Inf bucket; counts are made cumulative on render
+        series[bisect_left(buckets, value)] += 1
+        series[-2] += value
+        series[-1] += 1
+
+    def snapshot(self) -> Dict:
+        """Sum every shard into a plain, JSON-serialisable dict."""
+        with self._lock:
+            shards = list(self._shards)
+        counters: Dict[str, int] = {}
+        gauges: Dict[str, int] = {}
+        histograms: Dict[str, List[float]] = {}
+        events: Dict[str, int] = {}
+        for shard in shards:
+            for key, count in list(shard.events.items()):
+                events[key] = events.get(key, 0) + count
+            # Copy before iterating: the owning thread may add keys meanwhile
+            for key, count in list(shard.counters.items()):
+                joined = "\t".join(key)
+                counters[joined] = counters.get(joined, 0) + count
+            for route, delta in list(shard.gauges.items()):
+                gauges[route] = gauges.get(route, 0) + delta
+            for (metric, route), series in list(shard.histograms.items()):
+                joined = f"{metric}\t{route}"
+                total = histograms.get(joined)
+                if total is None:
+                    histograms[joined] = list(series)
+                else:
+                    for index, value in enumerate(series):
+                        total[index] += value
+        return {"counters": counters, "gauges": gauges, "histograms": histograms, "events": events}
+
+    def share_via(self, directory: str, interval: float = METRICS_PUBLISH_INTERVAL):
+        """Publish this process's snapshot to ``directory`` every ``interval`` seconds."""
+        self.shared_dir = directory
+        self.publish()
+
+        def _publish_forever():
+            while True:
+                time.sleep(interval)
+                self.publish()
+
+        threading.Thread(target=_publish_forever, name="metrics-publisher", daemon=True).start()
+
+    def publish(self):
+        """Atomically write this process's snapshot to the shared directory."""
+        if self.shared_dir is None:
+            return
+        _write_json(_worker_path(self.shared_dir, os.getpid()), self.snapshot())
+
+    def collect(self) -> Dict:
+        """Merged snapshot of every process sharing metrics (or just this one)."""
+        own = self.snapshot()
+        if self.shared_dir is None:
+            return own
+        # This process's live numbers replace its last published file
+        skip = os.path.basename(_worker_path(self.shared_dir, os.getpid()))
+        return merge([own] + _read_snapshots(self.shared_dir, skip))
+
+    def render(self, snapshot: Optional[Dict] = None) -> str:
+        """Render a snapshot (this process's by default) as Prometheus text."""
+        return render_snapshot(snapshot if snapshot is not None else self.snapshot())
+
+
+def merge(snapshots: Iterable[Dict]) -> Dict:
+    """Combine snapshots from several processes into one."""
+    merged: Dict = {"counters": {}, "gauges": {}, "histograms": {}, "events": {}}
+    for snapshot in snapshots:
+        for kind in ("counters", "gauges", "events"):
+            target = merged[kind]
+            for key, value in snapshot.get(kind, {}).items():
+                target[key] = target.get(key, 0) + value
+        for key, series in snapshot.get("histograms", {}).items():
+            total = merged["histograms"].get(key)
+            if total is None:
+                merged["histograms"][key] = list(series)
+            else:
+                for index, value in enumerate(series):
+                    total[index] += value
+    return merged
+
+
+def describe_counter(name: str, help_text: str):
+    """Register the help text of an application counter."""
+    COUNTER_HELP[name] = help_text
+
+
+def describe_histogram(name: str, help_text: str, buckets: Tuple[float, ...]):
+    """Register an application histogram with its help text and bucket bounds."""
+    APP_HISTOGRAMS[name] = (help_text, tuple(buckets))
+
+
+def retire_snapshot(directory: str, pid: int):
+    """Fold an exited worker's last snapshot into ``retired.json``.
+
+    Its in-flight gauges are dropped, since the process is gone.
+    """
+    path = _worker_path(directory, pid)
+    snapshot = _read_json(path)
+    if snapshot is None:
+        return
+    snapshot["gauges"] = {}
+    retired_path = os.path.join(directory, RETIRED_SNAPSHOT)
+    retired = _read_json(retired_path)
+    _write_json(retired_path, merge([retired, snapshot]) if retired else snapshot)
+    os.remove(path)
+
+
+def _worker_path(directory: str, pid: int) -> str:
+    return os.path.join(directory, f"worker-{pid}.json")
+
+
+def _read_snapshots(directory: str, skip: str) -> List[Dict]:
+    snapshots = []
+    for name in os.listdir(directory):
+        if name.endswith(".json") and name != skip:
+            snapshot = _read_json(os.path.join(directory, name))
+            if snapshot is not None:
+                snapshots.append(snapshot)
+    return snapshots
+
+
+def _read_json(path: str) -> Optional[Dict]:
+    try:
+        with open(path) as handle:
+            return json.load(handle)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_json(path: str, data: Dict):
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with open(temp_path, "w") as handle:
+        json.dump(data, handle)
+    os.replace(temp_path, path)
+
+
+def render_snapshot(snapshot: Dict) -> str:
+    """Render a snapshot as Prometheus text."""
+    lines = [
+        "# HELP http_requests_total Requests handled, by route, method and status.",
+        "# TYPE http_requests_total counter",
+    ]
+    for key in sorted(snapshot["counters"]):
+        route, method, status = key.split("\t")
+        lines.append(
+            f'http_requests_total{{route="{route}",method="{method}",status="{status}"}} '
+            f'{snapshot["counters"][key]}'
+        )
+
+    lines += [
+        "# HELP http_requests_in_flight Requests currently being handled.",
+        "# TYPE http_requests_in_flight gauge",
+    ]
+    for route in sorted(snapshot["gauges"]):
+        lines.append(f'http_requests_in_flight{{route="{route}"}} {snapshot["gauges"][route]}')
+
+    for metric, (help_text, buckets) in HISTOGRAMS.items():
+        lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} histogram"]
+        for key in sorted(k for k in snapshot["histograms"] if k.startswith(f"{metric}\t")):
+            route = key.split("\t", 1)[1]
+            lines += _histogram_lines(metric, f'route="{route}"', buckets, snapshot["histograms"][key])
+
+    for metric, (help_text, buckets) in APP_HISTOGRAMS.items():
+        keys = sorted(k for k in snapshot["histograms"] if k.startswith(f"{metric}\t"))
+        if not keys:
+            continue
+        lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} histogram"]
+        for key in keys:
+            lines += _histogram_lines(metric, key.split("\t", 1)[1], buckets, snapshot["histograms"][key])
+
+    events = snapshot.get("events", {})
+    for name in sorted({key.split("\t", 1)[0] for key in events}):
+        lines += [
+            f"# HELP {name} {COUNTER_HELP.get(name, name)}",
+            f"# TYPE {name} counter",
+        ]
+        for key in sorted(k for k in events if k.startswith(f"{name}\t")):
+            labels = key.split("\t", 1)[1]
+            lines.append(f"{name}{{{labels}}} {events[key]}" if labels else f"{name} {events[key]}")
+
+    return "\n".join(lines) + "\n"
+
+
+def _histogram_lines(metric: str, labels: str, buckets, series: List[float]) -> List[str]:
+    prefix = f"{labels}," if labels else ""
+    lines = []
+    cumulative = 0
+    for bound, count in zip(list(buckets) + ["+Inf"], series):
+        cumulative += count
+        lines.append(f'{metric}_bucket{{{prefix}le="{bound}"}} {int(cumulative)}')
+    suffix = f"{{{labels}}}" if labels else ""
+    lines.append(f"{metric}_sum{suffix} {series[-2]}")
+    lines.append(f"{metric}_count{suffix} {int(series[-1])}")
+    return lines
+
+
+METRICS = MetricsRegistry()
@@ -0,0 +1,186 @@
+"""Local stand-in for the generation model, for load tests.
+
+Serves ``POST /generate`` with a JSON body ``{"prompt", "max_tokens"}``
+and answers ``{"text", "input_tokens", "output_tokens"}`` after a delay
+drawn from a configurable latency distribution, so the chat service and
+its generation client can be load-tested without a real model or quota.
+
+Latency specs (seconds): ``fixed:0.8``, ``uniform:0.2,1.5``,
+``normal:0.8,0.2`` (mean, stddev) or ``lognormal:-0.5,0.5`` (mu, sigma of
+the underlying normal, giving a long tail). With a prefill rate, longer
+prompts take proportionally longer, as with a real model. Throttling can be simulated
+with a concurrency cap (``--max-concurrency``; calls beyond it get 429)
+and a random throttle rate; failures with a random error rate.
+
+Run with ``python -m faith_motivator_chatbot.backend.model_standin``.
+"""
+
+import argparse
+import json
+import math
+import os
+import random
+import threading
+import time
+from typing import Callable
+
+from faith_motivator_chatbot.backend.serving import KeepAliveRequestHandler, RequestBodyError, make_server, serve
+
+# Latency distribution of a generation call
+STANDIN_LATENCY = os.getenv("STANDIN_LATENCY", "lognormal:-0.5,0.5")
+
+# Output tokens generated per second once the call has "started"
+STANDIN_TOKENS_PER_SECOND = float(os.getenv("STANDIN_TOKENS_PER_SECOND", 0))
+
+# Prompt tokens processed per second before output starts (0 = free)
+STANDIN_PREFILL_TOKENS_PER_SECOND = float(os.getenv("STANDIN_PREFILL_TOKENS_PER_SECOND", 0))
+
+# Concurrent calls served before answering 429 (0 = unlimited)
+STANDIN_MAX_CONCURRENCY = int(os.getenv("STANDIN_MAX_CONCURRENCY", 0))
+
+# Fraction of calls answered with 429 / 500 at random
+STANDIN_THROTTLE_RATE = float(os.getenv("STANDIN_THROTTLE_RATE", 0))
+STANDIN_ERROR_RATE = float(os.getenv("STANDIN_ERROR_RATE", 0))
+
+# Largest prompt accepted; long unsummarised histories can be big
+MAX_PROMPT_BYTES = 4 * 1024 * 1024
+
+REPLY_WORDS = (
+    "You are not alone in this. God is near to you, and His peace can hold "
+    "your heart today. Take one small step and let Him carry the rest."
+).split()
+
+
+def parse_latency(spec: str, rng: random.Random = random) -> Callable[[], float]:
+    """A sampler of delays (seconds) for a latency ``spec``."""
+    kind, _, raw = spec.partition(":")
+    try:
+        params = [float(value) for value in raw.split(",")] if raw else []
+    except ValueError:
+        raise ValueError(f"Invalid latency spec: {spec}")
+    samplers = {
+        "fixed": (1, lambda value: lambda: value),
+        "uniform": (2, lambda low, high: lambda: rng.uniform(low, high)),
+        "normal": (2, lambda mean, stddev: lambda: max(0.0, rng.gauss(mean, stddev))),
+        "lognormal": (2, lambda mu, sigma: lambda: rng.lognormvariate(mu, sigma)),
+    }
+    if kind not in samplers or len(params) != samplers[kind][0]:
+        raise ValueError(f"Invalid latency spec: {spec}")
+    return samplers[kind][1](*params)
+
+
+class StandinModel:
+    """The stand-in's behaviour, shared by every request handler."""
+
+    def __init__(
+        self,
+        latency: str = STANDIN_LATENCY,
+        tokens_per_second: float = STANDIN_TOKENS_PER_SECOND,
+        prefill_tokens_per_second: float = STANDIN_PREFILL_TOKENS_PER_SECOND,
+        max_concurrency: int = STANDIN_MAX_CONCURRENCY,
+        throttle_rate: float = STANDIN_THROTTLE_RATE,
+        error_rate: float = STANDIN_ERROR_RATE,
+        seed=None,
+    ):
+        self.rng = random.Random(seed)
+        self.sample_latency = parse_latency(latency, self.rng)
+        self.tokens_per_second = tokens_per_second
+        self.prefill_tokens_per_second = prefill_tokens_per_second
+        self.max_concurrency = max_concurrency
+        self.throttle_rate = throttle_rate
+        self.error_rate = error_rate
+        self.active = 0
+        self._lock = threading.Lock()
+
+    def generate(self, prompt: str, max_tokens: int):
+        """Return ``(status, payload)`` for one call."""
+        with self._lock:
+            if self.max_concurrency and self.active >= self.max_concurrency:
+                return 429, {"error": "Too many concurrent requests"}
+            roll = self.rng.random()
+            self.active += 1
+        try:
+            if roll < self.throttle_rate:
+                return 429, {"error": "Throttled"}
+            if roll < self.throttle_rate + self.error_rate:
+                return 500, {"error": "Model error"}
+            input_tokens = max(1, math.ceil(len(prompt) / 4))
+            output_tokens = min(max_tokens, len(REPLY_WORDS))
+            delay = self.sample_latency()
+            if self.prefill_tokens_per_second:
+                delay += input_tokens / self.prefill_tokens_per_second
+            if self.tokens_per_second:
+                delay += output_tokens / self.tokens_per_second
+            time.sleep(delay)
+            return 200, {
+                "text": " ".join(REPLY_WORDS[:output_tokens]),
+                "input_tokens": input_tokens,
+                "output_tokens": output_tokens,
+            }
+        finally:
+            with self._lock:
+                self.active -= 1
+
+
+def make_handler(model: StandinModel):
+    """A request handler class bound to ``model``."""
+
+    class StandinHandler(KeepAliveRequestHandler):
+        def do_POST(self):
+            if self.path != "/generate":
+                self.send_json(404, {"error": "Not found"})
+                return
+            try:
+                data = json.loads(self.read_body(MAX_PROMPT_BYTES))
+                prompt, max_tokens = str(data["prompt"]), int(data.get("max_tokens", 400))
+            except RequestBodyError as e:
+                self.send_json(e.status, {"error": str(e)})
+                return
+            except (ValueError, KeyError, TypeError):
+                self.send_json(400, {"error": "Expected JSON with prompt and max_tokens"})
+                return
+            self.send_json(*model.generate(prompt, max_tokens))
+
+        def do_GET(self):
+            if self.path == "/health":
+                self.send_json(200, {"status": "healthy", "active": model.active})
+            else:
+                self.send_json(404, {"error": "Not found"})
+
+        def send_json(self, status: int, payload: dict):
+            self.send_body(status, "application/json", json.dumps(payload).encode())
+
+        def log_message(self, format, *args):
+            pass
+
+    return StandinHandler
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Stand-in generation model for load tests")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--latency", default=STANDIN_LATENCY, help="e.g. fixed:0.8, uniform:0.2,1.5, lognormal:-0.5,0.5")
+    parser.add_argument("--tokens-per-second", type=float, default=STANDIN_TOKENS_PER_SECOND)
+    parser.add_argument("--prefill-tokens-per-second", type=float, default=STANDIN_PREFILL_TOKENS_PER_SECOND)
+    parser.add_argument("--max-concurrency", type=int, default=STANDIN_MAX_CONCURRENCY)
+    parser.add_argument("--throttle-rate", type=float, default=STANDIN_THROTTLE_RATE)
+    parser.add_argument("--error-rate", type=float, default=STANDIN_ERROR_RATE)
+    parser.add_argument("--workers", type=int, default=64, help="Calls served at once (each sleeps on a thread)")
+    args = parser.parse_args(argv)
+
+    model = StandinModel(
+        args.latency,
+        args.tokens_per_second,
+        args.prefill_tokens_per_second,
+        args.max_concurrency,
+        args.throttle_rate,
+        args.error_rate,
+    )
+    server = make_server((args.host, args.port), make_handler(model), mode="threaded", workers=args.workers)
+    print(f"Stand-in model on http://{args.host}:{args.port}/generate (latency {args.latency})")
+    serve(server)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""Async DynamoDB repositories for UserProfiles, ConversationSessions,
+ChatMessages, PrayerRequests and ConsentLogs, sharing one pooled client."""
+
+from faith_motivator_chatbot.backend.repositories.client import (
+    AsyncDynamoDB,
+    DynamoDBSettings,
+    database_lifespan,
+    get_database,
+)
+from faith_motivator_chatbot.backend.repositories.models import (
+    ChatMessage,
+    ConsentLog,
+    ConversationSession,
+    PrayerRequest,
+    Record,
+    UserProfile,
+    deserialize,
+    serialize,
+)
+from faith_motivator_chatbot.backend.repositories.tables import (
+    ChatMessageRepository,
+    ConsentLogRepository,
+    ConversationSessionRepository,
+    PrayerRequestRepository,
+    Repositories,
+    Repository,
+    UserProfileRepository,
+)
+
+__all__ = [
+    "AsyncDynamoDB",
+    "ChatMessage",
+    "ChatMessageRepository",
+    "ConsentLog",
+    "ConsentLogRepository",
+    "ConversationSession",
+    "ConversationSessionRepository",
+    "DynamoDBSettings",
+    "PrayerRequest",
+    "PrayerRequestRepository",
+    "Record",
+    "Repositories",
+    "Repository",
+    "UserProfile",
+    "UserProfileRepository",
+    "database_lifespan",
+    "deserialize",
+    "get_database",
+    "serialize",
+]
@@ -0,0 +1,133 @@
+"""Pooled DynamoDB client whose calls never block the event loop.
+
+boto3 is synchronous, so ``AsyncDynamoDB`` runs each call on a bounded
+thread pool and awaits it. One low-level client is shared by every thread
+(boto3 clients are thread-safe; resources are not), so every call reuses
+one pool of keep-alive connections:
+
+- ``max_pool_connections`` sizes that pool and the thread pool together,
+  so a thread never waits for a connection; callers beyond that queue in
+  the executor without holding the loop;
+- TCP keep-alive stays on, so pooled connections survive idle periods
+  behind NAT gateways and load balancers;
+- connect/read timeouts and retries are bounded, so a slow table cannot
+  pin a worker indefinitely.
+"""
+
+import asyncio
+import contextlib
+import functools
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Dict, Optional
+
+
+class DynamoDBSettings:
+    """Client pool, timeout and retry settings, read from the environment."""
+
+    def __init__(
+        self,
+        endpoint_url: Optional[str] = None,
+        region: str = "us-east-1",
+        max_pool_connections: int = 50,
+        connect_timeout: float = 2.0,
+        read_timeout: float = 5.0,
+        max_attempts: int = 3,
+        tcp_keepalive: bool = True,
+    ):
+        self.endpoint_url = endpoint_url
+        self.region = region
+        self.max_pool_connections = max_pool_connections
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.max_attempts = max_attempts
+        self.tcp_keepalive = tcp_keepalive
+
+    @classmethod
+    def from_env(cls) -> "DynamoDBSettings":
+        """Build settings from DB_DYNAMODB_* and AWS_* environment variables."""
+        return cls(
+            endpoint_url=os.getenv("DB_DYNAMODB_ENDPOINT_URL") or os.getenv("AWS_ENDPOINT_URL") or None,
+            region=os.getenv("AWS_REGION", "us-east-1"),
+            max_pool_connections=int(os.getenv("DB_DYNAMODB_MAX_POOL_CONNECTIONS", 50)),
+            connect_timeout=float(os.getenv("DB_DYNAMODB_CONNECT_TIMEOUT", 2.0)),
+            read_timeout=float(os.getenv("DB_DYNAMODB_READ_TIMEOUT", 5.0)),
+            max_attempts=int(os.getenv("DB_DYNAMODB_MAX_ATTEMPTS", 3)),
+            tcp_keepalive=os.getenv("DB_DYNAMODB_TCP_KEEPALIVE", "true").lower() == "true",
+        )
+
+
+class AsyncDynamoDB:
+    """Awaitable DynamoDB calls on a bounded thread pool sharing one client."""
+
+    def __init__(self, settings: Optional[DynamoDBSettings] = None, client: Any = None):
+        self.settings = settings or DynamoDBSettings.from_env()
+        self._client = client
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.settings.max_pool_connections, thread_name_prefix="dynamodb"
+        )
+        self._closed = False
+
+    @property
+    def client(self):
+        """The shared low-level client, created on first use."""
+        if self._client is None:
+            self._client = self._create_client()
+        return self._client
+
+    def _create_client(self):
+        import boto3
+        from botocore.config import Config
+
+        settings = self.settings
+        return boto3.session.Session().client(
+            "dynamodb",
+            endpoint_url=settings.endpoint_url,
+            region_name=settings.region,
+            config=Config(
+                max_pool_connections=settings.max_pool_connections,
+                tcp_keepalive=settings.tcp_keepalive,
+                connect_timeout=settings.connect_timeout,
+                read_timeout=settings.read_timeout,
+                retries={"total_max_attempts": settings.max_attempts, "mode": "adaptive"},
+            ),
+        )
+
+    async def call(self, operation: str, **kwargs) -> Dict[str, Any]:
+        """Run a client operation (e.g. ``"get_item"``) off the event loop."""
+        if self._closed:
+            raise RuntimeError("DynamoDB client has been closed")
+        method = getattr(self.client, operation)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(method, **kwargs))
+
+    async def close(self):
+        """Stop accepting calls, let running ones finish and release connections."""
+        self._closed = True
+        await asyncio.get_running_loop().run_in_executor(None, self._executor.shutdown)
+        if self._client is not None:
+            self._client.close()
+
+
+_database: Optional[AsyncDynamoDB] = None
+
+
+def get_database() -> AsyncDynamoDB:
+    """Return the process-wide DynamoDB client, creating it on first use."""
+    global _database
+    if _database is None or _database._closed:
+        _database = AsyncDynamoDB()
+    return _database
+
+
+@contextlib.asynccontextmanager
+async def database_lifespan() -> AsyncIterator[AsyncDynamoDB]:
+    """App lifespan task that opens the client on startup and closes it on shutdown."""
+    database = get_database()
+    try:
+        yield database
+    finally:
+        global _database
+        await database.close()
+        if _database is database:
+            _database = None
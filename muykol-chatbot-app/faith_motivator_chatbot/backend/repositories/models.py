@@ -0,0 +1,287 @@
+"""Typed records for the five application tables and their item mapping.
+
+The low-level client speaks DynamoDB's typed wire format
+(``{"S": "..."}``, ``{"N": "3"}``). ``serialize``/``deserialize`` convert
+whole items; numbers come back as ``int``/``float`` rather than
+``Decimal`` and ``None`` attributes are dropped on write, since DynamoDB
+has no use for them. Each record maps one table's items with
+``from_item``/``to_item`` and keeps unknown attributes in ``extra`` so a
+read-modify-write never loses fields added elsewhere.
+"""
+
+from decimal import Decimal
+from typing import Any, Dict, List, Optional
+
+from boto3.dynamodb.types import TypeDeserializer, TypeSerializer
+
+TABLE_PREFIX = "FaithChatbot-"
+
+_serializer = TypeSerializer()
+_deserializer = TypeDeserializer()
+
+
+def _to_dynamo(value: Any) -> Any:
+    if isinstance(value, float):
+        return Decimal(str(value))
+    if isinstance(value, dict):
+        return {k: _to_dynamo(v) for k, v in value.items() if v is not None}
+    if isinstance(value, (list, tuple)):
+        return [_to_dynamo(v) for v in value]
+    return value
+
+
+def _from_dynamo(value: Any) -> Any:
+    if isinstance(value, Decimal):
+        return int(value) if value == value.to_integral_value() else float(value)
+    if isinstance(value, dict):
+        return {k: _from_dynamo(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_from_dynamo(v) for v in value]
+    if isinstance(value, set):
+        return {_from_dynamo(v) for v in value}
+    return value
+
+
+def serialize(item: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """Convert a plain item (or key, or expression values) to the wire format."""
+    return {key: _serializer.serialize(_to_dynamo(value)) for key, value in item.items() if value is not None}
+
+
+def deserialize(item: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    """Convert a wire-format item back to plain Python values."""
+    return {key: _from_dynamo(_deserializer.deserialize(value)) for key, value in item.items()}
+
+
+class Record:
+    """Base for table records: declared fields plus passthrough ``extra``."""
+
+    __slots__ = ("extra",)
+
+    TABLE = ""
+    KEY: tuple = ()
+    FIELDS: tuple = ()
+
+    @classmethod
+    def table_name(cls) -> str:
+        return TABLE_PREFIX + cls.TABLE
+
+    @classmethod
+    def from_item(cls, item: Dict[str, Any]) -> "Record":
+        """Build a record from a plain (deserialized) item."""
+        known = {field: item[field] for field in cls.FIELDS if field in item}
+        record = cls(**known)
+        record.extra = {k: v for k, v in item.items() if k not in cls.FIELDS}
+        return record
+
+    def to_item(self) -> Dict[str, Any]:
+        """The plain item to store; ``None`` fields are omitted."""
+        item = dict(self.extra)
+        for field in self.FIELDS:
+            value = getattr(self, field)
+            if value is not None:
+                item[field] = value
+        return item
+
+    def key(self) -> Dict[str, Any]:
+        return {field: getattr(self, field) for field in self.KEY}
+
+    def __eq__(self, other) -> bool:
+        return type(self) is type(other) and self.to_item() == other.to_item()
+
+    def __repr__(self) -> str:
+        key = ", ".join(f"{field}={getattr(self, field)!r}" for field in self.KEY)
+        return f"{type(self).__name__}({key})"
+
+
+class UserProfile(Record):
+    """A FaithChatbot-UserProfiles item (key ``user_id``, ``EmailIndex`` on ``email``)."""
+
+    __slots__ = (
+        "user_id", "email", "first_name", "last_name", "created_at", "last_active",
+        "preferences", "consent_history", "profile_completed", "email_verified",
+    )
+
+    TABLE = "UserProfiles"
+    KEY = ("user_id",)
+    FIELDS = __slots__
+
+    def __init__(
+        self,
+        user_id: str,
+        email: Optional[str] = None,
+        first_name: Optional[str] = None,
+        last_name: Optional[str] = None,
+        created_at: Optional[str] = None,
+        last_active: Optional[str] = None,
+        preferences: Optional[Dict[str, Any]] = None,
+        consent_history: Optional[List[Dict[str, Any]]] = None,
+        profile_completed: bool = False,
+        email_verified: bool = False,
+    ):
+        self.user_id = user_id
+        self.email = email
+        self.first_name = first_name
+        self.last_name = last_name
+        self.created_at = created_at
+        self.last_active = last_active
+        self.preferences = preferences or {}
+        self.consent_history = consent_history or []
+        self.profile_completed = profile_completed
+        self.email_verified = email_verified
+        self.extra: Dict[str, Any] = {}
+
+
+class ConversationSession(Record):
+    """A FaithChatbot-ConversationSessions item (key ``session_id``, ``UserIndex``)."""
+
+    __slots__ = (
+        "session_id", "user_id", "created_at", "updated_at", "status", "message_count",
+        "summarized_count", "session_summary", "emotion_classifications", "biblical_themes",
+    )
+
+    TABLE = "ConversationSessions"
+    KEY = ("session_id",)
+    FIELDS = __slots__
+
+    def __init__(
+        self,
+        session_id: str,
+        user_id: Optional[str] = None,
+        created_at: Optional[str] = None,
+        updated_at: Optional[str] = None,
+        status: str = "active",
+        message_count: int = 0,
+        summarized_count: int = 0,
+        session_summary: str = "",
+        emotion_classifications: Optional[List[str]] = None,
+        biblical_themes: Optional[List[str]] = None,
+    ):
+        self.session_id = session_id
+        self.user_id = user_id
+        self.created_at = created_at
+        self.updated_at = updated_at
+        self.status = status
+        self.message_count = message_count
+        self.summarized_count = summarized_count
+        self.session_summary = session_summary
+        self.emotion_classifications = emotion_classifications or []
+        self.biblical_themes = biblical_themes or []
+        self.extra: Dict[str, Any] = {}
+
+    def to_session_summary(self):
+        """The rolling-summary state (``backend.session_summary``) of this session."""
+        from faith_motivator_chatbot.backend.session_summary import SessionSummary
+
+        return SessionSummary(self.session_id, self.session_summary, self.message_count, self.summarized_count)
+
+
+class ChatMessage(Record):
+    """A FaithChatbot-ChatMessages item (key ``session_id`` + ``message_id``, ``TimestampIndex``)."""
+
+    __slots__ = (
+        "session_id", "message_id", "timestamp", "role", "content", "user_id",
+        "emotion_classification", "biblical_references", "biblical_themes", "response_type",
+    )
+
+    TABLE = "ChatMessages"
+    KEY = ("session_id", "message_id")
+    FIELDS = __slots__
+
+    def __init__(
+        self,
+        session_id: str,
+        message_id: str,
+        timestamp: str,
+        role: str,
+        content: str,
+        user_id: Optional[str] = None,
+        emotion_classification: Optional[str] = None,
+        biblical_references: Optional[List[str]] = None,
+        biblical_themes: Optional[List[str]] = None,
+        response_type: Optional[str] = None,
+    ):
+        self.session_id = session_id
+        self.message_id = message_id
+        self.timestamp = timestamp
+        self.role = role
+        self.content = content
+        self.user_id = user_id
+        self.emotion_classification = emotion_classification
+        self.biblical_references = biblical_references
+        self.biblical_themes = biblical_themes
+        self.response_type = response_type
+        self.extra: Dict[str, Any] = {}
+
+
+class PrayerRequest(Record):
+    """A FaithChatbot-PrayerRequests item (key ``request_id``, ``UserIndex``, ``StatusIndex``)."""
+
+    __slots__ = (
+        "request_id", "user_id", "created_at", "updated_at", "status", "prayer_text",
+        "consent_given", "consent_timestamp", "prayer_count", "responses", "tags",
+    )
+
+    TABLE = "PrayerRequests"
+    KEY = ("request_id",)
+    FIELDS = __slots__
+
+    def __init__(
+        self,
+        request_id: str,
+        user_id: str,
+        prayer_text: str,
+        created_at: Optional[str] = None,
+        updated_at: Optional[str] = None,
+        status: str = "active",
+        consent_given: bool = False,
+        consent_timestamp: Optional[str] = None,
+        prayer_count: int = 0,
+        responses: Optional[List[Dict[str, Any]]] = None,
+        tags: Optional[List[str]] = None,
+    ):
+        self.request_id = request_id
+        self.user_id = user_id
+        self.prayer_text = prayer_text
+        self.created_at = created_at
+        self.updated_at = updated_at
+        self.status = status
+        self.consent_given = consent_given
+        self.consent_timestamp = consent_timestamp
+        self.prayer_count = prayer_count
+        self.responses = responses or []
+        self.tags = tags or []
+        self.extra: Dict[str, Any] = {}
+
+
+class ConsentLog(Record):
+    """A FaithChatbot-ConsentLogs item (key ``log_id``, ``UserIndex`` on ``timestamp``)."""
+
+    __slots__ = (
+        "log_id", "user_id", "timestamp", "consent_type", "consent_version",
+        "action", "ip_address", "user_agent",
+    )
+
+    TABLE = "ConsentLogs"
+    KEY = ("log_id",)
+    FIELDS = __slots__
+
+    def __init__(
+        self,
+        log_id: str,
+        user_id: str,
+        timestamp: str,
+        consent_type: str,
+        action: str,
+        consent_version: Optional[str] = None,
+        ip_address: Optional[str] = None,
+        user_agent: Optional[str] = None,
+    ):
+        self.log_id = log_id
+        self.user_id = user_id
+        self.timestamp = timestamp
+        self.consent_type = consent_type
+        self.action = action
+        self.consent_version = consent_version
+        self.ip_address = ip_address
+        self.user_agent = user_agent
+        self.extra: Dict[str, Any] = {}
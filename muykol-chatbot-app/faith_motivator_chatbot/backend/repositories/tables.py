@@ -0,0 +1,346 @@
+"""Async repositories for the five application tables.
+
+Each repository wraps one table behind awaitable, typed methods; every
+call goes through the shared ``AsyncDynamoDB`` pool, so none of them
+blocks the event loop. Key and index names follow
+``localstack/01-create-dynamodb-tables.sh``.
+"""
+
+import asyncio
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Sequence, Type
+
+from faith_motivator_chatbot.backend.chat_history import (
+    TIMESTAMP_INDEX,
+    clamp_page_size,
+    decode_cursor,
+    encode_cursor,
+    item_to_api_message,
+)
+from faith_motivator_chatbot.backend.repositories.client import AsyncDynamoDB, get_database
+from faith_motivator_chatbot.backend.repositories.models import (
+    ChatMessage,
+    ConsentLog,
+    ConversationSession,
+    PrayerRequest,
+    Record,
+    UserProfile,
+    deserialize,
+    serialize,
+)
+from faith_motivator_chatbot.backend.session_summary import SessionSummary, build_summary_update
+
+# BatchWriteItem accepts at most 25 requests per call
+BATCH_WRITE_LIMIT = 25
+
+# Attempts at writing back UnprocessedItems before giving up
+BATCH_WRITE_ATTEMPTS = 5
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _update_kwargs(update: Dict[str, Any]) -> Dict[str, Any]:
+    """Serialize the plain ``Key``/``ExpressionAttributeValues`` of update kwargs."""
+    kwargs = dict(update)
+    kwargs["Key"] = serialize(update["Key"])
+    if "ExpressionAttributeValues" in update:
+        kwargs["ExpressionAttributeValues"] = serialize(update["ExpressionAttributeValues"])
+    return kwargs
+
+
+def _is_condition_failure(error: Exception) -> bool:
+    response = getattr(error, "response", None) or {}
+    return response.get("Error", {}).get("Code") == "ConditionalCheckFailedException"
+
+
+def _session_cursor(session_id: str, cursor: str) -> Dict[str, str]:
+    """Decode a history cursor, refusing one issued for another session."""
+    key = decode_cursor(cursor)
+    if key["session_id"] != session_id:
+        raise ValueError("History cursor does not belong to this session")
+    return key
+
+
+class Repository:
+    """Shared get/put/query plumbing for one table."""
+
+    record: Type[Record] = Record
+
+    def __init__(self, database: Optional[AsyncDynamoDB] = None):
+        self.database = database or get_database()
+        self.table_name = self.record.table_name()
+
+    async def _get(self, key: Dict[str, Any], consistent: bool = False) -> Optional[Record]:
+        result = await self.database.call(
+            "get_item", TableName=self.table_name, Key=serialize(key), ConsistentRead=consistent
+        )
+        item = result.get("Item")
+        return self.record.from_item(deserialize(item)) if item else None
+
+    async def put(self, record: Record, condition: Optional[str] = None) -> Record:
+        """Store ``record``, replacing any item with the same key."""
+        kwargs: Dict[str, Any] = {"TableName": self.table_name, "Item": serialize(record.to_item())}
+        if condition:
+            kwargs["ConditionExpression"] = condition
+        await self.database.call("put_item", **kwargs)
+        return record
+
+    async def _update(self, update: Dict[str, Any]) -> Dict[str, Any]:
+        result = await self.database.call("update_item", TableName=self.table_name, **_update_kwargs(update))
+        return deserialize(result.get("Attributes", {}))
+
+    async def _query(
+        self,
+        key_condition: str,
+        values: Dict[str, Any],
+        index: Optional[str] = None,
+        limit: Optional[int] = None,
+        newest_first: bool = True,
+        names: Optional[Dict[str, str]] = None,
+    ) -> List[Record]:
+        kwargs: Dict[str, Any] = {
+            "TableName": self.table_name,
+            "KeyConditionExpression": key_condition,
+            "ExpressionAttributeValues": serialize(values),
+            "ScanIndexForward": not newest_first,
+        }
+        if index:
+            kwargs["IndexName"] = index
+        if limit:
+            kwargs["Limit"] = limit
+        if names:
+            kwargs["ExpressionAttributeNames"] = names
+        result = await self.database.call("query", **kwargs)
+        return [self.record.from_item(deserialize(item)) for item in result.get("Items", [])]
+
+    async def batch_put(self, records: Sequence[Record]) -> int:
+        """Write ``records`` in chunks of 25, concurrently, retrying unprocessed items.
+
+        Returns the number written. Raises ``RuntimeError`` if some items are
+        still unprocessed after ``BATCH_WRITE_ATTEMPTS`` attempts.
+        """
+        chunks = [
+            [{"PutRequest": {"Item": serialize(record.to_item())}} for record in records[i:i + BATCH_WRITE_LIMIT]]
+            for i in range(0, len(records), BATCH_WRITE_LIMIT)
+        ]
+        await asyncio.gather(*(self._write_chunk(chunk) for chunk in chunks))
+        return len(records)
+
+    async def _write_chunk(self, requests: List[Dict[str, Any]]):
+        for attempt in range(BATCH_WRITE_ATTEMPTS):
+            result = await self.database.call("batch_write_item", RequestItems={self.table_name: requests})
+            requests = result.get("UnprocessedItems", {}).get(self.table_name, [])
+            if not requests:
+                return
+            # Throttled: back off before resending what was left
+            await asyncio.sleep(0.05 * 2 ** attempt)
+        raise RuntimeError(f"{len(requests)} items left unprocessed writing to {self.table_name}")
+
+
+class UserProfileRepository(Repository):
+    """FaithChatbot-UserProfiles."""
+
+    record = UserProfile
+
+    async def get(self, user_id: str) -> Optional[UserProfile]:
+        return await self._get({"user_id": user_id})
+
+    async def get_by_email(self, email: str) -> Optional[UserProfile]:
+        users = await self._query("email = :email", {":email": email}, index="EmailIndex", limit=1)
+        return users[0] if users else None
+
+    async def touch(self, user_id: str) -> None:
+        """Set ``last_active`` to now."""
+        await self._update({
+            "Key": {"user_id": user_id},
+            "UpdateExpression": "SET last_active = :now",
+            "ExpressionAttributeValues": {":now": _now()},
+        })
+
+
+class ConversationSessionRepository(Repository):
+    """FaithChatbot-ConversationSessions."""
+
+    record = ConversationSession
+
+    async def get(self, session_id: str) -> Optional[ConversationSession]:
+        return await self._get({"session_id": session_id})
+
+    async def list_for_user(self, user_id: str, limit: int = 20) -> List[ConversationSession]:
+        """The user's sessions, newest first."""
+        return await self._query("user_id = :user", {":user": user_id}, index="UserIndex", limit=limit)
+
+    async def add_messages(self, session_id: str, added: int = 1) -> ConversationSession:
+        """Count new messages in a session; returns the session after the update."""
+        item = await self._update({
+            "Key": {"session_id": session_id},
+            "UpdateExpression": "ADD message_count :added SET updated_at = :now",
+            "ExpressionAttributeValues": {":added": added, ":now": _now()},
+            "ReturnValues": "ALL_NEW",
+        })
+        return ConversationSession.from_item(item)
+
+    async def save_summary(self, session: SessionSummary, previous_summarized_count: int) -> bool:
+        """Save a folded summary; ``False`` if another fold landed first."""
+        try:
+            await self._update(build_summary_update(session, previous_summarized_count))
+        except Exception as e:
+            if _is_condition_failure(e):
+                return False
+            raise
+        return True
+
+
+class ChatMessageRepository(Repository):
+    """FaithChatbot-ChatMessages, paged through ``TimestampIndex``."""
+
+    record = ChatMessage
+
+    async def history_page(
+        self, session_id: str, limit: Optional[int] = None, cursor: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """One newest-first history page, returned oldest-first.
+
+        Returns ``messages``, ``next_cursor`` (``None`` once the start of the
+        conversation is reached), ``prev_cursor`` (the newest message
+        returned, for ``history_after``) and ``session_id``.
+
+        Raises:
+            ValueError: If the cursor is malformed or belongs to another session.
+        """
+        kwargs: Dict[str, Any] = {
+            "TableName": self.table_name,
+            "IndexName": TIMESTAMP_INDEX,
+            "KeyConditionExpression": "session_id = :session",
+            "ExpressionAttributeValues": serialize({":session": session_id}),
+            "ScanIndexForward": False,
+            "Limit": clamp_page_size(limit),
+        }
+        if cursor:
+            kwargs["ExclusiveStartKey"] = serialize(_session_cursor(session_id, cursor))
+        result = await self.database.call("query", **kwargs)
+        items = [deserialize(item) for item in result.get("Items", [])]
+        messages = [item_to_api_message(item) for item in reversed(items)]
+
+        next_cursor = None
+        last_key = result.get("LastEvaluatedKey")
+        if last_key:
+            last_key = deserialize(last_key)
+            next_cursor = encode_cursor(
+                last_key["session_id"], last_key["message_id"], last_key["timestamp"]
+            )
+        return {
+            "messages": messages,
+            "next_cursor": next_cursor,
+            "prev_cursor": messages[-1]["cursor"] if messages else None,
+            "session_id": session_id,
+        }
+
+    async def history_after(
+        self, session_id: str, cursor: str, limit: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """Messages newer than the one ``cursor`` points at, oldest-first.
+
+        Returns ``messages``, ``has_more`` (more than ``limit`` newer messages
+        exist; the client should fall back to a fresh first page),
+        ``prev_cursor`` (the newest message now known) and ``session_id``.
+
+        Raises:
+            ValueError: If the cursor is malformed or belongs to another session.
+        """
+        after = _session_cursor(session_id, cursor)["timestamp"]
+        result = await self.database.call(
+            "query",
+            TableName=self.table_name,
+            IndexName=TIMESTAMP_INDEX,
+            KeyConditionExpression="session_id = :session AND #ts > :after",
+            ExpressionAttributeNames={"#ts": "timestamp"},
+            ExpressionAttributeValues=serialize({":session": session_id, ":after": after}),
+            ScanIndexForward=True,
+            Limit=clamp_page_size(limit),
+        )
+        items = [deserialize(item) for item in result.get("Items", [])]
+        messages = [item_to_api_message(item) for item in items]
+        return {
+            "messages": messages,
+            "has_more": bool(result.get("LastEvaluatedKey")),
+            "prev_cursor": messages[-1]["cursor"] if messages else cursor,
+            "session_id": session_id,
+        }
+
+
+class PrayerRequestRepository(Repository):
+    """FaithChatbot-PrayerRequests."""
+
+    record = PrayerRequest
+
+    async def get(self, request_id: str) -> Optional[PrayerRequest]:
+        return await self._get({"request_id": request_id})
+
+    async def list_for_user(self, user_id: str, limit: int = 20) -> List[PrayerRequest]:
+        """The user's requests, newest first."""
+        return await self._query("user_id = :user", {":user": user_id}, index="UserIndex", limit=limit)
+
+    async def list_by_status(self, status: str = "active", limit: int = 50) -> List[PrayerRequest]:
+        """Requests in ``status``, newest first."""
+        return await self._query(
+            "#status = :status", {":status": status}, index="StatusIndex", limit=limit, names={"#status": "status"}
+        )
+
+    async def add_response(self, request_id: str, responder_id: str, response_text: str) -> PrayerRequest:
+        """Append a prayer-partner response; returns the updated request."""
+        now = _now()
+        item = await self._update({
+            "Key": {"request_id": request_id},
+            "UpdateExpression": "SET responses = list_append(if_not_exists(responses, :empty), :response), "
+                                "updated_at = :now",
+            "ExpressionAttributeValues": {
+                ":response": [{"responder_id": responder_id, "response_text": response_text, "timestamp": now}],
+                ":empty": [],
+                ":now": now,
+            },
+            "ReturnValues": "ALL_NEW",
+        })
+        return PrayerRequest.from_item(item)
+
+    async def increment_prayer_count(self, request_id: str) -> int:
+        """Count one more prayer; returns the new count."""
+        item = await self._update({
+            "Key": {"request_id": request_id},
+            "UpdateExpression": "ADD prayer_count :one",
+            "ExpressionAttributeValues": {":one": 1},
+            "ReturnValues": "UPDATED_NEW",
+        })
+        return item["prayer_count"]
+
+
+class ConsentLogRepository(Repository):
+    """FaithChatbot-ConsentLogs, an append-only audit trail."""
+
+    record = ConsentLog
+
+    async def put(self, record: ConsentLog, condition: Optional[str] = "attribute_not_exists(log_id)") -> ConsentLog:
+        """Append a log entry; existing entries are never overwritten."""
+        return await super().put(record, condition)
+
+    async def list_for_user(self, user_id: str, limit: int = 50) -> List[ConsentLog]:
+        """The user's consent history, newest first."""
+        return await self._query(
+            "user_id = :user", {":user": user_id}, index="UserIndex", limit=limit
+        )
+
+
+class Repositories:
+    """One repository per table, sharing one client pool."""
+
+    __slots__ = ("database", "users", "sessions", "messages", "prayer_requests", "consent_logs")
+
+    def __init__(self, database: Optional[AsyncDynamoDB] = None):
+        self.database = database or get_database()
+        self.users = UserProfileRepository(self.database)
+        self.sessions = ConversationSessionRepository(self.database)
+        self.messages = ChatMessageRepository(self.database)
+        self.prayer_requests = PrayerRequestRepository(self.database)
+        self.consent_logs = ConsentLogRepository(self.database)
@@ -0,0 +1,169 @@
+"""Cache of generated chat replies keyed by normalised intent.
+
+Reply generation is the slowest and most expensive step of a chat turn,
+and many turns ask for the same thing ("anxious about work" with the same
+verses). ``ResponseCache`` sits in front of the generation call:
+
+- the key combines the emotion, the theme and a fingerprint of the
+  normalised prompt and verse references (``cache_key``), so wording
+  differences in case, punctuation and filler words share an entry;
+- an in-process tier evicts least recently used entries past
+  ``RESPONSE_CACHE_SIZE`` and expires them after ``RESPONSE_CACHE_TTL_SECONDS``;
+- an optional Redis tier (``RESPONSE_CACHE_REDIS_URL``) shares replies
+  between processes and hosts; Redis errors count as misses;
+- personalised turns pass ``personalized=True`` and are never cached.
+
+Lookups are counted in ``response_cache_requests_total`` by result
+(``hit_local``, ``hit_redis``, ``miss``, ``bypass``).
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Optional, Sequence, Tuple
+
+from faith_motivator_chatbot.backend.metrics import METRICS, describe_counter
+
+logger = logging.getLogger(__name__)
+
+# Cache generated replies (set to false to always generate)
+RESPONSE_CACHE_ENABLED = os.getenv("RESPONSE_CACHE_ENABLED", "true").lower() == "true"
+
+# Seconds a cached reply is reused
+RESPONSE_CACHE_TTL_SECONDS = float(os.getenv("RESPONSE_CACHE_TTL_SECONDS", 60 * 60))
+
+# Most replies kept in process; least recently used are dropped first
+RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", 1024))
+
+# Redis URL for the shared tier; empty disables it
+RESPONSE_CACHE_REDIS_URL = os.getenv("RESPONSE_CACHE_REDIS_URL", "")
+
+REDIS_KEY_PREFIX = "faith:reply:"
+
+REQUESTS_METRIC = "response_cache_requests_total"
+describe_counter(REQUESTS_METRIC, "Reply cache lookups, by result.")
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+# Words that do not change what a message is asking for
+FILLER_WORDS = frozenset(
+    "a an the um uh like just really very so please hi hello hey i im me my".split()
+)
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Lowercase, drop punctuation and filler words, collapse whitespace."""
+    words = _WORD.findall(prompt.lower().replace("'", ""))
+    return " ".join(word for word in words if word not in FILLER_WORDS)
+
+
+def cache_key(emotion: Optional[str], theme: Optional[str], prompt: str, references: Sequence[str] = ()) -> str:
+    """Key for a reply to ``prompt`` given its emotion, theme and verses."""
+    fingerprint = hashlib.sha256(
+        json.dumps([normalize_prompt(prompt), sorted(references)], separators=(",", ":")).encode()
+    ).hexdigest()[:32]
+    return f"{(emotion or 'none').lower()}:{(theme or 'none').lower()}:{fingerprint}"
+
+
+class ResponseCache:
+    """LRU + TTL reply cache with an optional shared Redis tier."""
+
+    def __init__(
+        self,
+        max_size: int = RESPONSE_CACHE_SIZE,
+        ttl: float = RESPONSE_CACHE_TTL_SECONDS,
+        redis_client: Any = None,
+        enabled: bool = RESPONSE_CACHE_ENABLED,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.redis = redis_client
+        self.enabled = enabled
+        self._clock = clock
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Tuple[Any, Optional[str]]:
+        """Return ``(value, tier)``; ``tier`` is "local", "redis" or None on a miss."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if self._clock() < entry[0]:
+                    self._entries.move_to_end(key)
+                    return entry[1], "local"
+                del self._entries[key]
+
+        if self.redis is not None:
+            try:
+                raw = self.redis.get(REDIS_KEY_PREFIX + key)
+                value = json.loads(raw) if raw is not None else None
+            except Exception as e:
+                logger.warning("Reply cache Redis read failed: %s", e)
+                raw = None
+            if raw is not None:
+                self._store_local(key, value)
+                return value, "redis"
+        return None, None
+
+    def set(self, key: str, value: Any):
+        """Store a JSON-serialisable reply in every tier."""
+        self._store_local(key, value)
+        if self.redis is not None:
+            try:
+                self.redis.setex(REDIS_KEY_PREFIX + key, max(1, int(self.ttl)), json.dumps(value))
+            except Exception as e:
+                logger.warning("Reply cache Redis write failed: %s", e)
+
+    def _store_local(self, key: str, value: Any):
+        with self._lock:
+            self._entries[key] = (self._clock() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def get_or_generate(
+        self, key: str, generate: Callable[[], Any], personalized: bool = False, store: bool = True
+    ) -> Tuple[Any, bool]:
+        """Return ``(reply, hit)``, calling ``generate`` only on a miss.
+
+        Personalised turns, and every turn while the cache is disabled,
+        always generate and are not stored. With ``store=False`` (replies
+        that may be thrown away) the cache is read but a miss is not stored.
+        """
+        if personalized or not self.enabled:
+            METRICS.increment(REQUESTS_METRIC, 'result="bypass"')
+            return generate(), False
+
+        value, tier = self.get(key)
+        if tier is not None:
+            METRICS.increment(REQUESTS_METRIC, f'result="hit_{tier}"')
+            return value, True
+
+        METRICS.increment(REQUESTS_METRIC, 'result="miss"')
+        value = generate()
+        if store:
+            self.set(key, value)
+        return value, False
+
+    def clear(self):
+        """Drop every in-process entry."""
+        with self._lock:
+            self._entries.clear()
+
+
+def redis_from_url(url: str = RESPONSE_CACHE_REDIS_URL):
+    """A Redis client for the shared tier, or None when not configured."""
+    if not url:
+        return None
+    import redis
+
+    return redis.Redis.from_url(url, socket_timeout=0.25, socket_connect_timeout=0.25)
@@ -0,0 +1,827 @@
+"""Concurrent HTTP/1.1 serving for the standalone app's request handler.
+
+Two serving modes share one request-handler contract:
+
+- ``threaded``: the accept loop hands each connection to a fixed pool of
+  ``SERVER_WORKERS`` threads;
+- ``asyncio``: one event loop owns every connection and reads requests
+  without holding a thread; handlers run on a pool of ``SERVER_WORKERS``
+  threads only once a complete request has arrived.
+
+Both speak HTTP/1.1 with persistent connections, bound idle and in-request
+socket time, and drain gracefully on SIGTERM/SIGINT: the listener stops
+accepting, in-flight requests finish (up to ``SERVER_DRAIN_TIMEOUT``),
+idle keep-alive connections are closed.
+
+With ``SERVER_PROCESSES`` > 1 a ``PreforkSupervisor`` runs that many
+worker processes on the same port, so throughput scales past one GIL.
+
+Load-balancer health checks never queue behind chat traffic: they run on
+a separate lane (a small dedicated pool in threaded mode, the event loop
+itself in asyncio mode). In threaded mode a health check is recognised by
+peeking the request line with ``MSG_PEEK`` before dispatch, and a
+health-lane connection is closed after its one response so a keep-alive
+client cannot route later requests around the worker pool; connections
+whose first bytes have not arrived yet wait in a selector rather than in a
+worker.
+"""
+
+import asyncio
+import io
+import json
+import os
+import selectors
+import shutil
+import signal
+import socket
+import sys
+import tempfile
+import threading
+import time
+import traceback
+from concurrent.futures import Executor, ThreadPoolExecutor, wait
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+from faith_motivator_chatbot.backend.metrics import METRICS, retire_snapshot
+
+# "threaded" or "asyncio"
+SERVER_MODE = os.getenv("SERVER_MODE", "threaded").lower()
+
+# Threads that run request handlers
+SERVER_WORKERS = int(os.getenv("SERVER_WORKERS", 16))
+
+# Threads reserved for health checks (threaded mode)
+SERVER_HEALTH_WORKERS = int(os.getenv("SERVER_HEALTH_WORKERS", 2))
+
+# Seconds an idle keep-alive connection is kept open
+SERVER_KEEPALIVE_TIMEOUT = float(os.getenv("SERVER_KEEPALIVE_TIMEOUT", 5))
+
+# Seconds a single read or write may stall once a request has started
+SERVER_REQUEST_TIMEOUT = float(os.getenv("SERVER_REQUEST_TIMEOUT", 30))
+
+# Largest request body accepted, in bytes; larger requests get 413 unread
+SERVER_MAX_BODY_BYTES = int(os.getenv("SERVER_MAX_BODY_BYTES", 64 * 1024))
+
+# Seconds allowed to receive a whole request body, however it trickles in
+SERVER_BODY_TIMEOUT = float(os.getenv("SERVER_BODY_TIMEOUT", 10))
+
+# Most bytes taken from the socket per read while receiving a body
+BODY_CHUNK_SIZE = 16 * 1024
+
+# Worker processes; more than 1 enables prefork mode
+SERVER_PROCESSES = int(os.getenv("SERVER_PROCESSES", 1))
+
+# Give each worker process its own SO_REUSEPORT socket instead of sharing one
+SERVER_REUSEPORT = os.getenv("SERVER_REUSEPORT", "false").lower() == "true"
+
+# Seconds to wait for in-flight requests on shutdown
+SERVER_DRAIN_TIMEOUT = float(os.getenv("SERVER_DRAIN_TIMEOUT", 10))
+
+HEALTH_PATHS = ("/health",)
+
+
+class RequestBodyError(Exception):
+    """A request body that was refused; ``status`` is the HTTP status to send."""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+def is_health_request_line(line: bytes) -> bool:
+    """Whether an HTTP request line is a GET of one of ``HEALTH_PATHS``."""
+    parts = line.split(b" ", 2)
+    if len(parts) < 2 or parts[0] != b"GET":
+        return False
+    path = parts[1].split(b"?", 1)[0].decode("latin-1")
+    return path in HEALTH_PATHS
+
+
+class KeepAliveRequestHandler(BaseHTTPRequestHandler):
+    """HTTP/1.1 request handler whose responses always carry a length.
+
+    Subclasses write responses with ``send_body`` or, for streams,
+    ``start_chunked``/``write_chunk``/``end_chunked`` so the connection can
+    be reused for the next request. ``request_started``/``request_finished``
+    are hooks around every parsed request, for instrumentation.
+    """
+
+    protocol_version = "HTTP/1.1"
+
+    # Headers and body go out in separate writes; with Nagle's algorithm
+    # the body would wait for the client's delayed ACK (~40 ms)
+    disable_nagle_algorithm = True
+
+    # Socket timeout while waiting for the next request on the connection
+    timeout = SERVER_KEEPALIVE_TIMEOUT
+
+    def handle_one_request(self):
+        """Handle one request, telling the server while the connection is idle."""
+        if self.connection is not None:
+            self.connection.settimeout(self.timeout)
+        self.server_hook("mark_idle")
+        self.started_at = None
+        self.response_status = 0
+        self.response_bytes = 0
+        self.request_bytes = 0
+        try:
+            super().handle_one_request()
+        finally:
+            if self.started_at is not None:
+                self.request_finished(time.perf_counter() - self.started_at)
+
+    def parse_request(self) -> bool:
+        """Parse the request and switch the socket to the in-request timeout."""
+        self.server_hook("mark_busy")
+        if self.connection is not None:
+            self.connection.settimeout(SERVER_REQUEST_TIMEOUT)
+        ok = super().parse_request()
+        should_close = getattr(self.server, "should_close", None)
+        if should_close is not None and should_close(self.connection):
+            # Draining, every worker is busy or this is the health lane:
+            # don't hold a worker for an idle keep-alive connection after
+            # this response
+            self.close_connection = True
+        if ok:
+            self.started_at = time.perf_counter()
+            self.request_started()
+        return ok
+
+    def read_body(self, max_bytes: Optional[int] = None, timeout: Optional[float] = None) -> bytearray:
+        """Read the request body into a buffer sized once from ``Content-Length``.
+
+        Raises ``RequestBodyError`` with 411 when there is no length, 413
+        (before reading anything) when it exceeds ``max_bytes``, and 408 when
+        the whole body has not arrived within ``timeout`` seconds (defaults:
+        ``SERVER_MAX_BODY_BYTES`` and ``SERVER_BODY_TIMEOUT``). The
+        connection is closed after any of these, since the rest of the body
+        is left unread.
+        """
+        max_bytes = SERVER_MAX_BODY_BYTES if max_bytes is None else max_bytes
+        timeout = SERVER_BODY_TIMEOUT if timeout is None else timeout
+        try:
+            if self.headers.get("Transfer-Encoding", "identity").lower() != "identity":
+                raise RequestBodyError(411, "Chunked request bodies are not supported; send Content-Length")
+            raw_length = self.headers.get("Content-Length")
+            if raw_length is None:
+                raise RequestBodyError(411, "Content-Length required")
+            try:
+                length = int(raw_length)
+            except ValueError:
+                raise RequestBodyError(400, "Invalid Content-Length")
+            if length < 0:
+                raise RequestBodyError(400, "Invalid Content-Length")
+            if length > max_bytes:
+                raise RequestBodyError(413, f"Request body exceeds {max_bytes} bytes")
+
+            buffer = bytearray(length)
+            view = memoryview(buffer)
+            deadline = time.monotonic() + timeout
+            while self.request_bytes < length:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise RequestBodyError(408, "Request body not received in time")
+                if self.connection is not None:
+                    # Bound the whole body, not each read, so a slow drip
+                    # cannot hold the worker indefinitely
+                    self.connection.settimeout(remaining)
+                try:
+                    # readinto1 makes at most one socket read per deadline check
+                    received = self.rfile.readinto1(
+                        view[self.request_bytes:self.request_bytes + BODY_CHUNK_SIZE]
+                    )
+                except socket.timeout:
+                    raise RequestBodyError(408, "Request body not received in time")
+                if not received:
+                    raise RequestBodyError(400, "Request body ended early")
+                self.request_bytes += received
+            return buffer
+        except RequestBodyError:
+            self.close_connection = True
+            raise
+        finally:
+            if self.connection is not None:
+                self.connection.settimeout(SERVER_REQUEST_TIMEOUT)
+
+    def request_started(self):
+        """Called once a request line and headers have been parsed."""
+
+    def request_finished(self, duration: float):
+        """Called after the response to a parsed request, with its duration."""
+
+    def log_request(self, code="-", size="-"):
+        """Remember the response status (``send_response`` reports it here)."""
+        if isinstance(code, int):
+            self.response_status = code
+        super().log_request(code, size)
+
+    def end_headers(self):
+        """Advertise ``Connection: close`` when this is the last response."""
+        if self.close_connection and self.request_version != "HTTP/0.9":
+            self.send_header("Connection", "close")
+        super().end_headers()
+
+    def send_body(self, status: int, content_type: str, body: bytes, headers: Optional[dict] = None):
+        """Send a complete response with ``Content-Length``."""
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(body)
+            self.response_bytes += len(body)
+
+    def send_precompiled(self, response):
+        """Send a ``PrecompiledResponse``, or 304 if the client's copy is current."""
+        if response.matches(self.headers.get("If-None-Match")):
+            self.send_response(304)
+            self.send_header("ETag", response.select(self.headers.get("Accept-Encoding")).etag)
+            self.send_header("Cache-Control", response.cache_control)
+            self.send_header("Vary", "Accept-Encoding")
+            self.end_headers()
+            return
+
+        variant = response.select(self.headers.get("Accept-Encoding"))
+        self.send_response(200)
+        self.send_header("Content-Type", response.content_type)
+        self.send_header("Content-Length", variant.length)
+        if variant.encoding != "identity":
+            self.send_header("Content-Encoding", variant.encoding)
+        self.send_header("ETag", variant.etag)
+        self.send_header("Cache-Control", response.cache_control)
+        self.send_header("Vary", "Accept-Encoding")
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(variant.body)
+            self.response_bytes += len(variant.body)
+
+    def start_chunked(self, status: int, content_type: str, headers: Optional[dict] = None):
+        """Start a streamed response.
+
+        HTTP/1.1 clients get ``Transfer-Encoding: chunked`` and keep their
+        connection; older clients get a raw stream ended by closing it.
+        """
+        self._chunked = self.request_version == "HTTP/1.1"
+        if not self._chunked:
+            self.close_connection = True
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        if self._chunked:
+            self.send_header("Transfer-Encoding", "chunked")
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+
+    def write_chunk(self, data: bytes):
+        """Write and flush one piece of a streamed response."""
+        if not data:
+            return
+        self.response_bytes += len(data)
+        if self._chunked:
+            self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+        else:
+            self.wfile.write(data)
+        self.wfile.flush()
+
+    def end_chunked(self):
+        """Finish a streamed response."""
+        if self._chunked:
+            self.wfile.write(b"0\r\n\r\n")
+        self.wfile.flush()
+
+    def server_hook(self, name: str):
+        hook = getattr(self.server, name, None)
+        if hook is not None and self.connection is not None:
+            hook(self.connection)
+
+
+class PooledHTTPServer(HTTPServer):
+    """HTTPServer that runs connections on a bounded thread pool."""
+
+    allow_reuse_address = True
+
+    def __init__(
+        self,
+        server_address: Tuple[str, int],
+        handler_class,
+        workers: int = SERVER_WORKERS,
+        health_workers: int = SERVER_HEALTH_WORKERS,
+        bind_and_activate: bool = True,
+        sock: Optional[socket.socket] = None,
+    ):
+        super().__init__(server_address, handler_class, bind_and_activate=False)
+        if sock is not None:
+            # Listening socket inherited from a prefork supervisor
+            self.socket.close()
+            self.socket = sock
+            self.server_address = sock.getsockname()
+        elif bind_and_activate:
+            try:
+                self.server_bind()
+                self.server_activate()
+            except BaseException:
+                self.server_close()
+                raise
+        self.workers = workers
+        self.draining = False
+        self._executor = ThreadPoolExecutor(workers, thread_name_prefix="http-worker")
+        self._health_executor = ThreadPoolExecutor(health_workers, thread_name_prefix="http-health")
+        self._lock = threading.Lock()
+        self._futures: Set = set()
+        self._idle: Set[socket.socket] = set()
+        self._health: Set[socket.socket] = set()
+        self._active = 0
+
+        # Connections accepted before their first request line arrived wait
+        # here, without a worker, until they can be classified
+        self._selector = selectors.DefaultSelector()
+        self._arrivals: List[Tuple[socket.socket, Tuple]] = []
+        self._wakeup_r, self._wakeup_w = socket.socketpair()
+        self._wakeup_r.setblocking(False)
+        self._selector.register(self._wakeup_r, selectors.EVENT_READ)
+        self._watcher = threading.Thread(
+            target=self._watch_arrivals, name="http-dispatch", daemon=True
+        )
+        self._watcher.start()
+
+    def process_request(self, request, client_address):
+        """Dispatch the connection to the health lane or the worker pool."""
+        with self._lock:
+            self._active += 1
+        lane = self._classify(request)
+        if lane is not None:
+            self._submit(lane, request, client_address)
+            return
+        with self._lock:
+            self._arrivals.append((request, client_address))
+        self._wakeup_w.send(b"\0")
+
+    def _classify(self, request) -> Optional[Executor]:
+        """Peek at the request line: the health lane, the worker pool, or None if not sent yet."""
+        flags = getattr(socket, "MSG_DONTWAIT", 0)
+        if not flags:
+            return self._executor
+        try:
+            head = request.recv(128, socket.MSG_PEEK | flags)
+        except BlockingIOError:
+            return None
+        except OSError:
+            return self._executor
+        if is_health_request_line(head.split(b"\r\n", 1)[0]):
+            return self._health_executor
+        return self._executor
+
+    def _submit(self, executor: Executor, request, client_address):
+        if executor is self._health_executor:
+            with self._lock:
+                self._health.add(request)
+        future = executor.submit(self._process, request, client_address)
+        with self._lock:
+            self._futures.add(future)
+        future.add_done_callback(self._forget)
+
+    def _watch_arrivals(self):
+        while True:
+            for key, _ in self._selector.select(timeout=0.5):
+                if key.fileobj is self._wakeup_r:
+                    try:
+                        self._wakeup_r.recv(4096)
+                    except OSError:
+                        pass
+                    continue
+                request, client_address, _ = key.data
+                self._selector.unregister(request)
+                self._submit(self._classify(request) or self._executor, request, client_address)
+
+            with self._lock:
+                arrivals, self._arrivals = self._arrivals, []
+            deadline = time.monotonic() + SERVER_KEEPALIVE_TIMEOUT
+            for request, client_address in arrivals:
+                self._selector.register(
+                    request, selectors.EVENT_READ, (request, client_address, deadline)
+                )
+
+            # Drop connections that never sent a request
+            now = time.monotonic()
+            for key in list(self._selector.get_map().values()):
+                if key.data is not None and (self.draining or key.data[2] <= now):
+                    self._selector.unregister(key.fileobj)
+                    with self._lock:
+                        self._active -= 1
+                    self.shutdown_request(key.fileobj)
+            if self.draining and not self._selector.get_map().keys() - {self._wakeup_r.fileno()}:
+                return
+
+    def _process(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            with self._lock:
+                self._active -= 1
+                self._idle.discard(request)
+                self._health.discard(request)
+            self.shutdown_request(request)
+
+    def _forget(self, future):
+        with self._lock:
+            self._futures.discard(future)
+
+    def should_close(self, connection=None) -> bool:
+        """Whether the current response should end its connection.
+
+        Health-lane connections were classified by their first request only,
+        so they always close after it.
+        """
+        return self.draining or self._active > self.workers or connection in self._health
+
+    def mark_idle(self, connection):
+        with self._lock:
+            self._idle.add(connection)
+        if self.draining:
+            self._close_idle()
+
+    def mark_busy(self, connection):
+        with self._lock:
+            self._idle.discard(connection)
+
+    def begin_drain(self):
+        """Stop accepting and close idle keep-alive connections (thread-safe)."""
+        self.draining = True
+        threading.Thread(target=self.shutdown, daemon=True).start()
+
+    def drain(self, timeout: float = SERVER_DRAIN_TIMEOUT):
+        """Wait for in-flight requests after ``serve_forever`` returned."""
+        self.draining = True
+        self._close_idle()
+        with self._lock:
+            pending = set(self._futures)
+        wait(pending, timeout=timeout)
+        self._wakeup_w.send(b"\0")
+        self._watcher.join(timeout=1)
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self._health_executor.shutdown(wait=False, cancel_futures=True)
+        self.server_close()
+
+    def _close_idle(self):
+        with self._lock:
+            idle = list(self._idle)
+        for connection in idle:
+            try:
+                connection.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+
+class _LoopWriter(io.RawIOBase):
+    """File-like writer that hands bytes from a worker thread to the event loop."""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, writer: asyncio.StreamWriter):
+        self._loop = loop
+        self._writer = writer
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        # Wait for the transport to drain, so a slow client applies
+        # backpressure to the handler instead of buffering unboundedly
+        asyncio.run_coroutine_threadsafe(self._write(data), self._loop).result(
+            SERVER_REQUEST_TIMEOUT
+        )
+        return len(data)
+
+    async def _write(self, data: bytes):
+        self._writer.write(data)
+        await self._writer.drain()
+
+
+class AsyncioHTTPServer:
+    """Event-loop server that feeds complete requests to the handler class."""
+
+    def __init__(
+        self,
+        server_address: Tuple[str, int],
+        handler_class,
+        workers: int = SERVER_WORKERS,
+        sock: Optional[socket.socket] = None,
+    ):
+        self.server_address = server_address
+        self.RequestHandlerClass = handler_class
+        self.workers = workers
+        self.draining = False
+        self._sock = sock
+        self._executor = ThreadPoolExecutor(workers, thread_name_prefix="http-worker")
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._stop: Optional[asyncio.Event] = None
+        self._connections: Set[asyncio.Task] = set()
+        self._idle: Set[asyncio.Task] = set()
+        self._active = 0
+
+    def serve_forever(self):
+        asyncio.run(self._serve())
+
+    def should_close(self, connection=None) -> bool:
+        return self.draining
+
+    def begin_drain(self):
+        """Stop accepting and start draining (thread-safe)."""
+        self.draining = True
+        if self._loop is not None and self._stop is not None:
+            self._loop.call_soon_threadsafe(self._stop.set)
+
+    def drain(self, timeout: float = SERVER_DRAIN_TIMEOUT):
+        """Draining happens inside ``serve_forever``; nothing left to do."""
+
+    async def _serve(self):
+        self._loop = asyncio.get_running_loop()
+        self._stop = asyncio.Event()
+        if self._sock is not None:
+            server = await asyncio.start_server(self._handle_connection, sock=self._sock)
+        else:
+            host, port = self.server_address
+            server = await asyncio.start_server(
+                self._handle_connection, host or None, port, reuse_address=True
+            )
+        async with server:
+            await self._stop.wait()
+            self.draining = True
+            server.close()
+            for task in list(self._idle):
+                task.cancel()
+            if self._connections:
+                await asyncio.wait(set(self._connections), timeout=SERVER_DRAIN_TIMEOUT)
+            for task in list(self._connections):
+                task.cancel()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        task = asyncio.current_task()
+        self._connections.add(task)
+        client_address = writer.get_extra_info("peername") or ("", 0)
+        try:
+            while not self.draining:
+                self._idle.add(task)
+                try:
+                    head = await asyncio.wait_for(
+                        reader.readuntil(b"\r\n\r\n"), SERVER_KEEPALIVE_TIMEOUT
+                    )
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, asyncio.TimeoutError):
+                    break
+                finally:
+                    self._idle.discard(task)
+
+                body = b""
+                length = _content_length(head)
+                if length > SERVER_MAX_BODY_BYTES:
+                    # Refuse before buffering any of it
+                    writer.write(_error_response(413, f"Request body exceeds {SERVER_MAX_BODY_BYTES} bytes"))
+                    await writer.drain()
+                    break
+                if length:
+                    try:
+                        body = await asyncio.wait_for(
+                            reader.readexactly(length), SERVER_BODY_TIMEOUT
+                        )
+                    except asyncio.TimeoutError:
+                        writer.write(_error_response(408, "Request body not received in time"))
+                        await writer.drain()
+                        break
+                    except asyncio.IncompleteReadError:
+                        break
+
+                raw = head + body
+                if is_health_request_line(head.split(b"\r\n", 1)[0]):
+                    # Health checks are answered on the loop; they never wait for a worker
+                    output = io.BytesIO()
+                    handler = self._run_handler(raw, output, client_address)
+                    writer.write(output.getvalue())
+                    await writer.drain()
+                else:
+                    self._active += 1
+                    try:
+                        handler = await self._loop.run_in_executor(
+                            self._executor,
+                            self._run_handler,
+                            raw,
+                            _LoopWriter(self._loop, writer),
+                            client_address,
+                        )
+                    finally:
+                        self._active -= 1
+                if handler.close_connection:
+                    break
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            self._connections.discard(task)
+            writer.close()
+
+    def _run_handler(self, raw: bytes, wfile, client_address):
+        handler = self.RequestHandlerClass.__new__(self.RequestHandlerClass)
+        handler.server = self
+        handler.client_address = client_address
+        handler.connection = None
+        handler.request = None
+        handler.rfile = io.BytesIO(raw)
+        handler.wfile = wfile
+        handler.close_connection = True
+        try:
+            handler.handle_one_request()
+            handler.wfile.flush()
+        except Exception:
+            handler.close_connection = True
+        return handler
+
+
+def _content_length(head: bytes) -> int:
+    for line in head.split(b"\r\n")[1:]:
+        name, _, value = line.partition(b":")
+        if name.strip().lower() == b"content-length":
+            try:
+                return max(0, int(value.strip()))
+            except ValueError:
+                return 0
+    return 0
+
+
+def _error_response(status: int, message: str) -> bytes:
+    """A complete JSON error response that closes the connection."""
+    body = json.dumps({"detail": message}).encode()
+    reason = BaseHTTPRequestHandler.responses.get(status, ("",))[0]
+    head = (
+        f"HTTP/1.1 {status} {reason}\r\n"
+        "Content-Type: application/json\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        "Connection: close\r\n\r\n"
+    )
+    return head.encode("latin-1") + body
+
+
+def make_server(
+    address: Tuple[str, int],
+    handler_class,
+    mode: str = SERVER_MODE,
+    workers: int = SERVER_WORKERS,
+    sock: Optional[socket.socket] = None,
+):
+    """Build a server for ``mode`` ("threaded" or "asyncio"), optionally on an existing socket."""
+    if mode == "asyncio":
+        return AsyncioHTTPServer(address, handler_class, workers, sock=sock)
+    if mode != "threaded":
+        raise ValueError(f"Unknown SERVER_MODE: {mode}")
+    return PooledHTTPServer(address, handler_class, workers, sock=sock)
+
+
+def serve(server):
+    """Serve until SIGTERM/SIGINT, then drain in-flight requests."""
+    def _stop(signum, frame):
+        server.begin_drain()
+
+    if threading.current_thread() is threading.main_thread():
+        signal.signal(signal.SIGTERM, _stop)
+        signal.signal(signal.SIGINT, _stop)
+    try:
+        server.serve_forever()
+    finally:
+        server.drain(SERVER_DRAIN_TIMEOUT)
+
+
+def listen(address: Tuple[str, int], reuse_port: bool = False, backlog: int = 1024) -> socket.socket:
+    """Open a listening TCP socket, optionally with ``SO_REUSEPORT``."""
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    if reuse_port:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+    sock.bind(address)
+    sock.listen(backlog)
+    return sock
+
+
+class PreforkSupervisor:
+    """Run the server in several worker processes that share one port.
+
+    By default the supervisor opens the listening socket and the forked
+    workers inherit it; with ``reuse_port`` each worker binds its own
+    ``SO_REUSEPORT`` socket and the kernel spreads connections across them.
+    Crashed workers are restarted (with backoff if they keep crashing at
+    startup). Workers publish metrics snapshots to a shared directory so any
+    worker can serve the aggregate at ``/metrics``.
+    """
+
+    def __init__(
+        self,
+        address: Tuple[str, int],
+        handler_class,
+        processes: int = SERVER_PROCESSES,
+        mode: str = SERVER_MODE,
+        workers: int = SERVER_WORKERS,
+        reuse_port: bool = SERVER_REUSEPORT,
+    ):
+        if not hasattr(os, "fork"):
+            raise RuntimeError("Prefork serving needs os.fork")
+        if reuse_port and not hasattr(socket, "SO_REUSEPORT"):
+            raise RuntimeError("SO_REUSEPORT is not available on this platform")
+        self.address = address
+        self.handler_class = handler_class
+        self.processes = processes
+        self.mode = mode
+        self.workers = workers
+        self.reuse_port = reuse_port
+        self.children: Dict[int, float] = {}
+        self.metrics_dir: Optional[str] = None
+        self._sock: Optional[socket.socket] = None
+        self._stopping = False
+        self._crashes = 0
+
+    def run(self, on_started: Optional[Callable[[], None]] = None):
+        """Start the workers and supervise them until SIGTERM/SIGINT.
+
+        ``on_started`` is called in the supervisor once the workers are
+        forked, so threads it starts are never inherited by a worker.
+        """
+        self.metrics_dir = tempfile.mkdtemp(prefix="faith-metrics-")
+        if not self.reuse_port:
+            self._sock = listen(self.address)
+
+        signal.signal(signal.SIGTERM, self._stop)
+        signal.signal(signal.SIGINT, self._stop)
+        try:
+            for _ in range(self.processes):
+                self._spawn()
+            if on_started is not None:
+                on_started()
+            self._supervise()
+        finally:
+            if self._sock is not None:
+                self._sock.close()
+            shutil.rmtree(self.metrics_dir, ignore_errors=True)
+
+    def _stop(self, signum, frame):
+        self._stopping = True
+        self._stop_deadline = time.monotonic() + SERVER_DRAIN_TIMEOUT + 5
+        for pid in list(self.children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    def _spawn(self):
+        sys.stdout.flush()
+        sys.stderr.flush()
+        pid = os.fork()
+        if pid == 0:
+            self._run_worker()
+        self.children[pid] = time.monotonic()
+
+    def _run_worker(self):
+        code = 0
+        try:
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            sock = self._sock or listen(self.address, reuse_port=True)
+            server = make_server(self.address, self.handler_class, self.mode, self.workers, sock=sock)
+            METRICS.share_via(self.metrics_dir)
+            serve(server)
+            METRICS.publish()
+        except BaseException:
+            traceback.print_exc()
+            code = 1
+        finally:
+            sys.stdout.flush()
+            sys.stderr.flush()
+            os._exit(code)
+
+    def _supervise(self):
+        while self.children:
+            pid, status = os.waitpid(-1, os.WNOHANG)
+            if pid == 0:
+                if self._stopping and time.monotonic() > self._stop_deadline:
+                    for child in list(self.children):
+                        try:
+                            os.kill(child, signal.SIGKILL)
+                        except ProcessLookupError:
+                            pass
+                time.sleep(0.2)
+                continue
+
+            started = self.children.pop(pid, None)
+            if started is None:
+                continue
+            retire_snapshot(self.metrics_dir, pid)
+            if self._stopping:
+                continue
+
+            # A worker died without being asked to: replace it
+            if time.monotonic() - started < 5:
+                self._crashes += 1
+                time.sleep(min(30.0, 0.5 * 2 ** min(self._crashes, 6)))
+            else:
+                self._crashes = 0
+            print(f"Worker {pid} exited ({os.waitstatus_to_exitcode(status)}); restarting", file=sys.stderr)
+            self._spawn()
@@ -0,0 +1,258 @@
+"""Rolling session summaries that keep generation prompts a bounded size.
+
+Without a summary, every turn would resend the whole conversation, so
+prompt tokens (and generation latency) would grow with session length.
+Instead each FaithChatbot-ConversationSessions item keeps:
+
+- ``session_summary``: a short running summary of older turns;
+- ``message_count``: messages in the session;
+- ``summarized_count``: how many of the oldest messages the summary covers.
+
+The prompt is the summary plus the turns it does not cover yet. Once
+``SESSION_SUMMARY_EVERY_TURNS`` turns have accumulated beyond the last
+``PROMPT_RECENT_TURNS``, ``RollingSummarizer.fold`` folds those older turns
+into the summary in one step. The prompt therefore always holds the
+summary plus between K and K + N - 1 recent turns, however long the
+session gets, and the summary is rewritten only once every N turns rather
+than every turn.
+
+``ChatPipeline.save_turn`` (``backend.chat_pipeline``) counts each saved
+turn and folds through the session repository when due; the summary write
+(``build_summary_update``) is conditional on the count it read.
+
+Folding is local and extractive by default (``ExtractiveSummarizer``: one
+short line per user message and per shared verse, oldest lines collapsed
+into an "Earlier" topic list past ``SESSION_SUMMARY_MAX_CHARS``), so it
+costs no model call. ``ModelSummarizer`` asks the generation client to
+rewrite the summary instead, falling back to the extractive fold on error.
+"""
+
+import os
+import re
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Sequence
+
+from faith_motivator_chatbot.backend.generation import GenerationError
+
+CONVERSATION_SESSIONS_TABLE = "FaithChatbot-ConversationSessions"
+
+# Turns (a user message and its reply) folded into the summary at a time
+SESSION_SUMMARY_EVERY_TURNS = int(os.getenv("SESSION_SUMMARY_EVERY_TURNS", 4))
+
+# Most recent turns always sent verbatim, never only as summary
+PROMPT_RECENT_TURNS = int(os.getenv("PROMPT_RECENT_TURNS", 3))
+
+# Longest summary kept; older lines collapse into a topic list past this
+SESSION_SUMMARY_MAX_CHARS = int(os.getenv("SESSION_SUMMARY_MAX_CHARS", 1200))
+
+# Output token limit when a model rewrites the summary
+SESSION_SUMMARY_MAX_TOKENS = int(os.getenv("SESSION_SUMMARY_MAX_TOKENS", 250))
+
+MESSAGES_PER_TURN = 2
+
+SYSTEM_PROMPT = (
+    "You are a compassionate Christian companion. Respond with warmth, "
+    "offer relevant Bible verses and one practical next step. Keep replies brief."
+)
+
+EARLIER_PREFIX = "Earlier: "
+
+# Topics kept in the "Earlier" line; the oldest are dropped first
+MAX_EARLIER_TOPICS = 12
+
+# Longest excerpt of a user message kept in a summary line
+EXCERPT_CHARS = 100
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s")
+
+
+class SessionSummary:
+    """The summary fields of one ConversationSessions item."""
+
+    __slots__ = ("session_id", "summary", "message_count", "summarized_count")
+
+    def __init__(self, session_id: str, summary: str = "", message_count: int = 0, summarized_count: int = 0):
+        self.session_id = session_id
+        self.summary = summary
+        self.message_count = message_count
+        self.summarized_count = summarized_count
+
+    @classmethod
+    def from_item(cls, item: Dict[str, Any]) -> "SessionSummary":
+        """Read the fields from a ConversationSessions item (missing ones default)."""
+        return cls(
+            item["session_id"],
+            item.get("session_summary", ""),
+            int(item.get("message_count", 0)),
+            int(item.get("summarized_count", 0)),
+        )
+
+    @property
+    def pending_count(self) -> int:
+        """Messages not yet covered by the summary."""
+        return self.message_count - self.summarized_count
+
+
+def _excerpt(text: str) -> str:
+    sentence = _SENTENCE_END.split(" ".join(text.split()), 1)[0]
+    if len(sentence) > EXCERPT_CHARS:
+        sentence = sentence[:EXCERPT_CHARS].rsplit(" ", 1)[0] + "..."
+    return sentence
+
+
+def summary_line(message: Dict[str, Any]) -> Optional[str]:
+    """The summary line for one history message, or None if it adds nothing."""
+    if message.get("role") == "user":
+        emotion = message.get("emotion_classification")
+        label = f"User ({emotion})" if emotion else "User"
+        return f"{label}: {_excerpt(message.get('content', ''))}"
+    references = message.get("biblical_references") or []
+    if references:
+        return "Shared " + ", ".join(references)
+    return None
+
+
+def _line_topic(line: str) -> Optional[str]:
+    if line.startswith("User ("):
+        return line[len("User ("):line.index(")")]
+    if line.startswith("Shared "):
+        return line[len("Shared "):]
+    return None
+
+
+class ExtractiveSummarizer:
+    """Local summary fold: one short line per message, bounded in length."""
+
+    def __init__(self, max_chars: int = SESSION_SUMMARY_MAX_CHARS):
+        self.max_chars = max_chars
+
+    def fold(self, summary: str, messages: Sequence[Dict[str, Any]]) -> str:
+        """Return ``summary`` updated with ``messages`` (oldest-first)."""
+        lines = summary.splitlines() if summary else []
+        topics: List[str] = []
+        if lines and lines[0].startswith(EARLIER_PREFIX):
+            topics = lines.pop(0)[len(EARLIER_PREFIX):].split("; ")
+        lines += [line for line in map(summary_line, messages) if line]
+
+        def length():
+            header = len(EARLIER_PREFIX) + len("; ".join(topics)) + 1 if topics else 0
+            return header + sum(len(line) + 1 for line in lines)
+
+        # Collapse the oldest lines into topics until the summary fits
+        while lines and length() > self.max_chars:
+            topic = _line_topic(lines.pop(0))
+            if topic and topic not in topics:
+                topics = (topics + [topic])[-MAX_EARLIER_TOPICS:]
+        if topics:
+            lines.insert(0, EARLIER_PREFIX + "; ".join(topics))
+        return "\n".join(lines)
+
+
+class ModelSummarizer:
+    """Summary fold written by the generation model."""
+
+    def __init__(
+        self,
+        client,
+        fallback: Optional[ExtractiveSummarizer] = None,
+        max_tokens: int = SESSION_SUMMARY_MAX_TOKENS,
+    ):
+        self.client = client
+        self.fallback = fallback or ExtractiveSummarizer()
+        self.max_tokens = max_tokens
+
+    def fold(self, summary: str, messages: Sequence[Dict[str, Any]]) -> str:
+        """Ask the model for an updated summary; fold locally if it fails."""
+        prompt = (
+            "Update this summary of a conversation with the new messages below. "
+            "Keep the user's situation, feelings, prayer needs and the verses already "
+            f"shared. Answer with the summary only, in under {self.max_tokens} tokens.\n\n"
+            f"Summary:\n{summary or '(none yet)'}\n\nNew messages:\n{format_turns(messages)}"
+        )
+        try:
+            return self.client.generate(prompt, max_tokens=self.max_tokens).text.strip()
+        except GenerationError:
+            return self.fallback.fold(summary, messages)
+
+
+def format_turns(messages: Sequence[Dict[str, Any]]) -> str:
+    """Render history messages as "User: ..." / "Assistant: ..." lines."""
+    return "\n".join(
+        f"{'User' if message.get('role') == 'user' else 'Assistant'}: {message.get('content', '')}"
+        for message in messages
+    )
+
+
+class RollingSummarizer:
+    """Decides when to fold turns into the summary and builds prompts from it."""
+
+    def __init__(
+        self,
+        summarizer=None,
+        every_turns: int = SESSION_SUMMARY_EVERY_TURNS,
+        recent_turns: int = PROMPT_RECENT_TURNS,
+    ):
+        self.summarizer = summarizer or ExtractiveSummarizer()
+        self.every_messages = every_turns * MESSAGES_PER_TURN
+        self.recent_messages = recent_turns * MESSAGES_PER_TURN
+
+    def should_fold(self, session: SessionSummary) -> bool:
+        """Whether enough turns have built up beyond the recent window."""
+        return session.pending_count >= self.recent_messages + self.every_messages
+
+    def fold(self, session: SessionSummary, pending: Sequence[Dict[str, Any]]) -> SessionSummary:
+        """Fold all but the recent window of ``pending`` into the summary.
+
+        ``pending`` is every message the summary does not cover yet,
+        oldest-first. Returns the updated summary state (``session`` itself
+        is not changed).
+        """
+        folded = max(0, len(pending) - self.recent_messages)
+        if not folded:
+            return session
+        # Counted from the end: if the oldest uncovered messages were not
+        # fetched, they are skipped rather than miscounted
+        return SessionSummary(
+            session.session_id,
+            self.summarizer.fold(session.summary, pending[:folded]),
+            session.message_count,
+            session.message_count - (len(pending) - folded),
+        )
+
+    def build_prompt(
+        self,
+        session: SessionSummary,
+        pending: Sequence[Dict[str, Any]],
+        user_message: str,
+        verses: Sequence[Dict[str, str]] = (),
+        system: str = SYSTEM_PROMPT,
+    ) -> str:
+        """The generation prompt: summary, uncovered turns, verses and the new message."""
+        parts = [system]
+        if session.summary:
+            parts.append(f"Conversation so far (summary):\n{session.summary}")
+        if pending:
+            parts.append(f"Recent messages:\n{format_turns(pending)}")
+        if verses:
+            parts.append("Relevant verses:\n" + "\n".join(f"{v['reference']} - {v['text']}" for v in verses))
+        parts.append(f"User: {user_message}\nAssistant:")
+        return "\n\n".join(parts)
+
+
+def build_summary_update(session: SessionSummary, previous_summarized_count: int) -> Dict[str, Any]:
+    """Build ``Table.update_item`` kwargs saving a folded summary.
+
+    The write is conditional on ``summarized_count`` being unchanged since
+    it was read, so two concurrent folds of the same turns cannot both land.
+    """
+    return {
+        "Key": {"session_id": session.session_id},
+        "UpdateExpression": "SET session_summary = :summary, summarized_count = :count, updated_at = :now",
+        "ConditionExpression": "attribute_not_exists(summarized_count) OR summarized_count = :previous",
+        "ExpressionAttributeValues": {
+            ":summary": session.summary,
+            ":count": session.summarized_count,
+            ":previous": previous_summarized_count,
+            ":now": datetime.now(timezone.utc).isoformat(),
+        },
+    }
@@ -0,0 +1,110 @@
+"""Response bodies built once and served as pre-encoded byte buffers.
+
+A ``PrecompiledResponse`` holds the identity body plus gzip and (when the
+optional ``brotli`` package is installed) brotli variants, each with its
+own strong ETag. Serving one is a header lookup and a buffer write:
+
+- ``select`` picks the best variant the client's ``Accept-Encoding``
+  allows, falling back to identity;
+- ``matches`` answers a conditional GET's ``If-None-Match`` so the caller
+  can reply ``304 Not Modified`` with no body.
+"""
+
+import gzip
+import hashlib
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import brotli
+except ImportError:  # Optional: pip install brotli
+    brotli = None
+
+# Preferred order when the client accepts several encodings equally
+_ENCODING_PREFERENCE = ("br", "gzip", "identity")
+
+
+class Variant:
+    """One encoded representation of a precompiled body."""
+
+    __slots__ = ("encoding", "body", "etag", "length")
+
+    def __init__(self, encoding: str, body: bytes, etag: str):
+        self.encoding = encoding
+        self.body = body
+        self.etag = etag
+        self.length = str(len(body))
+
+
+class PrecompiledResponse:
+    """An immutable body with precomputed encodings, ETags and headers."""
+
+    def __init__(self, body: bytes, content_type: str, cache_control: str = "no-cache"):
+        self.content_type = content_type
+        self.cache_control = cache_control
+
+        digest = hashlib.sha256(body).hexdigest()[:32]
+        self.variants: Dict[str, Variant] = {
+            "identity": Variant("identity", body, f'"{digest}"'),
+        }
+        encoded = [("gzip", gzip.compress(body, compresslevel=9, mtime=0))]
+        if brotli is not None:
+            encoded.append(("br", brotli.compress(body, quality=11)))
+        for encoding, compressed in encoded:
+            # Only keep encodings that actually save bytes
+            if len(compressed) < len(body):
+                self.variants[encoding] = Variant(encoding, compressed, f'"{digest}-{encoding}"')
+        self._etags = {variant.etag for variant in self.variants.values()}
+
+    @property
+    def body(self) -> bytes:
+        return self.variants["identity"].body
+
+    def select(self, accept_encoding: Optional[str]) -> Variant:
+        """Pick the variant to send for an ``Accept-Encoding`` header value."""
+        accepted = parse_accept_encoding(accept_encoding)
+        best: Optional[Tuple[float, int, Variant]] = None
+        for rank, encoding in enumerate(_ENCODING_PREFERENCE):
+            variant = self.variants.get(encoding)
+            if variant is None:
+                continue
+            quality = accepted.get(encoding, accepted.get("*", 1.0 if encoding == "identity" else 0.0))
+            if quality <= 0:
+                continue
+            if best is None or (quality, -rank) > (best[0], -best[1]):
+                best = (quality, rank, variant)
+        return best[2] if best else self.variants["identity"]
+
+    def matches(self, if_none_match: Optional[str]) -> bool:
+        """Whether an ``If-None-Match`` header matches any variant's ETag."""
+        if not if_none_match:
+            return False
+        for tag in _split_header(if_none_match):
+            if tag == "*":
+                return True
+            # If-None-Match uses weak comparison
+            if tag.startswith("W/"):
+                tag = tag[2:]
+            if tag in self._etags:
+                return True
+        return False
+
+
+def parse_accept_encoding(header: Optional[str]) -> Dict[str, float]:
+    """Map each encoding in an ``Accept-Encoding`` header to its q-value."""
+    accepted: Dict[str, float] = {}
+    for item in _split_header(header or ""):
+        encoding, _, params = item.partition(";")
+        quality = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        accepted[encoding.strip().lower()] = quality
+    return accepted
+
+
+def _split_header(value: str) -> List[str]:
+    return [part.strip() for part in value.split(",") if part.strip()]
@@ -0,0 +1,186 @@
+"""Local semantic verse retrieval over a precomputed embedding matrix.
+
+Verses and queries are embedded with signed feature hashing: stemmed
+words, adjacent word pairs and "concept" features are hashed into
+``EMBEDDING_DIM`` buckets, weighted by sublinear term frequency times the
+corpus IDF, and L2-normalised. Concept features come from the emotion
+lexicon (``backend.emotion``), so "stressed about my job" and "do not be
+anxious" share an ``anxiety`` feature even with no words in common;
+each verse also carries the concepts of the emotions it is filed under
+and the words of its theme.
+
+The verse matrix is built once. A query is one matrix-vector product
+followed by ``argpartition`` for the top ``k``, optionally restricted to
+verses filed under one emotion. Nothing is downloaded and nothing leaves
+the process.
+"""
+
+import math
+import os
+import re
+import threading
+import zlib
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+from faith_motivator_chatbot.backend.content_store import get_content_store
+from faith_motivator_chatbot.backend.emotion import EMOTION_LABELS, LEXICON
+
+# Hashed embedding width; memory is 4 bytes x width per verse
+EMBEDDING_DIM = int(os.getenv("VERSE_EMBEDDING_DIM", 256))
+
+# Weight of an emotion concept feature relative to a word
+CONCEPT_WEIGHT = 2.0
+
+# Weight of an adjacent word pair relative to a word
+PAIR_WEIGHT = 0.5
+
+_WORD = re.compile(r"[a-z]+(?:'[a-z]+)?")
+
+STOPWORDS = frozenset(
+    "a an and are as at be been but by do for from had has have he her him his i i'm if in "
+    "into is it its me my of on or our so that the their them then there they this to us was "
+    "we were what when which who will with you your".split()
+)
+
+# Lexicon word -> emotion labels it signals
+_CONCEPTS: Dict[str, List[str]] = {}
+for _label, _terms in LEXICON.items():
+    for _term in _terms:
+        if " " not in _term:
+            _CONCEPTS.setdefault(_term, []).append(_label)
+
+
+def stem(word: str) -> str:
+    """Strip common English suffixes so word forms share a feature."""
+    for suffix in ("ingly", "ing", "edly", "ied", "ed", "ies", "ly", "s"):
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+            return word[: -len(suffix)] + ("y" if suffix in ("ied", "ies") else "")
+    return word
+
+
+def features(text: str, emotions: Iterable[str] = ()) -> Dict[str, float]:
+    """Weighted features of ``text`` plus concept features for ``emotions``."""
+    weights: Dict[str, float] = {}
+    words = [w for w in _WORD.findall(text.lower().replace("’", "'")) if w not in STOPWORDS]
+    stems = [stem(w) for w in words]
+    for word, stemmed in zip(words, stems):
+        weights[stemmed] = weights.get(stemmed, 0.0) + 1.0
+        for label in _CONCEPTS.get(word, ()):
+            key = f"@{label}"
+            weights[key] = weights.get(key, 0.0) + CONCEPT_WEIGHT
+    for first, second in zip(stems, stems[1:]):
+        key = f"{first} {second}"
+        weights[key] = weights.get(key, 0.0) + PAIR_WEIGHT
+    for label in emotions:
+        key = f"@{label}"
+        weights[key] = weights.get(key, 0.0) + CONCEPT_WEIGHT
+    # Sublinear term frequency: repeating a word helps, but not linearly
+    return {key: 1.0 + math.log(value) if value > 1 else value for key, value in weights.items()}
+
+
+def _bucket(feature: str, dim: int):
+    digest = zlib.crc32(feature.encode("utf-8"))
+    # The top bit picks the sign so collisions tend to cancel rather than add up
+    return digest % dim, (1.0 if digest & 0x80000000 else -1.0)
+
+
+class VerseIndex:
+    """Embedded verse corpus searchable by message text and emotion."""
+
+    def __init__(self, verses: Sequence[Dict[str, str]], emotions: Sequence[Sequence[str]], dim: int = EMBEDDING_DIM):
+        """Embed ``verses``; ``emotions[i]`` lists the emotions verse ``i`` is filed under."""
+        self.verses = list(verses)
+        self.dim = dim
+        self._labels = {label: bit for bit, label in enumerate(EMOTION_LABELS)}
+        self.emotion_bits = np.zeros(len(self.verses), dtype=np.uint16)
+        for row, labels in enumerate(emotions):
+            for label in labels:
+                if label in self._labels:
+                    self.emotion_bits[row] |= 1 << self._labels[label]
+        self._rows_by_emotion = {
+            label: np.flatnonzero(self.emotion_bits & (1 << bit)) for label, bit in self._labels.items()
+        }
+
+        verse_features = [
+            features(f"{verse['text']} {verse.get('theme', '').replace('_', ' ')}", labels)
+            for verse, labels in zip(self.verses, emotions)
+        ]
+        document_frequency: Dict[str, int] = {}
+        for weights in verse_features:
+            for key in weights:
+                document_frequency[key] = document_frequency.get(key, 0) + 1
+        count = max(len(self.verses), 1)
+        self._idf = {key: math.log((1 + count) / (1 + df)) + 1.0 for key, df in document_frequency.items()}
+
+        self.matrix = np.zeros((len(self.verses), dim), dtype=np.float32)
+        for row, weights in enumerate(verse_features):
+            self.matrix[row] = self.embed_features(weights)
+
+    @classmethod
+    def from_content_store(cls, store, dim: int = EMBEDDING_DIM) -> "VerseIndex":
+        """Index every verse in a ``ContentStore``, merging verses filed under several emotions."""
+        by_reference: Dict[str, Dict[str, str]] = {}
+        labels: Dict[str, List[str]] = {}
+        for emotion in store.emotions():
+            for verse in store.verses(emotion):
+                by_reference.setdefault(verse["reference"], verse)
+                labels.setdefault(verse["reference"], []).append(emotion)
+        return cls(list(by_reference.values()), [labels[ref] for ref in by_reference], dim)
+
+    def embed_features(self, weights: Dict[str, float]) -> np.ndarray:
+        """Hash weighted features into one normalised vector."""
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for key, weight in weights.items():
+            index, sign = _bucket(key, self.dim)
+            vector[index] += sign * weight * self._idf[key]
+        norm = float(np.linalg.norm(vector))
+        return vector / norm if norm else vector
+
+    def embed(self, text: str) -> np.ndarray:
+        """Embed a query message.
+
+        Features that occur in no verse are dropped: they can only match
+        through hash collisions.
+        """
+        return self.embed_features({k: w for k, w in features(text).items() if k in self._idf})
+
+    def search(self, query: str, k: int = 3, emotion: Optional[str] = None, min_score: float = 0.0) -> List[Dict]:
+        """Top ``k`` verses by cosine similarity, best first, each with its ``score``.
+
+        With ``emotion``, only verses filed under that emotion are considered.
+        """
+        if not self.verses or k <= 0:
+            return []
+        scores = self.matrix @ self.embed(query)
+        rows = None
+        if emotion is not None:
+            rows = self._rows_by_emotion.get(emotion)
+            if rows is None or not len(rows):
+                return []
+            # Select among the emotion's rows only; masking the rest with
+            # -inf would leave argpartition sorting thousands of ties
+            scores = scores[rows]
+        k = min(k, len(scores))
+        top = np.argpartition(scores, -k)[-k:]
+        top = top[np.argsort(scores[top])[::-1]]
+        return [
+            {**self.verses[row if rows is None else rows[row]], "score": float(scores[row])}
+            for row in top
+            if scores[row] > min_score
+        ]
+
+
+_index: Optional[VerseIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_verse_index() -> VerseIndex:
+    """The process-wide index over the compiled content store."""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = VerseIndex.from_content_store(get_content_store())
+    return _index
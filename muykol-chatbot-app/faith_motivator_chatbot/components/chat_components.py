@@ -5,26 +5,27 @@ from faith_motivator_chatbot.state.chat_state import ChatState, Message
 from faith_motivator_chatbot.components.common import button, textarea_field, modal
 
 
+# Shared styling for the fixed-height chat scroll area
+MESSAGE_AREA_STYLE = {
+    "height": "400px",
+    "overflow_y": "auto",
+    "padding": "1rem",
+    "border": "1px solid",
+    "border_color": "gray.200",
+    "border_radius": "0.5rem",
+    "bg": "gray.50",
+    "margin_bottom": "1rem",
+}
+
+
 def chat_interface() -> rx.Component:
     """Main chat interface component."""
     return rx.vstack(
         # Chat messages area
-        rx.box(
-            rx.cond(
-                ChatState.messages,
-                rx.vstack(
-                    rx.foreach(
-                        ChatState.messages,
-                        message_bubble,
-                    ),
-                    rx.cond(
-                        ChatState.is_typing,
-                        typing_indicator(),
-                    ),
-                    spacing="1rem",
-                    align="stretch",
-                    width="100%",
-                ),
+        rx.cond(
+            ChatState.message_count > 0,
+            windowed_message_list(),
+            rx.box(
                 # Empty state
                 rx.vstack(
                     rx.icon(
@@ -50,15 +51,8 @@ def chat_interface() -> rx.Component:
                     justify="center",
                     height="300px",
                 ),
+                **MESSAGE_AREA_STYLE,
             ),
-            height="400px",
-            overflow_y="auto",
-            padding="1rem",
-            border="1px solid",
-            border_color="gray.200",
-            border_radius="0.5rem",
-            bg="gray.50",
-            margin_bottom="1rem",
         ),
         
         # Error message
@@ -81,13 +75,41 @@ def chat_interface() -> rx.Component:
         ),
         
         # Message input area
+        message_composer(),
+        
+        # Prayer connect modal
+        prayer_connect_modal(),
+        
+        spacing="0",
+        align="stretch",
+        width="100%",
+        max_width="800px",
+        margin="0 auto",
+        # Shown once signed in: render cached history, then sync newer messages
+        on_mount=ChatState.load_chat_history,
+    )
+
+
+def message_composer() -> rx.Component:
+    """Message input form whose draft stays in the browser.
+    
+    The textarea is uncontrolled: typing raises no backend events. The text
+    reaches ``ChatState.send_message`` as form data on submit, and the draft
+    is saved to state only when the field loses focus. The required textarea
+    makes the form ``:invalid`` while empty, which disables the Send button
+    purely in CSS. The composer stays usable while replies are pending;
+    messages queue up until ``ChatState.queue_full``.
+    """
+    return rx.form(
         rx.vstack(
             textarea_field(
                 placeholder="Type your message here... Share what's on your heart.",
-                value=ChatState.current_message,
-                on_change=ChatState.set_current_message,
+                name="message",
+                custom_attrs={"defaultValue": ChatState.current_message},
+                on_blur=ChatState.set_current_message,
+                enter_key_submit=True,
                 rows=3,
-                disabled=ChatState.is_sending or ChatState.is_typing,
+                required=True,
             ),
             
             rx.hstack(
@@ -97,7 +119,7 @@ def chat_interface() -> rx.Component:
                     size="md",
                     icon="heart",
                     on_click=ChatState.show_prayer_connect,
-                    disabled=ChatState.is_sending or ChatState.is_typing,
+                    disabled=ChatState.is_sending,
                 ),
                 rx.spacer(),
                 button(
@@ -105,9 +127,8 @@ def chat_interface() -> rx.Component:
                     variant="primary",
                     size="md",
                     icon="send",
-                    on_click=ChatState.send_message,
-                    loading=ChatState.is_sending,
-                    disabled=ChatState.is_sending or ChatState.is_typing or (ChatState.current_message.strip() == ""),
+                    type_="submit",
+                    disabled=ChatState.queue_full,
                 ),
                 justify="space-between",
                 align="center",
@@ -118,15 +139,97 @@ def chat_interface() -> rx.Component:
             align="stretch",
             width="100%",
         ),
-        
-        # Prayer connect modal
-        prayer_connect_modal(),
-        
-        spacing="0",
-        align="stretch",
+        on_submit=ChatState.send_message,
+        reset_on_submit=True,
+        width="100%",
+        style={
+            "&:invalid button[type='submit']": {
+                "opacity": "0.6",
+                "cursor": "not-allowed",
+                "pointer_events": "none",
+            },
+        },
+    )
+
+
+def windowed_message_list() -> rx.Component:
+    """Scrollable message list that only mounts the bubbles in the current window.
+    
+    Only the mounted window is rendered: ``ChatState.window_messages`` followed
+    by the short ``ChatState.live_messages`` tail that receives new and
+    streaming messages. The controls above and below slide the window through
+    the loaded history (fetching older pages when the top is reached). The
+    scroll box uses ``column-reverse`` so the browser anchors the viewport to
+    the bottom: new messages stay in view while following the conversation,
+    and content prepended above does not move what the user is reading.
+    """
+    return rx.box(
+        rx.vstack(
+            rx.cond(
+                ChatState.can_show_older,
+                load_older_button(),
+            ),
+            rx.foreach(
+                ChatState.window_messages,
+                message_bubble,
+            ),
+            rx.foreach(
+                ChatState.live_messages,
+                message_bubble,
+            ),
+            rx.cond(
+                ChatState.is_typing,
+                typing_indicator(),
+            ),
+            rx.cond(
+                ChatState.window_end_offset > 0,
+                jump_to_latest_button(),
+            ),
+            spacing="1rem",
+            align="stretch",
+            width="100%",
+        ),
+        display="flex",
+        flex_direction="column-reverse",
+        overflow_anchor="auto",
+        **MESSAGE_AREA_STYLE,
+    )
+
+
+def load_older_button() -> rx.Component:
+    """Control at the top of the chat that reveals earlier messages."""
+    return rx.center(
+        button(
+            "Show earlier messages",
+            variant="ghost",
+            size="sm",
+            on_click=ChatState.show_older_window,
+            loading=ChatState.is_loading_older,
+            disabled=ChatState.is_loading_older,
+        ),
+        width="100%",
+    )
+
+
+def jump_to_latest_button() -> rx.Component:
+    """Controls at the bottom of the chat while reading older messages."""
+    return rx.hstack(
+        button(
+            "Show newer messages",
+            variant="ghost",
+            size="sm",
+            on_click=ChatState.show_newer_window,
+        ),
+        button(
+            "Jump to latest",
+            variant="outline",
+            size="sm",
+            icon="arrow-down",
+            on_click=ChatState.jump_to_latest,
+        ),
+        spacing="0.5rem",
+        justify="center",
         width="100%",
-        max_width="800px",
-        margin="0 auto",
     )
 
 
@@ -179,6 +282,12 @@ def message_bubble(message: Message) -> rx.Component:
                 margin_top="0.5rem",
             ),
             
+            # Delivery status (for user messages)
+            rx.cond(
+                message.status,
+                delivery_status(message),
+            ),
+            
             spacing="0",
             align="start" if not is_user else "end",
             width="100%",
@@ -195,6 +304,32 @@ def message_bubble(message: Message) -> rx.Component:
     )
 
 
+def delivery_status(message: Message) -> rx.Component:
+    """Delivery status line shown under a user message."""
+    return rx.match(
+        message.status,
+        ("queued", rx.text("Queued", color="gray.300", font_size="0.75rem")),
+        ("sending", rx.text("Sending…", color="gray.300", font_size="0.75rem")),
+        ("delivered", rx.text("Delivered", color="gray.300", font_size="0.75rem")),
+        (
+            "failed",
+            rx.hstack(
+                rx.text("Not delivered", color="red.200", font_size="0.75rem"),
+                rx.link(
+                    "Retry",
+                    color="white",
+                    font_size="0.75rem",
+                    text_decoration="underline",
+                    on_click=ChatState.retry_message(message.id),
+                ),
+                spacing="0.5rem",
+                align="center",
+            ),
+        ),
+        rx.fragment(),
+    )
+
+
 def typing_indicator() -> rx.Component:
     """Typing indicator component."""
     return rx.box(
@@ -156,7 +156,7 @@ def input_field(
 
 def textarea_field(
     placeholder: str = "",
-    value: str = "",
+    value: Optional[str] = None,
     on_change: Optional[rx.EventHandler] = None,
     rows: int = 4,
     required: bool = False,
@@ -165,7 +165,11 @@ def textarea_field(
     label: Optional[str] = None,
     **props
 ) -> rx.Component:
-    """Accessible textarea field with validation styling."""
+    """Accessible textarea field with validation styling.
+    
+    Leave ``value`` unset for an uncontrolled field whose text stays in the
+    browser until its form is submitted.
+    """
     
     textarea_id = f"textarea-{rx.utils.format.to_snake_case(label or placeholder)}"
     
@@ -203,8 +207,8 @@ def textarea_field(
         ),
         rx.text_area(
             placeholder=placeholder,
-            value=value,
-            on_change=on_change,
+            **({"value": value} if value is not None else {}),
+            **({"on_change": on_change} if on_change is not None else {}),
             rows=rows,
             required=required,
             disabled=disabled,
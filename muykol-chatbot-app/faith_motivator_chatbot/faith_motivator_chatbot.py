@@ -7,6 +7,8 @@ from faith_motivator_chatbot.components.auth_components import login_modal
 from faith_motivator_chatbot.state.auth_state import AuthState
 from faith_motivator_chatbot.state.ui_state import UIState
 from faith_motivator_chatbot.components.common import button
+from faith_motivator_chatbot.services.http_client import http_client_lifespan
+from faith_motivator_chatbot.backend.repositories import database_lifespan
 
 
 def index() -> rx.Component:
@@ -72,6 +74,12 @@ def index() -> rx.Component:
 app = rx.App()
 app.add_page(index, route="/")
 
+# Shared HTTP connection pool, opened and drained with the app
+app.register_lifespan_task(http_client_lifespan)
+
+# Pooled DynamoDB client for the repositories, closed with the app
+app.register_lifespan_task(database_lifespan)
+
 if __name__ == "__main__":
     # Use the correct method to run the app
     app.run()
\ No newline at end of file
@@ -0,0 +1,171 @@
+"""Local copy of each user's chat history in the app database.
+
+Messages fetched from ``/chat/history`` are mirrored into the
+``sqlite:///reflex.db`` database configured in ``rxconfig.py``. On the next
+visit the cached conversation renders straight from the local database,
+and only messages newer than the cache's high-water mark are requested
+from the API. Each message is stored with the cursor the server issued for
+it, so the cache hands back server cursors rather than making its own.
+
+Only server-issued messages are stored, so the cache stays an exact mirror
+of the server history; messages sent in the current session reach it
+through the next incremental sync. Functions here are synchronous and are
+meant to be run with ``asyncio.to_thread`` from state handlers.
+"""
+
+import json
+import os
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+import reflex as rx
+import sqlalchemy
+from sqlmodel import Field, Session, col, delete, select
+
+# Keep a local copy of chat history between visits
+HISTORY_CACHE_ENABLED = os.getenv("CHAT_HISTORY_CACHE", "true").lower() == "true"
+
+# Most messages kept in the local copy per user (newest are kept)
+HISTORY_CACHE_MAX_MESSAGES = int(os.getenv("CHAT_HISTORY_CACHE_MAX_MESSAGES", 500))
+
+
+class CachedChatMessage(rx.Model, table=True):
+    """A server-issued chat message cached for one user."""
+
+    __table_args__ = (sqlalchemy.UniqueConstraint("user_id", "message_id"),)
+
+    user_id: str = Field(index=True)
+    session_id: Optional[str] = None
+    message_id: str
+    role: str
+    content: str
+    # ISO timestamp exactly as issued by the API, for ordering
+    timestamp: str = Field(index=True)
+    # Opaque history cursor the API issued for this message
+    cursor: Optional[str] = None
+    emotion_classification: Optional[str] = None
+    biblical_references: str = "[]"
+
+
+_engine: Optional[sqlalchemy.engine.Engine] = None
+_engine_lock = threading.Lock()
+
+
+def _session() -> Session:
+    """Open a session on the app database, creating the cache table on first use."""
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                engine = rx.Model.get_db_engine()
+                _create_table(engine)
+                _engine = engine
+    return Session(_engine)
+
+
+def _create_table(engine: sqlalchemy.engine.Engine):
+    """Create the cache table, rebuilding a copy written by an older schema.
+
+    The cache only mirrors the server, so an outdated copy is dropped rather
+    than migrated; the next visit refills it from the API.
+    """
+    table = CachedChatMessage.__table__
+    inspector = sqlalchemy.inspect(engine)
+    if inspector.has_table(table.name):
+        columns = {column["name"] for column in inspector.get_columns(table.name)}
+        if columns >= set(table.columns.keys()):
+            return
+        table.drop(engine)
+    table.create(engine)
+
+
+def _to_api_message(row: CachedChatMessage) -> Dict[str, Any]:
+    return {
+        "id": row.message_id,
+        "cursor": row.cursor,
+        "content": row.content,
+        "role": row.role,
+        "timestamp": row.timestamp,
+        "emotion_classification": row.emotion_classification,
+        "biblical_references": json.loads(row.biblical_references or "[]"),
+    }
+
+
+def load_cached_history(user_id: str, limit: int) -> Tuple[Optional[str], List[Dict[str, Any]]]:
+    """Return ``(session_id, messages)`` for the newest ``limit`` cached messages.
+
+    Messages are in the ``/chat/history`` shape, oldest-first.
+    """
+    with _session() as session:
+        rows = session.exec(
+            select(CachedChatMessage)
+            .where(CachedChatMessage.user_id == user_id)
+            .order_by(col(CachedChatMessage.timestamp).desc())
+            .limit(limit)
+        ).all()
+    if not rows:
+        return None, []
+    return rows[0].session_id, [_to_api_message(row) for row in reversed(rows)]
+
+
+def store_messages(user_id: str, session_id: Optional[str], messages: List[Dict[str, Any]]):
+    """Add ``/chat/history`` messages to the user's cache, then trim it."""
+    if not messages:
+        return
+    with _session() as session:
+        existing = set(
+            session.exec(
+                select(CachedChatMessage.message_id).where(
+                    CachedChatMessage.user_id == user_id,
+                    col(CachedChatMessage.message_id).in_([m["id"] for m in messages]),
+                )
+            ).all()
+        )
+        for message in messages:
+            if message["id"] in existing:
+                continue
+            existing.add(message["id"])
+            session.add(
+                CachedChatMessage(
+                    user_id=user_id,
+                    session_id=session_id,
+                    message_id=message["id"],
+                    role=message["role"],
+                    content=message["content"],
+                    timestamp=message["timestamp"],
+                    cursor=message.get("cursor"),
+                    emotion_classification=message.get("emotion_classification"),
+                    biblical_references=json.dumps(message.get("biblical_references") or []),
+                )
+            )
+        session.flush()
+
+        # Drop everything older than the newest HISTORY_CACHE_MAX_MESSAGES
+        cutoff = session.exec(
+            select(CachedChatMessage.timestamp)
+            .where(CachedChatMessage.user_id == user_id)
+            .order_by(col(CachedChatMessage.timestamp).desc())
+            .offset(HISTORY_CACHE_MAX_MESSAGES)
+            .limit(1)
+        ).first()
+        if cutoff is not None:
+            session.exec(
+                delete(CachedChatMessage).where(
+                    CachedChatMessage.user_id == user_id,
+                    col(CachedChatMessage.timestamp) <= cutoff,
+                )
+            )
+        session.commit()
+
+
+def replace_cached_history(user_id: str, session_id: Optional[str], messages: List[Dict[str, Any]]):
+    """Replace the user's cache with a fresh first page of history."""
+    clear_cached_history(user_id)
+    store_messages(user_id, session_id, messages)
+
+
+def clear_cached_history(user_id: str):
+    """Remove every cached message for the user."""
+    with _session() as session:
+        session.exec(delete(CachedChatMessage).where(CachedChatMessage.user_id == user_id))
+        session.commit()
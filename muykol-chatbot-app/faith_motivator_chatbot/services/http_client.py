@@ -0,0 +1,165 @@
+"""Shared, pooled HTTP client used by all Reflex state handlers."""
+
+import asyncio
+import contextlib
+import importlib.util
+import os
+from typing import AsyncIterator, Dict, Optional
+from urllib.parse import urlsplit
+
+import httpx
+import reflex as rx
+
+
+class HTTPClientSettings:
+    """Connection pool and timeout settings, read from the environment."""
+
+    def __init__(
+        self,
+        max_connections_per_host: int = 100,
+        max_keepalive_connections: int = 20,
+        keepalive_expiry: float = 30.0,
+        timeout: float = 30.0,
+        connect_timeout: float = 5.0,
+        http2: bool = False,
+    ):
+        self.max_connections_per_host = max_connections_per_host
+        self.max_keepalive_connections = max_keepalive_connections
+        self.keepalive_expiry = keepalive_expiry
+        self.timeout = timeout
+        self.connect_timeout = connect_timeout
+        self.http2 = http2
+
+    @classmethod
+    def from_env(cls) -> "HTTPClientSettings":
+        """Build settings from HTTP_CLIENT_* environment variables."""
+        return cls(
+            max_connections_per_host=int(os.getenv("HTTP_CLIENT_MAX_CONNECTIONS", 100)),
+            max_keepalive_connections=int(os.getenv("HTTP_CLIENT_MAX_KEEPALIVE", 20)),
+            keepalive_expiry=float(os.getenv("HTTP_CLIENT_KEEPALIVE_EXPIRY", 30.0)),
+            timeout=float(os.getenv("HTTP_CLIENT_TIMEOUT", 30.0)),
+            connect_timeout=float(os.getenv("HTTP_CLIENT_CONNECT_TIMEOUT", 5.0)),
+            http2=os.getenv("HTTP_CLIENT_HTTP2", "false").lower() == "true",
+        )
+
+
+class HTTPClientPool:
+    """Keep-alive connection pools, one ``httpx.AsyncClient`` per host.
+
+    Each host gets its own client so ``max_connections_per_host`` bounds the
+    sockets opened to any single upstream, and a slow host cannot starve the
+    pool used for the chat API.
+    """
+
+    def __init__(self, settings: Optional[HTTPClientSettings] = None):
+        self.settings = settings or HTTPClientSettings.from_env()
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+        # Created on first use, inside the event loop that serves the pool
+        self._lock: Optional[asyncio.Lock] = None
+        self._closed = False
+
+    def _get_lock(self) -> asyncio.Lock:
+        """The pool's lock, created lazily from a running coroutine.
+
+        A pool may be built outside any running loop; on Python 3.9 a lock
+        created there binds to that thread's default loop rather than the
+        one serving requests.
+        """
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        return self._lock
+
+    def _http2_enabled(self) -> bool:
+        """HTTP/2 needs the optional ``h2`` package; fall back to HTTP/1.1."""
+        return self.settings.http2 and importlib.util.find_spec("h2") is not None
+
+    def _create_client(self) -> httpx.AsyncClient:
+        settings = self.settings
+        return httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=settings.max_connections_per_host,
+                max_keepalive_connections=settings.max_keepalive_connections,
+                keepalive_expiry=settings.keepalive_expiry,
+            ),
+            timeout=httpx.Timeout(settings.timeout, connect=settings.connect_timeout),
+            http2=self._http2_enabled(),
+        )
+
+    async def get_client(self, url: str) -> httpx.AsyncClient:
+        """Return the pooled client for the host of ``url``."""
+        parts = urlsplit(url)
+        host_key = f"{parts.scheme}://{parts.netloc}"
+
+        client = self._clients.get(host_key)
+        if client is not None:
+            return client
+
+        async with self._get_lock():
+            if self._closed:
+                raise RuntimeError("HTTP client pool has been closed")
+            client = self._clients.get(host_key)
+            if client is None:
+                client = self._create_client()
+                self._clients[host_key] = client
+            return client
+
+    async def request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        """Send a request through the pooled client for ``url``."""
+        client = await self.get_client(url)
+        return await client.request(method, url, **kwargs)
+
+    async def get(self, url: str, **kwargs) -> httpx.Response:
+        """Send a GET request."""
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url: str, **kwargs) -> httpx.Response:
+        """Send a POST request."""
+        return await self.request("POST", url, **kwargs)
+
+    @contextlib.asynccontextmanager
+    async def stream(
+        self, method: str, url: str, **kwargs
+    ) -> AsyncIterator[httpx.Response]:
+        """Open a streaming request; the body is read incrementally by the caller."""
+        client = await self.get_client(url)
+        async with client.stream(method, url, **kwargs) as response:
+            yield response
+
+    async def aclose(self):
+        """Close every pooled client and release their connections."""
+        async with self._get_lock():
+            self._closed = True
+            clients = list(self._clients.values())
+            self._clients.clear()
+        await asyncio.gather(
+            *(client.aclose() for client in clients), return_exceptions=True
+        )
+
+
+_pool: Optional[HTTPClientPool] = None
+
+
+def get_http_pool() -> HTTPClientPool:
+    """Return the process-wide client pool, creating it on first use."""
+    global _pool
+    if _pool is None or _pool._closed:
+        _pool = HTTPClientPool()
+    return _pool
+
+
+def api_url(path: str) -> str:
+    """Build an absolute URL for a path on the configured backend API."""
+    return f"{rx.config.get_config().api_url}{path}"
+
+
+@contextlib.asynccontextmanager
+async def http_client_lifespan() -> AsyncIterator[HTTPClientPool]:
+    """App lifespan task that opens the pool on startup and drains it on shutdown."""
+    pool = get_http_pool()
+    try:
+        yield pool
+    finally:
+        global _pool
+        await pool.aclose()
+        if _pool is pool:
+            _pool = None
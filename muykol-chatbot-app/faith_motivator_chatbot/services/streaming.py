@@ -0,0 +1,77 @@
+"""Server-sent event parsing for streamed chat replies."""
+
+import json
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+import httpx
+
+# ``data:`` payload some servers send to end a stream; read as a "done" event
+DONE_SENTINEL = "[DONE]"
+
+
+class SSEEvent:
+    """A single server-sent event."""
+
+    def __init__(self, event: str, data: str, id: Optional[str] = None):
+        self.event = event
+        self.data = data
+        self.id = id
+
+    def json(self) -> Dict[str, Any]:
+        """Decode the event payload as JSON."""
+        return json.loads(self.data) if self.data else {}
+
+
+def is_event_stream(response: httpx.Response) -> bool:
+    """Return True when the response body is an SSE stream."""
+    content_type = response.headers.get("content-type", "")
+    return content_type.split(";")[0].strip() == "text/event-stream"
+
+
+def _make_event(
+    event_type: str, data_lines: List[str], event_id: Optional[str]
+) -> SSEEvent:
+    data = "\n".join(data_lines)
+    if event_type == "message" and data == DONE_SENTINEL:
+        return SSEEvent("done", "", event_id)
+    return SSEEvent(event_type, data, event_id)
+
+
+async def iter_sse_events(response: httpx.Response) -> AsyncIterator[SSEEvent]:
+    """Yield events from a ``text/event-stream`` response as lines arrive.
+
+    Lines may be split across network chunks; a final event without its
+    terminating blank line is still delivered when the stream closes.
+    """
+    event_type = "message"
+    event_id: Optional[str] = None
+    data_lines: List[str] = []
+
+    async for line in response.aiter_lines():
+        line = line.rstrip("\r")
+
+        # A blank line terminates the current event
+        if not line:
+            if data_lines:
+                yield _make_event(event_type, data_lines, event_id)
+            event_type = "message"
+            data_lines = []
+            continue
+
+        # Comment lines are used as keep-alive pings
+        if line.startswith(":"):
+            continue
+
+        field, _, value = line.partition(":")
+        if value.startswith(" "):
+            value = value[1:]
+
+        if field == "event":
+            event_type = value
+        elif field == "data":
+            data_lines.append(value)
+        elif field == "id":
+            event_id = value
+
+    if data_lines:
+        yield _make_event(event_type, data_lines, event_id)
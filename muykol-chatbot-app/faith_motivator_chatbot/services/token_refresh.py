@@ -0,0 +1,104 @@
+"""Single-flight access token refresh shared by every state instance."""
+
+import asyncio
+import hashlib
+import os
+import random
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from faith_motivator_chatbot.services.http_client import api_url, get_http_pool
+
+# Refresh this long before the token expires, to absorb clock skew
+REFRESH_SKEW_SECONDS = float(os.getenv("AUTH_REFRESH_SKEW_SECONDS", 60))
+
+# Random spread added to the refresh time so tabs/users don't refresh in lockstep
+REFRESH_JITTER_SECONDS = float(os.getenv("AUTH_REFRESH_JITTER_SECONDS", 30))
+
+# Wait before retrying a failed background refresh
+REFRESH_RETRY_SECONDS = float(os.getenv("AUTH_REFRESH_RETRY_SECONDS", 15))
+
+RefreshFunction = Callable[[str], Awaitable[Optional[Dict[str, Any]]]]
+
+
+async def request_token_refresh(refresh_token: str) -> Optional[Dict[str, Any]]:
+    """Call ``/auth/refresh``; returns the new auth data or None on rejection."""
+    response = await get_http_pool().post(
+        api_url("/auth/refresh"),
+        json={"refresh_token": refresh_token},
+    )
+    if response.status_code == 200:
+        return response.json()
+    return None
+
+
+def refresh_key(refresh_token: str) -> str:
+    """Key that groups refreshes of one session (one refresh token).
+
+    Tabs sharing a session share a refresh; the same user signed in on
+    another device holds a different refresh token and refreshes on its own,
+    so it can never be handed this session's tokens.
+    """
+    return hashlib.sha256(refresh_token.encode()).hexdigest()
+
+
+def refresh_delay(
+    expires_at: Optional[datetime],
+    now: Optional[datetime] = None,
+    skew: float = REFRESH_SKEW_SECONDS,
+    jitter: float = REFRESH_JITTER_SECONDS,
+) -> float:
+    """Seconds to wait before proactively refreshing a token.
+
+    The refresh is scheduled ``skew`` seconds ahead of expiry, pulled earlier
+    by up to ``jitter`` seconds, and never negative.
+    """
+    if expires_at is None:
+        return 0.0
+    now = now or datetime.now()
+    remaining = (expires_at - now).total_seconds()
+    return max(0.0, remaining - skew - random.uniform(0, jitter))
+
+
+class TokenRefreshCoordinator:
+    """Coalesce concurrent refreshes into one in-flight call per session.
+
+    The first caller for a key starts the refresh; everyone else arriving
+    while it is running awaits the same result instead of issuing another
+    ``/auth/refresh`` request. Keys come from ``refresh_key``.
+    """
+
+    def __init__(self, refresh_fn: Optional[RefreshFunction] = None):
+        self._refresh_fn = refresh_fn or request_token_refresh
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+    def is_refreshing(self, key: str) -> bool:
+        """Whether a refresh for ``key`` is currently in flight."""
+        return key in self._inflight
+
+    async def refresh(self, key: str, refresh_token: str) -> Optional[Dict[str, Any]]:
+        """Refresh the token for ``key``, joining an in-flight refresh if any."""
+        future = self._inflight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(self._refresh_fn(refresh_token))
+            self._inflight[key] = future
+
+            def _forget(done: asyncio.Future, key: str = key):
+                if self._inflight.get(key) is done:
+                    del self._inflight[key]
+
+            future.add_done_callback(_forget)
+
+        # Shield so one cancelled waiter does not cancel the shared refresh
+        return await asyncio.shield(future)
+
+
+_coordinator: Optional[TokenRefreshCoordinator] = None
+
+
+def get_refresh_coordinator() -> TokenRefreshCoordinator:
+    """Return the process-wide refresh coordinator."""
+    global _coordinator
+    if _coordinator is None:
+        _coordinator = TokenRefreshCoordinator()
+    return _coordinator
@@ -1,9 +1,17 @@
 """Authentication state management using Reflex State."""
 
+import asyncio
 import reflex as rx
 from typing import Optional, Dict, Any
 import httpx
 from datetime import datetime, timedelta
+from faith_motivator_chatbot.services.http_client import api_url, get_http_pool
+from faith_motivator_chatbot.services.token_refresh import (
+    REFRESH_RETRY_SECONDS,
+    get_refresh_coordinator,
+    refresh_delay,
+    refresh_key,
+)
 
 
 class AuthState(rx.State):
@@ -20,6 +28,9 @@ class AuthState(rx.State):
     refresh_token: Optional[str] = None
     token_expires_at: Optional[datetime] = None
     
+    # Bumped on every login/logout so stale background refresh loops exit
+    _refresh_generation: int = 0
+    
     # UI state
     is_loading: bool = False
     auth_error: Optional[str] = None
@@ -49,26 +60,27 @@ class AuthState(rx.State):
         
         try:
             # Call authentication API
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    f"{rx.config.get_config().api_url}/auth/login",
-                    json={
-                        "email": self.login_email,
-                        "password": self.login_password,
-                    },
-                    timeout=30.0,
-                )
+            response = await get_http_pool().post(
+                api_url("/auth/login"),
+                json={
+                    "email": self.login_email,
+                    "password": self.login_password,
+                },
+            )
+            
+            if response.status_code == 200:
+                auth_data = response.json()
+                await self._set_auth_data(auth_data)
                 
-                if response.status_code == 200:
-                    auth_data = response.json()
-                    await self._set_auth_data(auth_data)
-                    
-                    # Clear login form
-                    self.login_email = ""
-                    self.login_password = ""
-                else:
-                    error_data = response.json()
-                    self.auth_error = error_data.get("detail", "Login failed")
+                # Clear login form
+                self.login_email = ""
+                self.login_password = ""
+                
+                # Keep the session alive in the background
+                return AuthState.schedule_token_refresh
+            else:
+                error_data = response.json()
+                self.auth_error = error_data.get("detail", "Login failed")
                     
         except httpx.TimeoutException:
             self.auth_error = "Login request timed out. Please try again."
@@ -86,12 +98,11 @@ class AuthState(rx.State):
         try:
             # Call logout API if we have a token
             if self.access_token:
-                async with httpx.AsyncClient() as client:
-                    await client.post(
-                        f"{rx.config.get_config().api_url}/auth/logout",
-                        headers={"Authorization": f"Bearer {self.access_token}"},
-                        timeout=10.0,
-                    )
+                await get_http_pool().post(
+                    api_url("/auth/logout"),
+                    headers={"Authorization": f"Bearer {self.access_token}"},
+                    timeout=10.0,
+                )
         except Exception:
             # Ignore logout API errors - clear local state anyway
             pass
@@ -100,31 +111,89 @@ class AuthState(rx.State):
             self.is_loading = False
     
     async def refresh_access_token(self) -> bool:
-        """Refresh the access token using the refresh token."""
+        """Refresh the access token using the refresh token.
+        
+        Concurrent callers for the same user share one ``/auth/refresh``
+        request through the process-wide refresh coordinator.
+        """
         if not self.refresh_token:
             return False
         
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    f"{rx.config.get_config().api_url}/auth/refresh",
-                    json={"refresh_token": self.refresh_token},
-                    timeout=30.0,
-                )
+            auth_data = await get_refresh_coordinator().refresh(
+                self._refresh_key(), self.refresh_token
+            )
+            
+            if auth_data:
+                await self._set_auth_data(auth_data)
+                return True
+            else:
+                # Refresh failed, clear auth data
+                await self._clear_auth_data()
+                return False
                 
-                if response.status_code == 200:
-                    auth_data = response.json()
-                    await self._set_auth_data(auth_data)
-                    return True
-                else:
-                    # Refresh failed, clear auth data
-                    await self._clear_auth_data()
-                    return False
-                    
         except Exception:
             await self._clear_auth_data()
             return False
     
+    @rx.background
+    async def schedule_token_refresh(self):
+        """Refresh the access token shortly before it expires.
+        
+        Runs as a background task so the refresh never sits on the request
+        path of chat handlers. The loop sleeps until ``token_expires_at``
+        minus a skew margin and jitter, refreshes through the single-flight
+        coordinator, and reschedules itself from the new expiry. It exits
+        when the user logs out or logs in again (which starts a new loop).
+        """
+        async with self:
+            self._refresh_generation += 1
+            generation = self._refresh_generation
+        
+        coordinator = get_refresh_coordinator()
+        
+        while True:
+            async with self:
+                if generation != self._refresh_generation or not self.refresh_token:
+                    return
+                scheduled_expiry = self.token_expires_at
+                delay = refresh_delay(scheduled_expiry)
+            
+            await asyncio.sleep(delay)
+            
+            async with self:
+                if generation != self._refresh_generation or not self.refresh_token:
+                    return
+                if self.token_expires_at != scheduled_expiry:
+                    # Refreshed elsewhere in the meantime; reschedule
+                    continue
+                refresh_key = self._refresh_key()
+                refresh_token = self.refresh_token
+            
+            try:
+                auth_data = await coordinator.refresh(refresh_key, refresh_token)
+                failed = False
+            except Exception:
+                auth_data, failed = None, True
+            
+            async with self:
+                if generation != self._refresh_generation:
+                    return
+                if auth_data:
+                    await self._set_auth_data(auth_data)
+                    continue
+                if not failed or self.is_token_expired():
+                    # Rejected refresh token, or out of time to retry
+                    await self._clear_auth_data()
+                    return
+            
+            # Transient failure while the token is still valid: retry soon
+            await asyncio.sleep(REFRESH_RETRY_SECONDS)
+    
+    def _refresh_key(self) -> str:
+        """Key that groups refreshes of this session across tabs."""
+        return refresh_key(self.refresh_token or "")
+    
     def is_token_expired(self) -> bool:
         """Check if the current access token is expired."""
         if not self.token_expires_at:
@@ -136,13 +205,48 @@ class AuthState(rx.State):
         if not self.access_token:
             return {}
         
-        # Check if token is expired and try to refresh
+        # Normally the background refresh keeps the token fresh; this is the
+        # fallback when it could not (e.g. after a backend restart)
         if self.is_token_expired():
             if not await self.refresh_access_token():
                 return {}
         
         return {"Authorization": f"Bearer {self.access_token}"}
     
+    async def get_auth_headers_unlocked(self) -> Dict[str, str]:
+        """``get_auth_headers`` for background tasks, called without the state lock.
+        
+        The lock is taken only to read the tokens and to apply a refresh, so
+        an ``/auth/refresh`` round trip never blocks other events.
+        """
+        async with self:
+            if not self.access_token:
+                return {}
+            if not self.is_token_expired():
+                return {"Authorization": f"Bearer {self.access_token}"}
+            if not self.refresh_token:
+                return {}
+            generation = self._refresh_generation
+            refresh_key = self._refresh_key()
+            refresh_token = self.refresh_token
+        
+        try:
+            auth_data = await get_refresh_coordinator().refresh(refresh_key, refresh_token)
+        except Exception:
+            auth_data = None
+        
+        async with self:
+            if generation != self._refresh_generation:
+                # Logged out (or in again) meanwhile; use whatever is current
+                if self.access_token and not self.is_token_expired():
+                    return {"Authorization": f"Bearer {self.access_token}"}
+                return {}
+            if not auth_data:
+                await self._clear_auth_data()
+                return {}
+            await self._set_auth_data(auth_data)
+            return {"Authorization": f"Bearer {self.access_token}"}
+    
     async def _set_auth_data(self, auth_data: Dict[str, Any]):
         """Set authentication data from API response."""
         self.is_authenticated = True
@@ -158,6 +262,7 @@ class AuthState(rx.State):
     
     async def _clear_auth_data(self):
         """Clear all authentication data."""
+        self._refresh_generation += 1
         self.is_authenticated = False
         self.user_id = None
         self.email = None
@@ -1,12 +1,58 @@
 """Chat functionality state management."""
 
+import asyncio
+import os
+import time
+import uuid
 import reflex as rx
 from typing import List, Dict, Any, Optional
 import httpx
 from datetime import datetime
+from faith_motivator_chatbot.backend.idempotency import IDEMPOTENCY_HEADER
+from faith_motivator_chatbot.services.history_cache import (
+    HISTORY_CACHE_ENABLED,
+    load_cached_history,
+    replace_cached_history,
+    store_messages,
+)
+from faith_motivator_chatbot.services.http_client import api_url, get_http_pool
+from faith_motivator_chatbot.services.streaming import is_event_stream, iter_sse_events
 from faith_motivator_chatbot.state.auth_state import AuthState
 
 
+# Request token-streamed replies from the chat API
+STREAM_REPLIES = os.getenv("CHAT_STREAM_REPLIES", "true").lower() == "true"
+
+# Minimum seconds between UI updates while a reply is streaming
+STREAM_FLUSH_INTERVAL = float(os.getenv("CHAT_STREAM_FLUSH_INTERVAL", 0.05))
+
+# Messages fetched per history page, and the most held in state at once
+HISTORY_PAGE_SIZE = int(os.getenv("CHAT_HISTORY_PAGE_SIZE", 50))
+MAX_MESSAGES_IN_STATE = int(os.getenv("CHAT_MAX_MESSAGES_IN_STATE", 500))
+
+# Message bubbles mounted in the chat window at once, and how far one
+# "show earlier"/"show newer" step moves the window
+MESSAGE_WINDOW_SIZE = int(os.getenv("CHAT_MESSAGE_WINDOW_SIZE", 40))
+MESSAGE_WINDOW_STEP = max(1, MESSAGE_WINDOW_SIZE // 2)
+
+# Newest messages kept in the small "live" list that is re-sent on each turn;
+# once it grows past the limit it is folded back into the settled window
+LIVE_TAIL_SIZE = int(os.getenv("CHAT_LIVE_TAIL_SIZE", 10))
+LIVE_TAIL_KEEP = max(1, LIVE_TAIL_SIZE // 2)
+
+# Most user messages that may be queued or awaiting a reply at once
+MAX_OUTBOUND_DEPTH = int(os.getenv("CHAT_MAX_OUTBOUND_DEPTH", 5))
+
+# Seconds a queue worker may take to start before a new send replaces it
+QUEUE_WORKER_START_SECONDS = 10
+
+# Queue workers of this process by token: the time each was requested, or
+# None once running. A token saved in state but missing here belongs to a
+# worker that died with an earlier backend process, whose ``finally`` never
+# ran.
+_QUEUE_WORKERS: Dict[str, Optional[float]] = {}
+
+
 class Message(rx.Base):
     """Message model for chat interface."""
     id: str
@@ -15,13 +61,38 @@ class Message(rx.Base):
     timestamp: datetime
     emotion_classification: Optional[str] = None
     biblical_references: Optional[List[str]] = None
+    # Delivery status of user messages: "queued", "sending", "delivered", "failed"
+    status: Optional[str] = None
+    # Server-issued history cursor of this message; None for messages
+    # created in this session
+    cursor: Optional[str] = None
+
+
+def message_from_api(data: Dict[str, Any]) -> Message:
+    """Build a Message from a ``/chat/history`` entry."""
+    return Message(
+        id=data["id"],
+        content=data["content"],
+        role=data["role"],
+        timestamp=datetime.fromisoformat(data["timestamp"]),
+        emotion_classification=data.get("emotion_classification"),
+        biblical_references=data.get("biblical_references", []),
+        cursor=data.get("cursor"),
+    )
 
 
 class ChatState(AuthState):
     """Chat functionality state management."""
     
-    # Chat messages
-    messages: List[Message] = []
+    # Chat messages. The full loaded history lives in a backend-only var;
+    # the browser receives the mounted window split into a settled part,
+    # re-sent only when the window moves, and a short live tail that carries
+    # each turn's appends and streamed edits.
+    _messages: List[Message] = []
+    window_messages: List[Message] = []
+    live_messages: List[Message] = []
+    message_count: int = 0
+    hidden_older_count: int = 0
     current_message: str = ""
     
     # UI state
@@ -29,16 +100,70 @@ class ChatState(AuthState):
     is_sending: bool = False
     chat_error: Optional[str] = None
     
+    # Outbound queue: message ids waiting for delivery, in order
+    _outbound_queue: List[str] = []
+    _in_flight_id: Optional[str] = None
+    _queue_worker_active: bool = False
+    _queue_worker_token: Optional[str] = None
+    pending_count: int = 0
+    
     # Session management
     session_id: Optional[str] = None
     
+    # History pagination, by server-issued cursors only: older pages start
+    # after ``history_cursor``, syncs fetch what is newer than ``_newer_cursor``
+    history_cursor: Optional[str] = None
+    _newer_cursor: Optional[str] = None
+    has_older_messages: bool = False
+    is_loading_older: bool = False
+    
+    # Windowed rendering: how many of the newest messages sit below the
+    # mounted window (0 means the window follows the latest message)
+    window_end_offset: int = 0
+    
     # Prayer connect state
     show_prayer_connect_modal: bool = False
     prayer_request_text: str = ""
     prayer_connect_consent: bool = False
+    # Key sent with the prayer request; kept across retries of the same text
+    _prayer_idempotency_key: Optional[str] = None
+    _prayer_idempotency_text: str = ""
+    
+    @rx.var
+    def queue_full(self) -> bool:
+        """Whether the composer must wait for earlier messages to deliver."""
+        return self.pending_count >= MAX_OUTBOUND_DEPTH
+    
+    @rx.var
+    def can_show_older(self) -> bool:
+        """Whether there is anything above the window, loaded or not."""
+        return self.hidden_older_count > 0 or self.has_older_messages
+    
+    def show_older_window(self):
+        """Move the window toward older messages, fetching a page if needed."""
+        if self.hidden_older_count > 0:
+            step = min(MESSAGE_WINDOW_STEP, self.hidden_older_count)
+            self.window_end_offset += step
+            self._sync_window()
+        elif self.has_older_messages:
+            return ChatState.load_older_messages
+    
+    def show_newer_window(self):
+        """Move the window toward newer messages."""
+        self.window_end_offset = max(0, self.window_end_offset - MESSAGE_WINDOW_STEP)
+        self._sync_window()
+    
+    def jump_to_latest(self):
+        """Snap the window back to the newest message."""
+        self.window_end_offset = 0
+        self._sync_window()
     
     def set_current_message(self, message: str):
-        """Set the current message being typed."""
+        """Save the composer draft.
+        
+        The composer is uncontrolled, so this runs when it loses focus rather
+        than on every keystroke.
+        """
         self.current_message = message
         self.chat_error = None
     
@@ -60,86 +185,309 @@ class ChatState(AuthState):
         self.prayer_request_text = ""
         self.prayer_connect_consent = False
     
-    async def send_message(self):
-        """Send a message to the chatbot."""
-        if not self.current_message.strip():
+    def send_message(self, form_data: Optional[Dict[str, Any]] = None):
+        """Queue a message for delivery to the chatbot.
+        
+        The composer keeps its text in the browser and submits it here as
+        ``form_data["message"]``; ``current_message`` (the saved draft) is
+        used when the handler is triggered without form data. Messages are
+        delivered strictly in order by ``process_outbound_queue`` while the
+        user keeps typing; at most MAX_OUTBOUND_DEPTH may be pending.
+        """
+        text = (form_data or {}).get("message", self.current_message) or ""
+        if not text.strip():
             return
         
         if not self.is_authenticated:
             self.chat_error = "Please log in to send messages"
             return
         
-        self.is_sending = True
+        if self.pending_count >= MAX_OUTBOUND_DEPTH:
+            self.chat_error = "Please wait for your earlier messages to be delivered."
+            return
+        
         self.chat_error = None
         
         # Create user message
         user_message = Message(
-            id=f"msg_{len(self.messages)}_{datetime.now().timestamp()}",
-            content=self.current_message.strip(),
+            id=self._new_message_id(),
+            content=text.strip(),
             role="user",
             timestamp=datetime.now(),
+            status="queued",
         )
         
-        # Add user message to chat
-        self.messages.append(user_message)
-        message_to_send = self.current_message
+        # Add user message to chat, snapping the window back to the latest
+        if self.window_end_offset:
+            self.window_end_offset = 0
+            self._sync_window()
+        self._append_message(user_message)
         self.current_message = ""
         
-        # Show typing indicator
-        self.is_typing = True
+        self._outbound_queue.append(user_message.id)
+        self._update_pending_count()
         
-        try:
-            # Get auth headers
-            headers = await self.get_auth_headers()
-            if not headers:
-                self.chat_error = "Authentication required. Please log in again."
+        return self._start_queue_worker()
+    
+    def retry_message(self, message_id: str):
+        """Re-queue a message whose delivery failed."""
+        message = self._find_message(message_id)
+        if message is None or message.status != "failed":
+            return
+        if self.pending_count >= MAX_OUTBOUND_DEPTH:
+            self.chat_error = "Please wait for your earlier messages to be delivered."
+            return
+        
+        self.chat_error = None
+        self._update_message(message_id, status="queued")
+        self._outbound_queue.append(message_id)
+        self._update_pending_count()
+        
+        return self._start_queue_worker()
+    
+    def _start_queue_worker(self):
+        """Return the event that starts the queue worker, unless one is running.
+        
+        A worker flag left set by a backend that stopped mid-delivery is
+        taken over: its in-flight message goes back to the head of the
+        queue (the message id is the idempotency key, so the server replays
+        rather than repeats a reply it already produced).
+        """
+        if self._queue_worker_active and self._queue_worker_alive():
+            return None
+        _QUEUE_WORKERS.pop(self._queue_worker_token, None)
+        if self._in_flight_id is not None:
+            if self._find_message(self._in_flight_id) is not None:
+                self._update_message(self._in_flight_id, status="queued")
+                self._outbound_queue.insert(0, self._in_flight_id)
+            self._in_flight_id = None
+            self.is_typing = False
+        self._queue_worker_active = True
+        self._queue_worker_token = uuid.uuid4().hex
+        _QUEUE_WORKERS[self._queue_worker_token] = time.monotonic()
+        return ChatState.process_outbound_queue(self._queue_worker_token)
+    
+    def _queue_worker_alive(self) -> bool:
+        """Whether this process runs the worker, or started it moments ago."""
+        if self._queue_worker_token not in _QUEUE_WORKERS:
+            return False
+        requested_at = _QUEUE_WORKERS[self._queue_worker_token]
+        if requested_at is None:
+            return True
+        return time.monotonic() - requested_at < QUEUE_WORKER_START_SECONDS
+    
+    @rx.background
+    async def process_outbound_queue(self, token: str):
+        """Deliver queued messages one at a time, in submission order.
+        
+        Runs as a background task so the composer stays usable while a
+        reply is pending. The state lock is only held to pick the next
+        message and to apply results; the request itself runs unlocked.
+        ``token`` identifies this worker; one that was replaced before it
+        started exits at once.
+        """
+        async with self:
+            if self._queue_worker_token != token:
                 return
-            
-            # Send message to API
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    f"{rx.config.get_config().api_url}/chat/message",
-                    json={
-                        "message": message_to_send,
-                        "session_id": self.session_id,
-                    },
-                    headers=headers,
-                    timeout=30.0,
-                )
-                
-                if response.status_code == 200:
-                    response_data = response.json()
-                    
-                    # Update session ID if provided
-                    if response_data.get("session_id"):
-                        self.session_id = response_data["session_id"]
+            _QUEUE_WORKERS[token] = None
+        try:
+            while True:
+                async with self:
+                    if not self._outbound_queue:
+                        self._queue_worker_active = False
+                        self._queue_worker_token = None
+                        return
+                    message_id = self._outbound_queue.pop(0)
+                    message = self._find_message(message_id)
+                    if message is None:
+                        self._update_pending_count()
+                        continue
                     
-                    # Create assistant message
-                    assistant_message = Message(
-                        id=f"msg_{len(self.messages)}_{datetime.now().timestamp()}",
-                        content=response_data["response"],
-                        role="assistant",
-                        timestamp=datetime.now(),
-                        emotion_classification=response_data.get("emotion_classification"),
-                        biblical_references=response_data.get("biblical_references", []),
+                    self._in_flight_id = message_id
+                    self._update_message(message_id, status="sending")
+                    self.is_typing = True
+                    text = message.content
+                    session_id = self.session_id
+                
+                # Outside the lock: this may wait on a token refresh
+                headers = await self.get_auth_headers_unlocked()
+                if not headers:
+                    async with self:
+                        self.chat_error = "Authentication required. Please log in again."
+                
+                delivered = False
+                if headers:
+                    delivered = await self._deliver_message(
+                        message_id, text, session_id, headers
                     )
-                    
-                    # Add assistant message to chat
-                    self.messages.append(assistant_message)
-                    
+                
+                async with self:
+                    self._update_message(
+                        message_id, status="delivered" if delivered else "failed"
+                    )
+                    self._in_flight_id = None
+                    self._update_pending_count()
+                    self.is_typing = False
+        finally:
+            _QUEUE_WORKERS.pop(token, None)
+            async with self:
+                if self._queue_worker_token == token:
+                    self._queue_worker_active = False
+                    self._queue_worker_token = None
+                    self._in_flight_id = None
+                    self.is_typing = False
+                    self._update_pending_count()
+    
+    async def _deliver_message(
+        self,
+        message_id: str,
+        text: str,
+        session_id: Optional[str],
+        headers: Dict[str, str],
+    ) -> bool:
+        """POST one message and apply the (streamed) reply; returns success.
+        
+        Called from the background queue worker without the state lock held;
+        every state change takes the lock briefly. The message id doubles as
+        the idempotency key, so a retry of the same message gets the reply
+        the server already produced rather than a second one.
+        """
+        # Ask for an event stream; servers without streaming reply with JSON
+        request_headers = dict(headers)
+        request_headers[IDEMPOTENCY_HEADER] = message_id
+        if STREAM_REPLIES:
+            request_headers["Accept"] = "text/event-stream, application/json"
+        
+        error: Optional[str] = None
+        try:
+            async with get_http_pool().stream(
+                "POST",
+                api_url("/chat/message"),
+                json={
+                    "message": text,
+                    "session_id": session_id,
+                    "stream": STREAM_REPLIES,
+                },
+                headers=request_headers,
+            ) as response:
+                if response.status_code != 200:
+                    await response.aread()
+                    error = response.json().get("detail", "Failed to send message")
+                elif is_event_stream(response):
+                    return await self._receive_streamed_reply(response)
                 else:
-                    error_data = response.json()
-                    self.chat_error = error_data.get("detail", "Failed to send message")
+                    await response.aread()
+                    response_data = response.json()
+                    async with self:
+                        self._append_assistant_reply(response_data)
+                    return True
                     
         except httpx.TimeoutException:
-            self.chat_error = "Message request timed out. Please try again."
+            error = "Message request timed out. Please try again."
         except httpx.RequestError:
-            self.chat_error = "Unable to connect to chat service."
+            error = "Unable to connect to chat service."
         except Exception as e:
-            self.chat_error = f"An unexpected error occurred: {str(e)}"
-        finally:
+            error = f"An unexpected error occurred: {str(e)}"
+        
+        async with self:
+            self.chat_error = error
+        return False
+    
+    def _append_assistant_reply(self, response_data: Dict[str, Any]):
+        """Append a complete (non-streamed) assistant reply."""
+        # Update session ID if provided
+        if response_data.get("session_id"):
+            self.session_id = response_data["session_id"]
+        
+        # Create assistant message
+        assistant_message = Message(
+            id=self._new_message_id(),
+            content=response_data["response"],
+            role="assistant",
+            timestamp=datetime.now(),
+            emotion_classification=response_data.get("emotion_classification"),
+            biblical_references=response_data.get("biblical_references", []),
+        )
+        
+        # Add assistant message to chat
+        self._append_message(assistant_message)
+    
+    async def _receive_streamed_reply(self, response: httpx.Response) -> bool:
+        """Grow the assistant message as SSE chunks arrive; returns success.
+        
+        Chunks arriving closer together than STREAM_FLUSH_INTERVAL are
+        buffered and applied in one locked update, so a fast stream costs
+        one websocket update per interval rather than one per token.
+        """
+        message_id: Optional[str] = None
+        pending = ""
+        last_flush = 0.0
+        
+        async for event in iter_sse_events(response):
+            payload = event.json()
+            
+            if event.event == "start":
+                if payload.get("session_id"):
+                    async with self:
+                        self.session_id = payload["session_id"]
+                
+            elif event.event == "delta":
+                pending += payload.get("text", "")
+                now = time.monotonic()
+                if message_id is None or now - last_flush >= STREAM_FLUSH_INTERVAL:
+                    async with self:
+                        message_id = self._apply_stream_delta(message_id, pending)
+                    pending = ""
+                    last_flush = now
+                
+            elif event.event == "done":
+                async with self:
+                    if pending:
+                        message_id = self._apply_stream_delta(message_id, pending)
+                    if payload.get("session_id"):
+                        self.session_id = payload["session_id"]
+                    if message_id is None:
+                        if "response" in payload:
+                            self._append_assistant_reply(payload)
+                    else:
+                        self._update_message(
+                            message_id,
+                            emotion_classification=payload.get("emotion_classification"),
+                            biblical_references=payload.get("biblical_references", []),
+                        )
+                return True
+                
+            elif event.event == "error":
+                async with self:
+                    self.chat_error = payload.get("detail", "Failed to send message")
+                return False
+        
+        # Stream closed without a "done" event: keep what arrived
+        async with self:
+            if pending:
+                message_id = self._apply_stream_delta(message_id, pending)
+        return message_id is not None
+    
+    def _apply_stream_delta(self, message_id: Optional[str], text: str) -> str:
+        """Append streamed text to the reply, creating it on the first chunk."""
+        if message_id is None:
+            # First token: swap the typing indicator for the reply
+            message_id = self._new_message_id()
+            self._append_message(
+                Message(
+                    id=message_id,
+                    content=text,
+                    role="assistant",
+                    timestamp=datetime.now(),
+                )
+            )
             self.is_typing = False
-            self.is_sending = False
+            return message_id
+        
+        message = self._find_message(message_id)
+        if message is not None:
+            self._update_message(message_id, content=message.content + text)
+        return message_id
     
     async def submit_prayer_request(self):
         """Submit a prayer request for community prayer."""
@@ -154,6 +502,10 @@ class ChatState(AuthState):
             self.chat_error = "Please log in to submit prayer requests"
             return
         
+        if self.is_sending:
+            # Double submit while the first request is in flight
+            return
+        
         self.is_sending = True
         self.chat_error = None
         
@@ -165,35 +517,38 @@ class ChatState(AuthState):
                 return
             
             # Submit prayer request
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    f"{rx.config.get_config().api_url}/prayer/request",
-                    json={
-                        "prayer_text": self.prayer_request_text.strip(),
-                        "consent_given": self.prayer_connect_consent,
-                    },
-                    headers=headers,
-                    timeout=30.0,
+            prayer_text = self.prayer_request_text.strip()
+            response = await get_http_pool().post(
+                api_url("/prayer/request"),
+                json={
+                    "prayer_text": prayer_text,
+                    "consent_given": self.prayer_connect_consent,
+                },
+                headers={
+                    **headers,
+                    IDEMPOTENCY_HEADER: self._prayer_request_key(prayer_text),
+                },
+            )
+            
+            if response.status_code == 200:
+                # Success - hide modal and show confirmation
+                self._prayer_idempotency_key = None
+                self.hide_prayer_connect()
+                
+                # Add confirmation message to chat
+                confirmation_message = Message(
+                    id=self._new_message_id(),
+                    content="Your prayer request has been submitted to the community. "
+                            "You'll receive updates via email when others pray for you.",
+                    role="assistant",
+                    timestamp=datetime.now(),
                 )
+                self._append_message(confirmation_message)
+                
+            else:
+                error_data = response.json()
+                self.chat_error = error_data.get("detail", "Failed to submit prayer request")
                 
-                if response.status_code == 200:
-                    # Success - hide modal and show confirmation
-                    self.hide_prayer_connect()
-                    
-                    # Add confirmation message to chat
-                    confirmation_message = Message(
-                        id=f"msg_{len(self.messages)}_{datetime.now().timestamp()}",
-                        content="Your prayer request has been submitted to the community. "
-                                "You'll receive updates via email when others pray for you.",
-                        role="assistant",
-                        timestamp=datetime.now(),
-                    )
-                    self.messages.append(confirmation_message)
-                    
-                else:
-                    error_data = response.json()
-                    self.chat_error = error_data.get("detail", "Failed to submit prayer request")
-                    
         except httpx.TimeoutException:
             self.chat_error = "Prayer request timed out. Please try again."
         except httpx.RequestError:
@@ -204,51 +559,260 @@ class ChatState(AuthState):
             self.is_sending = False
     
     async def load_chat_history(self):
-        """Load chat history for the current user."""
+        """Show the conversation from the local cache, then sync what is new.
+        
+        Cached messages render before any network call; only messages newer
+        than the newest cached one are then fetched. Without a local copy, or
+        when more than a page arrived since, the most recent page is loaded
+        from the API and becomes the new local copy.
+        """
         if not self.is_authenticated:
             return
         
+        user_id = self.user_id
+        use_cache = HISTORY_CACHE_ENABLED and bool(user_id)
+        cached: List[Dict[str, Any]] = []
+        
+        if use_cache:
+            try:
+                session_id, cached = await asyncio.to_thread(
+                    load_cached_history, user_id, HISTORY_PAGE_SIZE
+                )
+            except Exception:
+                cached = []
+            if cached:
+                self._show_history(cached, session_id)
+                full_page = len(cached) >= HISTORY_PAGE_SIZE
+                self.history_cursor = self._messages[0].cursor if full_page else None
+                self.has_older_messages = bool(self.history_cursor)
+                self._newer_cursor = self._messages[-1].cursor
+                # Render the cached conversation before going to the network
+                yield
+        
         try:
-            # Get auth headers
-            headers = await self.get_auth_headers()
-            if not headers:
+            if cached and self._newer_cursor:
+                newer = await self._fetch_history_page(after=self._newer_cursor)
+                if newer is None:
+                    # Offline or signed out: keep showing the cached copy
+                    return
+                if not newer.get("has_more"):
+                    self._newer_cursor = newer.get("prev_cursor") or self._newer_cursor
+                    messages = newer.get("messages", [])
+                    if messages:
+                        self._messages = self._messages + [
+                            message_from_api(msg) for msg in messages
+                        ]
+                        self._sync_window()
+                        await asyncio.to_thread(
+                            store_messages, user_id, self.session_id, messages
+                        )
+                    return
+            
+            history_data = await self._fetch_history_page()
+            if history_data is None:
                 return
             
-            # Load chat history
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    f"{rx.config.get_config().api_url}/chat/history",
-                    headers=headers,
-                    timeout=30.0,
+            messages = history_data.get("messages", [])
+            self._show_history(messages, history_data.get("session_id"))
+            self.history_cursor = history_data.get("next_cursor")
+            self._newer_cursor = history_data.get("prev_cursor")
+            self.has_older_messages = bool(self.history_cursor)
+            
+            if use_cache:
+                await asyncio.to_thread(
+                    replace_cached_history, user_id, self.session_id, messages
                 )
                 
-                if response.status_code == 200:
-                    history_data = response.json()
-                    
-                    # Convert to Message objects
-                    self.messages = [
-                        Message(
-                            id=msg["id"],
-                            content=msg["content"],
-                            role=msg["role"],
-                            timestamp=datetime.fromisoformat(msg["timestamp"]),
-                            emotion_classification=msg.get("emotion_classification"),
-                            biblical_references=msg.get("biblical_references", []),
-                        )
-                        for msg in history_data.get("messages", [])
-                    ]
-                    
-                    # Set session ID if available
-                    if history_data.get("session_id"):
-                        self.session_id = history_data["session_id"]
-                        
         except Exception:
             # Silently fail - chat history is not critical
             pass
     
+    def _show_history(self, messages: List[Dict[str, Any]], session_id: Optional[str]):
+        """Replace the loaded messages with ``/chat/history`` entries."""
+        self._messages = [message_from_api(msg) for msg in messages]
+        self.window_end_offset = 0
+        self._sync_window()
+        
+        # Set session ID if available
+        if session_id:
+            self.session_id = session_id
+    
+    async def load_older_messages(self):
+        """Prepend the next page of older messages (triggered by "load older")."""
+        if not self.has_older_messages or self.is_loading_older:
+            return
+        
+        capacity = MAX_MESSAGES_IN_STATE - len(self._messages)
+        if capacity <= 0:
+            return
+        
+        self.is_loading_older = True
+        
+        try:
+            history_data = await self._fetch_history_page(
+                cursor=self.history_cursor,
+                limit=min(HISTORY_PAGE_SIZE, capacity),
+            )
+            if history_data is None:
+                return
+            
+            older_data = history_data.get("messages", [])
+            older = [message_from_api(msg) for msg in older_data]
+            self._messages = older + self._messages
+            
+            # Slide the window up so the newly loaded page is mounted
+            self.window_end_offset += min(MESSAGE_WINDOW_STEP, len(older))
+            self.history_cursor = history_data.get("next_cursor")
+            self.has_older_messages = bool(self.history_cursor)
+            self._sync_window()
+            
+            if HISTORY_CACHE_ENABLED and self.user_id:
+                await asyncio.to_thread(
+                    store_messages, self.user_id, self.session_id, older_data
+                )
+            
+        except Exception:
+            self.chat_error = "Unable to load older messages."
+        finally:
+            self.is_loading_older = False
+    
+    async def _fetch_history_page(
+        self,
+        cursor: Optional[str] = None,
+        limit: int = HISTORY_PAGE_SIZE,
+        after: Optional[str] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """Request one page of history; returns None if it could not be loaded.
+        
+        With ``after`` (a ``prev_cursor`` the server issued), only newer
+        messages are requested, oldest-first, with ``has_more`` set if the
+        page was full.
+        """
+        headers = await self.get_auth_headers()
+        if not headers:
+            return None
+        
+        params: Dict[str, Any] = {"limit": limit}
+        if cursor:
+            params["cursor"] = cursor
+        if after:
+            params["after"] = after
+        if self.session_id:
+            params["session_id"] = self.session_id
+        
+        response = await get_http_pool().get(
+            api_url("/chat/history"),
+            params=params,
+            headers=headers,
+        )
+        if response.status_code != 200:
+            return None
+        return response.json()
+    
+    def _update_pending_count(self):
+        """Recount messages that are queued or awaiting a reply."""
+        self.pending_count = len(self._outbound_queue) + (1 if self._in_flight_id else 0)
+    
+    def _prayer_request_key(self, prayer_text: str) -> str:
+        """Idempotency key for a prayer request, reused while the text is unchanged."""
+        if self._prayer_idempotency_key is None or self._prayer_idempotency_text != prayer_text:
+            self._prayer_idempotency_key = f"prayer_{uuid.uuid4().hex}"
+            self._prayer_idempotency_text = prayer_text
+        return self._prayer_idempotency_key
+    
+    def _new_message_id(self) -> str:
+        """Generate a client-side message id."""
+        return f"msg_{uuid.uuid4().hex}"
+    
+    def _find_message(self, message_id: str) -> Optional[Message]:
+        """Look up a loaded message by id, newest first."""
+        for message in reversed(self._messages):
+            if message.id == message_id:
+                return message
+        return None
+    
+    def _sync_window(self):
+        """Recompute the mounted window from the backend message list.
+        
+        This is the only place ``window_messages`` is reassigned, so the
+        settled window crosses the wire only when it actually moves. While
+        following the latest message, the newest few messages go to
+        ``live_messages`` instead.
+        """
+        total = len(self._messages)
+        end = max(0, total - self.window_end_offset)
+        start = max(0, end - MESSAGE_WINDOW_SIZE)
+        visible = self._messages[start:end]
+        
+        if self.window_end_offset == 0:
+            split = max(0, len(visible) - LIVE_TAIL_KEEP)
+            self.window_messages = visible[:split]
+            self.live_messages = visible[split:]
+        else:
+            self.window_messages = visible
+            self.live_messages = []
+        
+        self.message_count = total
+        self.hidden_older_count = start
+    
+    def _append_message(self, message: Message):
+        """Append a message, shipping only the live tail to the browser.
+        
+        Evicted messages stay reachable: when the oldest message still held
+        was loaded from the server, the history cursor moves to the cursor
+        the server issued for it, so "load older" fetches them again.
+        Messages created in this session have no server cursor; the previous
+        one is kept instead.
+        """
+        self._messages.append(message)
+        self.message_count = len(self._messages)
+        
+        if self.window_end_offset > 0:
+            # Keep the window pinned while the user is reading older messages
+            self.window_end_offset += 1
+        elif len(self.live_messages) >= LIVE_TAIL_SIZE:
+            # Fold the live tail into the settled window (amortized)
+            self._sync_window()
+        else:
+            self.live_messages.append(message)
+        
+        overflow = len(self._messages) - MAX_MESSAGES_IN_STATE
+        if overflow > 0:
+            self._messages = self._messages[overflow:]
+            self.message_count = len(self._messages)
+            self.hidden_older_count = max(0, self.hidden_older_count - overflow)
+            if self._messages[0].cursor is not None:
+                self.history_cursor = self._messages[0].cursor
+            self.has_older_messages = bool(self.history_cursor)
+    
+    def _update_message(self, message_id: str, **changes):
+        """Apply field changes to a message by id.
+        
+        Only the browser-facing list that currently holds the message is
+        marked dirty; a message outside the mounted window costs nothing.
+        """
+        message = self._find_message(message_id)
+        if message is None:
+            return
+        for field, value in changes.items():
+            setattr(message, field, value)
+        
+        for messages in (self.live_messages, self.window_messages):
+            for index in range(len(messages) - 1, -1, -1):
+                if messages[index].id == message_id:
+                    messages[index] = message
+                    return
+    
     def clear_chat(self):
         """Clear the current chat session."""
-        self.messages = []
+        self._messages = []
+        self._outbound_queue = []
+        self._update_pending_count()
         self.session_id = None
         self.current_message = ""
-        self.chat_error = None
\ No newline at end of file
+        self.chat_error = None
+        self.history_cursor = None
+        self._newer_cursor = None
+        self.has_older_messages = False
+        self.window_end_offset = 0
+        self._sync_window()
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""Benchmark the standalone app's memory under adversarial request bodies.
+
+Starts the standalone server in a subprocess, samples its resident memory
+while attacking POST /api/chat, and reports the status codes returned and
+how quickly each attack was refused:
+
+- ``oversized``: clients claim a huge ``Content-Length`` and start sending;
+- ``slow-drip``: clients send a valid-sized body a few bytes at a time;
+- ``max-size``: clients send bodies just under the limit, all at once.
+
+With body limits in place, resident memory should stay flat across all
+three. Run from the app directory:
+
+    python scripts/benchmark_body_limits.py --clients 50
+    SERVER_BODY_TIMEOUT=2 python scripts/benchmark_body_limits.py --mode asyncio
+"""
+
+import argparse
+import http.client
+import json
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Callable, Optional, Tuple
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SERVER_SCRIPT = """
+import webbrowser
+webbrowser.open = lambda *args, **kwargs: None
+import standalone_app
+standalone_app.run_server({port})
+"""
+
+
+def rss_mb(pid: int) -> float:
+    """Resident set size of a process in MiB (Linux)."""
+    with open(f"/proc/{pid}/status") as handle:
+        for line in handle:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def read_status(sock: socket.socket) -> Optional[int]:
+    """Read the status code of the response on ``sock``, if one arrives."""
+    try:
+        line = sock.makefile("rb").readline()
+        return int(line.split()[1])
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def oversized(port: int, max_bytes: int) -> Optional[int]:
+    """Claim a body 1000x the limit and keep sending until refused."""
+    sock = socket.create_connection(("127.0.0.1", port), timeout=30)
+    head = (
+        "POST /api/chat HTTP/1.1\r\nHost: bench\r\nContent-Type: application/json\r\n"
+        f"Content-Length: {max_bytes * 1000}\r\n\r\n"
+    )
+    sock.sendall(head.encode())
+    try:
+        chunk = b" " * 65536
+        for _ in range(16):
+            sock.sendall(chunk)
+    except OSError:
+        pass
+    status = read_status(sock)
+    sock.close()
+    return status
+
+
+def slow_drip(port: int, max_bytes: int) -> Optional[int]:
+    """Send a valid-sized body a few bytes at a time."""
+    length = max_bytes // 2
+    sock = socket.create_connection(("127.0.0.1", port), timeout=60)
+    head = (
+        "POST /api/chat HTTP/1.1\r\nHost: bench\r\nContent-Type: application/json\r\n"
+        f"Content-Length: {length}\r\n\r\n{{"
+    )
+    sock.sendall(head.encode())
+    try:
+        for _ in range(length):
+            sock.sendall(b"  ")
+            time.sleep(0.25)
+            # Stop once the server has answered (and closed)
+            sock.setblocking(False)
+            try:
+                if sock.recv(1, socket.MSG_PEEK):
+                    break
+            except BlockingIOError:
+                pass
+            finally:
+                sock.setblocking(True)
+    except OSError:
+        pass
+    status = read_status(sock)
+    sock.close()
+    return status
+
+
+def max_size(port: int, max_bytes: int) -> Optional[int]:
+    """Send a valid JSON body just under the limit."""
+    padding = "x" * (max_bytes - 64)
+    body = json.dumps({"message": "I'm anxious about work", "padding": padding})
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=60)
+    conn.request("POST", "/api/chat", body=body, headers={"Content-Type": "application/json"})
+    response = conn.getresponse()
+    response.read()
+    conn.close()
+    return response.status
+
+
+def attack(
+    client: Callable[[int, int], Optional[int]], clients: int, port: int, pid: int, max_bytes: int
+) -> Tuple[Counter, float, float, float]:
+    """Run ``clients`` concurrent attackers; return statuses, elapsed and RSS before/peak."""
+    statuses: Counter = Counter()
+    baseline = rss_mb(pid)
+    peak = baseline
+    lock = threading.Lock()
+
+    def run():
+        try:
+            status = client(port, max_bytes)
+        except OSError:
+            status = None
+        with lock:
+            statuses[status] += 1
+
+    threads = [threading.Thread(target=run) for _ in range(clients)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    while any(thread.is_alive() for thread in threads):
+        peak = max(peak, rss_mb(pid))
+        time.sleep(0.05)
+    return statuses, time.perf_counter() - started, baseline, peak
+
+
+def main():
+    """Start the server, run each attack and print a table."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clients", type=int, default=50)
+    parser.add_argument("--port", type=int, default=8011)
+    parser.add_argument("--mode", choices=["threaded", "asyncio"], default="threaded")
+    args = parser.parse_args()
+
+    max_bytes = int(os.getenv("SERVER_MAX_BODY_BYTES", 64 * 1024))
+    env = dict(os.environ, SERVER_MODE=args.mode, SERVER_PROCESSES="1")
+    server = subprocess.Popen(
+        [sys.executable, "-c", SERVER_SCRIPT.format(port=args.port)],
+        cwd=APP_DIR,
+        env=env,
+        stdout=subprocess.DEVNULL,
+    )
+    try:
+        time.sleep(2)
+        print(f"{args.mode} server, {args.clients} clients per attack, {max_bytes} byte limit")
+        print(f"{'attack':<12} {'statuses':<28} {'seconds':>8} {'rss MiB':>9} {'peak MiB':>9}")
+        for name, client in (("oversized", oversized), ("slow-drip", slow_drip), ("max-size", max_size)):
+            statuses, elapsed, baseline, peak = attack(client, args.clients, args.port, server.pid, max_bytes)
+            summary = ", ".join(f"{status}: {count}" for status, count in sorted(statuses.items(), key=str))
+            print(f"{name:<12} {summary:<28} {elapsed:>8.2f} {baseline:>9.1f} {peak:>9.1f}")
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+
+if __name__ == "__main__":
+    main()
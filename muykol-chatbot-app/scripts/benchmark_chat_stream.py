@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""Benchmark streamed vs. buffered chat replies against the standalone app.
+
+Measures time-to-first-token (TTFT) and total reply time for POST /api/chat
+with and without ``"stream": true``. Start the server first:
+
+    CHAT_SIMULATED_TOKEN_DELAY_MS=30 python standalone_app.py
+    python scripts/benchmark_chat_stream.py --requests 20
+"""
+
+import argparse
+import http.client
+import json
+import statistics
+import time
+from typing import Dict, List, Tuple
+
+
+def run_request(host: str, port: int, stream: bool) -> Tuple[float, float]:
+    """Send one chat request and return (time_to_first_token, total_time)."""
+    body = json.dumps({"message": "I'm anxious about work", "stream": stream})
+    headers = {"Content-Type": "application/json"}
+    if stream:
+        headers["Accept"] = "text/event-stream"
+
+    conn = http.client.HTTPConnection(host, port, timeout=60)
+    started = time.perf_counter()
+    conn.request("POST", "/api/chat", body=body, headers=headers)
+    response = conn.getresponse()
+
+    first_token = None
+    if stream:
+        # The first delta event carries the first visible token
+        while True:
+            line = response.readline()
+            if not line:
+                break
+            if line.startswith(b"event: delta") and first_token is None:
+                first_token = time.perf_counter() - started
+    else:
+        response.read()
+        first_token = time.perf_counter() - started
+
+    total = time.perf_counter() - started
+    conn.close()
+    return first_token or total, total
+
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    """Return p50/p95 in milliseconds."""
+    ordered = sorted(samples)
+    p95_index = max(0, int(len(ordered) * 0.95) - 1)
+    return {
+        "p50_ms": statistics.median(ordered) * 1000,
+        "p95_ms": ordered[p95_index] * 1000,
+    }
+
+
+def main():
+    """Run the benchmark and print a comparison table."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--requests", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"📊 Benchmarking http://{args.host}:{args.port}/api/chat "
+          f"({args.requests} requests per mode)")
+
+    for stream in (False, True):
+        results = [run_request(args.host, args.port, stream) for _ in range(args.requests)]
+        ttft = summarize([first for first, _ in results])
+        total = summarize([total for _, total in results])
+        mode = "streamed" if stream else "buffered"
+        print(f"  {mode:<9} TTFT p50={ttft['p50_ms']:.1f}ms p95={ttft['p95_ms']:.1f}ms | "
+              f"total p50={total['p50_ms']:.1f}ms p95={total['p95_ms']:.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
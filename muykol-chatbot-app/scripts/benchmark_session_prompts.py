@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""Benchmark prompt size and generation latency against session length.
+
+Simulates sessions of increasing length and, at the last turn of each,
+builds the generation prompt two ways:
+
+- ``full``: the whole history resent verbatim;
+- ``rolling``: the rolling summary plus the turns it does not cover yet
+  (``backend.session_summary``), folded as the session went along.
+
+Each prompt is sent through ``GenerationClient`` to an in-process stand-in
+model whose latency grows with prompt tokens (``--prefill-tokens-per-second``),
+so the latency column shows what prompt growth costs:
+
+    python scripts/benchmark_session_prompts.py --lengths 5 20 50 100 200
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import threading
+import time
+from typing import Dict, List
+
+# Run as ``python scripts/benchmark_session_prompts.py``: make the app package importable
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from faith_motivator_chatbot.backend.generation import GenerationClient, HTTPModelBackend, estimate_tokens
+from faith_motivator_chatbot.backend.model_standin import StandinModel, make_handler
+from faith_motivator_chatbot.backend.serving import make_server
+from faith_motivator_chatbot.backend.session_summary import RollingSummarizer, SessionSummary
+
+USER_MESSAGES = [
+    ("anxiety", "I'm really anxious about my job interview tomorrow. I keep imagining everything going wrong."),
+    ("sadness", "My grandmother passed away last month and some days I can barely get out of bed."),
+    ("loneliness", "Since I moved to a new city I don't really have anyone to talk to at church."),
+    ("gratitude", "I wanted to say thank you. The prayer last week really helped and things got better."),
+    ("guilt", "I said something hurtful to my brother and I can't stop thinking about it."),
+    ("hope", "I think I'm finally starting to see a way forward with my finances."),
+]
+
+REPLY = (
+    "Thank you for sharing that with me. It makes sense to feel this way, and God sees you in it. "
+    "Philippians 4:6-7 reminds us to bring every worry to Him in prayer, and His peace will guard "
+    "your heart. One small step for today: write down one thing you can hand over to Him."
+)
+
+
+def synthetic_history(turns: int, seed: int = 3) -> List[Dict]:
+    rng = random.Random(seed)
+    messages = []
+    for _ in range(turns):
+        emotion, text = rng.choice(USER_MESSAGES)
+        messages.append({"role": "user", "content": text, "emotion_classification": emotion})
+        messages.append({"role": "assistant", "content": REPLY, "biblical_references": ["Philippians 4:6-7"]})
+    return messages
+
+
+def rolling_state(history: List[Dict], rolling: RollingSummarizer):
+    """Replay the session turn by turn, folding as the service would; time the folds."""
+    session = SessionSummary("bench")
+    fold_times = []
+    for end in range(2, len(history) + 1, 2):
+        session.message_count = end
+        if rolling.should_fold(session):
+            started = time.perf_counter()
+            session = rolling.fold(session, history[session.summarized_count:end])
+            fold_times.append(time.perf_counter() - started)
+    return session, history[session.summarized_count:], fold_times
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--lengths", type=int, nargs="+", default=[5, 10, 20, 50, 100, 200], help="Turns per session")
+    parser.add_argument("--calls", type=int, default=5, help="Generation calls per prompt")
+    parser.add_argument("--latency", default="fixed:0.05", help="Stand-in base latency")
+    parser.add_argument("--prefill-tokens-per-second", type=float, default=20000)
+    args = parser.parse_args()
+
+    model = StandinModel(args.latency, prefill_tokens_per_second=args.prefill_tokens_per_second)
+    server = make_server(("127.0.0.1", 0), make_handler(model), mode="threaded", workers=8)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    backend = HTTPModelBackend(f"http://127.0.0.1:{server.server_address[1]}")
+    client = GenerationClient(backend, requests_per_second=1e6, request_burst=1e6, tokens_per_second=1e9, token_burst=1e9)
+    rolling = RollingSummarizer()
+    new_message = "I'm still struggling with worry tonight. Can you pray with me?"
+
+    print(f"{'turns':>6} {'full tokens':>12} {'rolling tokens':>15} {'full p50 ms':>12} {'rolling p50 ms':>15} {'fold ms':>8}")
+    try:
+        for turns in args.lengths:
+            history = synthetic_history(turns)
+            full_prompt = rolling.build_prompt(SessionSummary("bench"), history, new_message)
+            session, pending, fold_times = rolling_state(history, rolling)
+            rolling_prompt = rolling.build_prompt(session, pending, new_message)
+
+            timings = {}
+            for name, prompt in (("full", full_prompt), ("rolling", rolling_prompt)):
+                latencies = [client.generate(prompt, max_tokens=64).latency for _ in range(args.calls)]
+                timings[name] = statistics.median(latencies) * 1000
+            fold_ms = statistics.mean(fold_times) * 1000 if fold_times else 0.0
+            print(
+                f"{turns:>6} {estimate_tokens(full_prompt):>12} {estimate_tokens(rolling_prompt):>15} "
+                f"{timings['full']:>12.1f} {timings['rolling']:>15.1f} {fold_ms:>8.3f}"
+            )
+    finally:
+        backend.close()
+        server.shutdown()
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""Benchmark local verse retrieval on a synthetic 30k-verse corpus.
+
+Synthetic verses are drawn from the vocabulary of the bundled biblical
+content and the emotion lexicon, each filed under one or two emotions.
+Reports index build time, matrix size and query latency (embedding, one
+matrix-vector product and ``argpartition``), with and without an
+emotion filter:
+
+    python scripts/benchmark_verse_retrieval.py --verses 30000 --queries 500
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+from typing import Dict, List
+
+# Run as ``python scripts/benchmark_verse_retrieval.py``: make the app package importable
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from faith_motivator_chatbot.backend.content_store import load_source
+from faith_motivator_chatbot.backend.emotion import EMOTION_LABELS, LEXICON
+from faith_motivator_chatbot.backend.verse_retrieval import EMBEDDING_DIM, VerseIndex
+
+QUERIES = [
+    "I've been feeling really stressed about work lately and can't stop worrying",
+    "My mother passed away last week and I can't stop crying",
+    "I feel so alone since I moved to a new city",
+    "I messed up badly and I feel ashamed",
+    "God answered my prayers, I'm so grateful",
+    "I'm scared about my surgery next week",
+    "I'm so angry at my brother for what he said",
+    "Things are finally getting better and I'm hopeful",
+]
+
+
+def synthetic_corpus(size: int, seed: int = 7):
+    """Verses of 12-40 words sampled from the bundled content's vocabulary."""
+    rng = random.Random(seed)
+    vocabulary: List[str] = []
+    for entry in load_source().values():
+        for verse in entry["verses"]:
+            vocabulary.extend(verse["text"].split())
+    for terms in LEXICON.values():
+        vocabulary.extend(term for term in terms if " " not in term)
+
+    verses: List[Dict[str, str]] = []
+    emotions: List[List[str]] = []
+    for number in range(size):
+        text = " ".join(rng.choice(vocabulary) for _ in range(rng.randint(12, 40)))
+        verses.append({"reference": f"Synthetic {number}", "text": text, "theme": "synthetic"})
+        emotions.append(rng.sample(EMOTION_LABELS, rng.randint(1, 2)))
+    return verses, emotions
+
+
+def time_queries(index: VerseIndex, count: int, k: int, emotion: bool) -> Dict[str, float]:
+    """Run ``count`` searches and return p50/p95 latency in milliseconds."""
+    samples = []
+    for number in range(count):
+        query = QUERIES[number % len(QUERIES)]
+        label = EMOTION_LABELS[number % len(EMOTION_LABELS)] if emotion else None
+        started = time.perf_counter()
+        index.search(query, k, emotion=label)
+        samples.append(time.perf_counter() - started)
+    ordered = sorted(samples)
+    return {
+        "p50_ms": statistics.median(ordered) * 1000,
+        "p95_ms": ordered[max(0, int(len(ordered) * 0.95) - 1)] * 1000,
+    }
+
+
+def main():
+    """Build the index and print build and query timings."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--verses", type=int, default=30000)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--dim", type=int, default=EMBEDDING_DIM)
+    args = parser.parse_args()
+
+    verses, emotions = synthetic_corpus(args.verses)
+    started = time.perf_counter()
+    index = VerseIndex(verses, emotions, dim=args.dim)
+    build_seconds = time.perf_counter() - started
+
+    print(f"{args.verses} verses, {args.dim} dims, top {args.k}")
+    print(f"build: {build_seconds:.2f} s, matrix: {index.matrix.nbytes / 2**20:.1f} MiB")
+    for label, filtered in (("unfiltered", False), ("emotion filter", True)):
+        stats = time_queries(index, args.queries, args.k, filtered)
+        print(f"{label:<15} p50 {stats['p50_ms']:.2f} ms   p95 {stats['p95_ms']:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
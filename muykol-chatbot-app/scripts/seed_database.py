@@ -3,45 +3,55 @@
 
 import asyncio
 import json
+import os
+import sys
 import uuid
 from datetime import datetime, timedelta
 from typing import List, Dict, Any
-import boto3
 from botocore.exceptions import ClientError
 
+# Run as ``python scripts/seed_database.py``: make the app package importable
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from faith_motivator_chatbot.backend.content_store import CONTENT_STORE_PATH, build
+from faith_motivator_chatbot.backend.repositories import (
+    AsyncDynamoDB,
+    ChatMessage,
+    ConsentLog,
+    ConversationSession,
+    DynamoDBSettings,
+    PrayerRequest,
+    Repositories,
+    UserProfile,
+)
+
 
 class DatabaseSeeder:
     """Database seeding utility for development and testing."""
     
     def __init__(self, endpoint_url: str = "http://localhost:4566"):
         """Initialize the database seeder."""
-        self.dynamodb = boto3.resource(
-            'dynamodb',
-            endpoint_url=endpoint_url,
-            region_name='us-east-1',
-            aws_access_key_id='test',
-            aws_secret_access_key='test'
-        )
+        # LocalStack accepts any credentials
+        os.environ.setdefault('AWS_ACCESS_KEY_ID', 'test')
+        os.environ.setdefault('AWS_SECRET_ACCESS_KEY', 'test')
+        settings = DynamoDBSettings.from_env()
+        settings.endpoint_url = endpoint_url
+        self.database = AsyncDynamoDB(settings)
+        self.repositories = Repositories(self.database)
     
     async def seed_all_tables(self):
         """Seed all tables with test data."""
         print("🌱 Starting database seeding...")
         
         try:
-            # Seed user profiles
-            await self.seed_user_profiles()
-            
-            # Seed conversation sessions
-            await self.seed_conversation_sessions()
-            
-            # Seed chat messages
-            await self.seed_chat_messages()
-            
-            # Seed prayer requests
-            await self.seed_prayer_requests()
-            
-            # Seed consent logs
-            await self.seed_consent_logs()
+            # The tables are independent, so seed them concurrently
+            await asyncio.gather(
+                self.seed_user_profiles(),
+                self.seed_conversation_sessions(),
+                self.seed_chat_messages(),
+                self.seed_prayer_requests(),
+                self.seed_consent_logs(),
+            )
             
             # Seed biblical content (if table exists)
             await self.seed_biblical_content()
@@ -51,13 +61,13 @@ class DatabaseSeeder:
         except Exception as e:
             print(f"❌ Error during database seeding: {e}")
             raise
+        finally:
+            await self.database.close()
     
     async def seed_user_profiles(self):
         """Seed user profiles table with test data."""
         print("Seeding user profiles...")
         
-        table = self.dynamodb.Table('FaithChatbot-UserProfiles')
-        
         test_users = [
             {
                 'user_id': 'user_001',
@@ -139,19 +149,16 @@ class DatabaseSeeder:
             }
         ]
         
-        for user in test_users:
-            try:
-                table.put_item(Item=user)
-                print(f"  ✓ Created user: {user['first_name']} {user['last_name']}")
-            except ClientError as e:
-                print(f"  ✗ Failed to create user {user['email']}: {e}")
+        try:
+            written = await self.repositories.users.batch_put([UserProfile.from_item(item) for item in test_users])
+            print(f"  ✓ Created {written} user profiles")
+        except ClientError as e:
+            print(f"  ✗ Failed to create user profiles: {e}")
     
     async def seed_conversation_sessions(self):
         """Seed conversation sessions table."""
         print("Seeding conversation sessions...")
         
-        table = self.dynamodb.Table('FaithChatbot-ConversationSessions')
-        
         sessions = [
             {
                 'session_id': 'session_001',
@@ -160,6 +167,7 @@ class DatabaseSeeder:
                 'updated_at': (datetime.now() - timedelta(days=2)).isoformat(),
                 'status': 'completed',
                 'message_count': 8,
+                'summarized_count': 2,
                 'emotion_classifications': ['anxiety', 'hope'],
                 'biblical_themes': ['peace', 'trust', 'gods_love'],
                 'session_summary': 'User discussed work-related anxiety and received biblical encouragement about trusting in God.'
@@ -171,6 +179,7 @@ class DatabaseSeeder:
                 'updated_at': (datetime.now() - timedelta(hours=4)).isoformat(),
                 'status': 'active',
                 'message_count': 12,
+                'summarized_count': 6,
                 'emotion_classifications': ['gratitude', 'joy'],
                 'biblical_themes': ['thanksgiving', 'praise'],
                 'session_summary': 'User shared gratitude for answered prayers and discussed spiritual growth.'
@@ -182,25 +191,23 @@ class DatabaseSeeder:
                 'updated_at': (datetime.now() - timedelta(hours=8)).isoformat(),
                 'status': 'completed',
                 'message_count': 6,
+                'summarized_count': 0,
                 'emotion_classifications': ['sadness', 'hope'],
                 'biblical_themes': ['comfort', 'healing'],
                 'session_summary': 'User sought comfort during a difficult time and received biblical encouragement.'
             }
         ]
         
-        for session in sessions:
-            try:
-                table.put_item(Item=session)
-                print(f"  ✓ Created session: {session['session_id']}")
-            except ClientError as e:
-                print(f"  ✗ Failed to create session {session['session_id']}: {e}")
+        try:
+            written = await self.repositories.sessions.batch_put([ConversationSession.from_item(item) for item in sessions])
+            print(f"  ✓ Created {written} sessions")
+        except ClientError as e:
+            print(f"  ✗ Failed to create sessions: {e}")
     
     async def seed_chat_messages(self):
         """Seed chat messages table."""
         print("Seeding chat messages...")
         
-        table = self.dynamodb.Table('FaithChatbot-ChatMessages')
-        
         messages = [
             # Session 1 messages
             {
@@ -244,19 +251,16 @@ class DatabaseSeeder:
             }
         ]
         
-        for message in messages:
-            try:
-                table.put_item(Item=message)
-                print(f"  ✓ Created message: {message['message_id']}")
-            except ClientError as e:
-                print(f"  ✗ Failed to create message {message['message_id']}: {e}")
+        try:
+            written = await self.repositories.messages.batch_put([ChatMessage.from_item(item) for item in messages])
+            print(f"  ✓ Created {written} messages")
+        except ClientError as e:
+            print(f"  ✗ Failed to create messages: {e}")
     
     async def seed_prayer_requests(self):
         """Seed prayer requests table."""
         print("Seeding prayer requests...")
         
-        table = self.dynamodb.Table('FaithChatbot-PrayerRequests')
-        
         prayer_requests = [
             {
                 'request_id': 'prayer_001',
@@ -292,19 +296,16 @@ class DatabaseSeeder:
             }
         ]
         
-        for request in prayer_requests:
-            try:
-                table.put_item(Item=request)
-                print(f"  ✓ Created prayer request: {request['request_id']}")
-            except ClientError as e:
-                print(f"  ✗ Failed to create prayer request {request['request_id']}: {e}")
+        try:
+            written = await self.repositories.prayer_requests.batch_put([PrayerRequest.from_item(item) for item in prayer_requests])
+            print(f"  ✓ Created {written} prayer requests")
+        except ClientError as e:
+            print(f"  ✗ Failed to create prayer requests: {e}")
     
     async def seed_consent_logs(self):
         """Seed consent logs table."""
         print("Seeding consent logs...")
         
-        table = self.dynamodb.Table('FaithChatbot-ConsentLogs')
-        
         consent_logs = [
             {
                 'log_id': str(uuid.uuid4()),
@@ -338,70 +339,21 @@ class DatabaseSeeder:
             }
         ]
         
-        for log in consent_logs:
-            try:
-                table.put_item(Item=log)
-                print(f"  ✓ Created consent log: {log['log_id'][:8]}...")
-            except ClientError as e:
-                print(f"  ✗ Failed to create consent log: {e}")
+        try:
+            written = await self.repositories.consent_logs.batch_put([ConsentLog.from_item(item) for item in consent_logs])
+            print(f"  ✓ Created {written} consent logs")
+        except ClientError as e:
+            print(f"  ✗ Failed to create consent logs: {e}")
     
     async def seed_biblical_content(self):
-        """Seed biblical content for emotion matching."""
+        """Compile the biblical content used for emotion matching."""
         print("Seeding biblical content...")
         
-        # This would typically be stored in S3 or a separate table
-        # For now, we'll create a simple structure
-        biblical_content = {
-            'anxiety': {
-                'verses': [
-                    {
-                        'reference': 'Philippians 4:6-7',
-                        'text': 'Do not be anxious about anything, but in every situation, by prayer and petition, with thanksgiving, present your requests to God. And the peace of God, which transcends all understanding, will guard your hearts and your minds in Christ Jesus.',
-                        'theme': 'peace_and_trust'
-                    },
-                    {
-                        'reference': 'Matthew 6:25-26',
-                        'text': 'Therefore I tell you, do not worry about your life, what you will eat or drink; or about your body, what you will wear. Is not life more than food, and the body more than clothes? Look at the birds of the air; they do not sow or reap or store away in barns, and yet your heavenly Father feeds them. Are you not much more valuable than they?',
-                        'theme': 'gods_provision'
-                    }
-                ],
-                'reflections': [
-                    'God invites us to bring our worries to Him in prayer, knowing that His peace surpasses our understanding.',
-                    'When anxiety overwhelms us, we can remember that we are precious to God and He cares for our every need.'
-                ],
-                'action_steps': [
-                    'Take 3 deep breaths and speak this worry aloud to God in prayer',
-                    'Write down one thing you\'re grateful for today',
-                    'Spend 5 minutes in quiet reflection on God\'s faithfulness'
-                ]
-            },
-            'gratitude': {
-                'verses': [
-                    {
-                        'reference': '1 Thessalonians 5:18',
-                        'text': 'Give thanks in all circumstances; for this is God\'s will for you in Christ Jesus.',
-                        'theme': 'thanksgiving'
-                    },
-                    {
-                        'reference': 'Psalm 100:4',
-                        'text': 'Enter his gates with thanksgiving and his courts with praise; give thanks to him and praise his name.',
-                        'theme': 'praise'
-                    }
-                ],
-                'reflections': [
-                    'Gratitude transforms our perspective and draws us closer to God\'s heart.',
-                    'Even in difficult times, we can find reasons to thank God for His faithfulness.'
-                ],
-                'action_steps': [
-                    'Write down three things you\'re grateful for today',
-                    'Share your gratitude with someone who has blessed you',
-                    'Spend time in worship, thanking God for His goodness'
-                ]
-            }
-        }
-        
-        # In a real implementation, this would be stored in S3 or DynamoDB
-        print("  ✓ Biblical content structure created (would be stored in S3)")
+        # The content lives in faith_motivator_chatbot/content/biblical_content.json
+        # and is served from a compiled, memory-mapped store rather than a table;
+        # building it here means app processes only open it
+        build()
+        print(f"  ✓ Biblical content compiled to {CONTENT_STORE_PATH}")
 
 
 async def main():
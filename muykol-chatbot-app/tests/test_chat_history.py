@@ -0,0 +1,150 @@
+"""Tests for history cursors and the paginated history reads."""
+
+import pytest
+
+from faith_motivator_chatbot.backend.chat_history import (
+    MAX_PAGE_SIZE,
+    TIMESTAMP_INDEX,
+    decode_cursor,
+    encode_cursor,
+)
+from faith_motivator_chatbot.backend.repositories import deserialize, serialize
+from tests.test_repositories import FakeClient, repositories
+
+
+class FakeTimestampIndex:
+    """Answers ChatMessages ``query`` calls on the TimestampIndex from a list."""
+
+    def __init__(self, items):
+        self.items = sorted(items, key=lambda item: item["timestamp"])
+
+    def __call__(self, **kwargs):
+        values = deserialize(kwargs["ExpressionAttributeValues"])
+        if kwargs["ScanIndexForward"]:
+            # session_id = :session AND #ts > :after
+            after = values[":after"]
+            ordered = [item for item in self.items if item["timestamp"] > after]
+        else:
+            ordered = list(reversed(self.items))
+        start = kwargs.get("ExclusiveStartKey")
+        if start:
+            start_at = deserialize(start)["timestamp"]
+            ordered = [item for item in ordered if item["timestamp"] < start_at]
+        page = ordered[: kwargs["Limit"]]
+        result = {"Items": [serialize(item) for item in page]}
+        if len(ordered) > len(page):
+            last = page[-1]
+            result["LastEvaluatedKey"] = serialize({
+                "session_id": last["session_id"],
+                "message_id": last["message_id"],
+                "timestamp": last["timestamp"],
+            })
+        return result
+
+
+def make_items(count):
+    return [
+        {
+            "session_id": "session_001",
+            "message_id": f"msg_{i:03d}",
+            "timestamp": f"2024-01-01T00:{i // 60:02d}:{i % 60:02d}",
+            "role": "user" if i % 2 == 0 else "assistant",
+            "content": f"message {i}",
+        }
+        for i in range(count)
+    ]
+
+
+def history(count):
+    client = FakeClient(responses={"query": FakeTimestampIndex(make_items(count))})
+    return client, repositories(client).messages
+
+
+def ids(page):
+    return [message["id"] for message in page["messages"]]
+
+
+class TestCursor:
+    """Cursor encoding tests."""
+
+    def test_round_trip(self):
+        cursor = encode_cursor("session_001", "msg_001", "2024-01-01T00:00:00")
+        assert decode_cursor(cursor) == {
+            "session_id": "session_001",
+            "message_id": "msg_001",
+            "timestamp": "2024-01-01T00:00:00",
+        }
+
+    def test_rejects_garbage(self):
+        with pytest.raises(ValueError):
+            decode_cursor("not-a-cursor")
+
+    @pytest.mark.asyncio
+    async def test_rejects_cursor_from_other_session(self):
+        _, messages = history(5)
+        cursor = encode_cursor("session_002", "msg_001", "2024-01-01T00:00:00")
+        with pytest.raises(ValueError):
+            await messages.history_page("session_001", cursor=cursor)
+
+
+class TestHistoryPages:
+    """Pagination behaviour against a fake index."""
+
+    @pytest.mark.asyncio
+    async def test_query_uses_timestamp_index_newest_first(self):
+        client, messages = history(5)
+        await messages.history_page("session_001", limit=10_000)
+        query = client.calls[0][1]
+        assert query["IndexName"] == TIMESTAMP_INDEX
+        assert query["ScanIndexForward"] is False
+        assert query["Limit"] == MAX_PAGE_SIZE
+
+    @pytest.mark.asyncio
+    async def test_pages_walk_back_through_history(self):
+        _, messages = history(25)
+
+        first = await messages.history_page("session_001", limit=10)
+        assert ids(first) == [f"msg_{i:03d}" for i in range(15, 25)]
+        assert first["next_cursor"]
+        assert first["prev_cursor"] == first["messages"][-1]["cursor"]
+
+        second = await messages.history_page(
+            "session_001", limit=10, cursor=first["next_cursor"]
+        )
+        assert ids(second) == [f"msg_{i:03d}" for i in range(5, 15)]
+
+        third = await messages.history_page(
+            "session_001", limit=10, cursor=second["next_cursor"]
+        )
+        assert ids(third) == [f"msg_{i:03d}" for i in range(0, 5)]
+        assert third["next_cursor"] is None
+
+
+class TestHistoryAfter:
+    """Incremental sync from a server-issued high-water-mark cursor."""
+
+    @pytest.mark.asyncio
+    async def test_after_query_reads_forward_from_watermark(self):
+        client, messages = history(5)
+        cursor = encode_cursor("session_001", "msg_002", "2024-01-01T00:00:02")
+        await messages.history_after("session_001", cursor, limit=20)
+        query = client.calls[0][1]
+        assert query["IndexName"] == TIMESTAMP_INDEX
+        assert query["ScanIndexForward"] is True
+        assert query["Limit"] == 20
+
+    @pytest.mark.asyncio
+    async def test_returns_only_newer_messages_oldest_first(self):
+        _, messages = history(25)
+        page = await messages.history_page("session_001", limit=6)
+        watermark = page["messages"][0]["cursor"]
+
+        newer = await messages.history_after("session_001", watermark, limit=10)
+        assert ids(newer) == [f"msg_{i:03d}" for i in range(20, 25)]
+        assert newer["has_more"] is False
+        assert newer["prev_cursor"] == page["prev_cursor"]
+
+        oldest = encode_cursor("session_001", "msg_000", "2024-01-01T00:00:00")
+        gap = await messages.history_after("session_001", oldest, limit=10)
+        assert len(gap["messages"]) == 10
+        assert gap["has_more"] is True
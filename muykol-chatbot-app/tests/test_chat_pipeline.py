@@ -0,0 +1,229 @@
+"""Tests for the concurrent chat-turn pipeline."""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from faith_motivator_chatbot.backend import chat_pipeline
+from faith_motivator_chatbot.backend.chat_history import item_to_api_message
+from faith_motivator_chatbot.backend.chat_pipeline import BackgroundLoop, ChatPipeline
+from faith_motivator_chatbot.backend.generation import GenerationTimeout
+from faith_motivator_chatbot.backend.repositories import ConversationSession
+from faith_motivator_chatbot.backend.session_summary import RollingSummarizer
+
+DEFAULT_VERSES = [{"reference": "Philippians 4:13", "text": "I can do all things"}]
+
+
+class FakeSessions:
+    """Session repository over one in-memory session."""
+
+    def __init__(self, delay=0.0, session=None):
+        self.delay = delay
+        self.session = session
+
+    async def get(self, session_id):
+        await asyncio.sleep(self.delay)
+        return self.session
+
+    async def add_messages(self, session_id, added=1):
+        if self.session is None:
+            self.session = ConversationSession(session_id)
+        self.session.message_count += added
+        return ConversationSession.from_item(self.session.to_item())
+
+    async def save_summary(self, summary, previous_summarized_count):
+        if self.session.summarized_count != previous_summarized_count:
+            return False
+        self.session.session_summary = summary.summary
+        self.session.summarized_count = summary.summarized_count
+        return True
+
+
+class FakeMessages:
+    """Message repository over an in-memory, oldest-first history."""
+
+    def __init__(self, delay=0.0, messages=()):
+        self.delay = delay
+        self.messages = list(messages)
+
+    async def history_page(self, session_id, limit=None):
+        await asyncio.sleep(self.delay)
+        return {"messages": self.messages[-limit:], "next_cursor": None, "session_id": session_id}
+
+    async def batch_put(self, records):
+        self.messages.extend(item_to_api_message(record.to_item()) for record in records)
+        return len(records)
+
+
+class FakeRepositories:
+    def __init__(self, sessions=None, messages=None):
+        self.sessions = sessions or FakeSessions()
+        self.messages = messages or FakeMessages()
+
+
+class Recorder:
+    """Stage callables that sleep and record what they were given."""
+
+    def __init__(self, classify_delay=0.0, retrieve_delay=0.0, generate_delay=0.0):
+        self.classify_delay = classify_delay
+        self.retrieve_delay = retrieve_delay
+        self.generate_delay = generate_delay
+        self.prompts = []
+        self.speculative = []
+
+    def classify(self, message):
+        time.sleep(self.classify_delay)
+        return "anxiety"
+
+    def retrieve(self, message, emotion):
+        time.sleep(self.retrieve_delay)
+        return [{"reference": "1 Peter 5:7", "text": "Cast all your anxiety on him", "emotion": emotion}]
+
+    def generate(self, message, emotion, prompt, personalized, speculative):
+        self.prompts.append(prompt)
+        self.speculative.append(speculative)
+        time.sleep(self.generate_delay)
+        return f"reply to {message}", False
+
+
+def pipeline(recorder, **kwargs):
+    return ChatPipeline(
+        recorder.classify, recorder.retrieve, recorder.generate, default_verses=DEFAULT_VERSES, **kwargs
+    )
+
+
+class TestChatPipeline:
+    """Fan-out, deadlines, speculation and timings."""
+
+    @pytest.mark.asyncio
+    async def test_independent_stages_overlap(self):
+        recorder = Recorder(classify_delay=0.05, retrieve_delay=0.1, generate_delay=0.1)
+        chat = pipeline(recorder, repositories=FakeRepositories(FakeSessions(0.05), FakeMessages(0.05)))
+        started = time.perf_counter()
+        turn = await chat.run("I'm worried about work", session_id="s1")
+        elapsed = time.perf_counter() - started
+        # Sequential: 0.05 + 0.05 + 0.05 + 0.1 + 0.1 = 0.35s
+        assert elapsed < 0.25
+        assert turn.reply == "reply to I'm worried about work"
+        assert turn.verses[0]["emotion"] == "anxiety"
+        assert turn.speculation == "used"
+        stages = turn.timings.as_dict()["stages"]
+        assert {name: stage["status"] for name, stage in stages.items()} == {
+            "crisis": "ok", "classification": "ok", "session": "ok",
+            "history": "ok", "retrieval": "ok", "generation": "ok",
+        }
+        assert stages["generation"]["start_ms"] < stages["retrieval"]["start_ms"] + stages["retrieval"]["duration_ms"]
+
+    @pytest.mark.asyncio
+    async def test_stage_past_its_deadline_falls_back(self):
+        recorder = Recorder(retrieve_delay=0.2)
+        turn = await pipeline(recorder, deadlines={"retrieval": 0.05}).run("I'm worried")
+        assert turn.verses == DEFAULT_VERSES
+        stages = turn.timings.as_dict()["stages"]
+        assert stages["retrieval"]["status"] == "timeout"
+        assert stages["session"]["status"] == "skipped"
+
+    @pytest.mark.asyncio
+    async def test_stuck_stage_threads_stay_in_their_own_pool(self, monkeypatch):
+        monkeypatch.setattr(chat_pipeline, "CHAT_STAGE_WORKERS", 1)
+        calls = []
+
+        class Stuck(Recorder):
+            def classify(self, message):
+                calls.append(threading.current_thread().name)
+                time.sleep(0.3)
+                return "anxiety"
+
+        chat = pipeline(Stuck(), deadlines={"classification": 0.05})
+        first = await chat.run("I'm worried")
+        second = await chat.run("I'm still worried")
+
+        # The second call queued behind the stuck one and never started
+        assert calls == ["chat-classification_0"]
+        assert second.timings.stages["classification"]["status"] == "timeout"
+        assert first.reply == "reply to I'm worried"
+        assert second.reply == "reply to I'm still worried"
+
+    @pytest.mark.asyncio
+    async def test_late_context_discards_the_speculative_reply(self):
+        recorder = Recorder(generate_delay=0.02)
+        history = [{"role": "user", "content": "My dad is sick"}, {"role": "assistant", "content": "I'm praying"}]
+        chat = pipeline(recorder, repositories=FakeRepositories(messages=FakeMessages(0.1, history)))
+        turn = await chat.run("Still worried", session_id="s1")
+        assert turn.speculation == "discarded"
+        assert len(recorder.prompts) == 2
+        assert "My dad is sick" not in recorder.prompts[0]
+        assert "User: My dad is sick" in recorder.prompts[1]
+        # Only the reply built from the full prompt may be cached
+        assert recorder.speculative == [True, False]
+        stages = turn.timings.as_dict()["stages"]
+        assert stages["speculative_generation"]["status"] == "discarded"
+        assert stages["generation"]["status"] == "ok"
+
+    @pytest.mark.asyncio
+    async def test_context_that_arrives_first_needs_no_speculation(self):
+        recorder = Recorder(classify_delay=0.1)
+        history = [{"role": "user", "content": "My dad is sick"}, {"role": "assistant", "content": "I'm praying"}]
+        chat = pipeline(recorder, repositories=FakeRepositories(messages=FakeMessages(0.0, history)))
+        turn = await chat.run("Still worried", session_id="s1")
+        assert turn.speculation == "not_needed"
+        assert recorder.speculative == [False]
+        assert "User: My dad is sick" in recorder.prompts[0]
+
+    @pytest.mark.asyncio
+    async def test_no_speculation_without_spare_capacity(self):
+        recorder = Recorder()
+        history = [{"role": "user", "content": "My dad is sick"}, {"role": "assistant", "content": "I'm praying"}]
+        chat = pipeline(
+            recorder, repositories=FakeRepositories(messages=FakeMessages(0.05, history)), can_speculate=lambda: False
+        )
+        turn = await chat.run("Still worried", session_id="s1")
+        assert turn.speculation == "skipped"
+        assert recorder.speculative == [False]
+        assert "User: My dad is sick" in recorder.prompts[0]
+
+    @pytest.mark.asyncio
+    async def test_saved_turns_fold_into_the_summary(self):
+        recorder = Recorder()
+        repositories = FakeRepositories()
+        chat = pipeline(recorder, repositories=repositories, summarizer=RollingSummarizer(every_turns=2, recent_turns=1))
+        for number in range(3):
+            turn = await chat.run(f"Message {number}. I am worried.", session_id="s1")
+            await turn.saved
+        session = repositories.sessions.session
+        assert session.message_count == 6
+        assert session.summarized_count == 4
+        assert session.session_summary.startswith("User (anxiety): Message 0.")
+        assert [message["role"] for message in repositories.messages.messages[:2]] == ["user", "assistant"]
+
+        await chat.run("Message 3.", session_id="s1")
+        prompt = recorder.prompts[-1]
+        assert "Conversation so far (summary):\nUser (anxiety): Message 0." in prompt
+        assert "User: Message 2. I am worried." in prompt and "User: Message 1." not in prompt
+
+    @pytest.mark.asyncio
+    async def test_crisis_skips_every_other_stage(self):
+        recorder = Recorder()
+        turn = await pipeline(recorder).run("I want to end my life")
+        assert turn.crisis.category == "suicide"
+        assert recorder.prompts == []
+        stages = turn.timings.as_dict()["stages"]
+        assert stages["crisis"]["status"] == "matched"
+        assert stages["generation"]["status"] == "skipped"
+
+    @pytest.mark.asyncio
+    async def test_generation_errors_propagate(self):
+        class Failing(Recorder):
+            def generate(self, message, emotion, prompt, personalized, speculative):
+                raise GenerationTimeout("too slow")
+
+        with pytest.raises(GenerationTimeout):
+            await pipeline(Failing()).run("I'm worried")
+
+
+def test_background_loop_runs_pipelines_from_threads():
+    loop = BackgroundLoop(workers=4)
+    turn = loop.run(pipeline(Recorder()).run("hello"), timeout=5)
+    assert turn.reply == "reply to hello"
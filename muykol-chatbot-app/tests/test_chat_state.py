@@ -0,0 +1,342 @@
+"""Tests for ChatState message handling, outside a running app."""
+
+import json
+from datetime import datetime, timedelta
+
+import httpx
+import pytest
+import reflex as rx
+from reflex.state import BaseState
+
+from faith_motivator_chatbot.state import chat_state
+from faith_motivator_chatbot.state.chat_state import (
+    LIVE_TAIL_KEEP,
+    LIVE_TAIL_SIZE,
+    MAX_MESSAGES_IN_STATE,
+    MESSAGE_WINDOW_SIZE,
+    MESSAGE_WINDOW_STEP,
+    ChatState,
+    Message,
+)
+
+
+@pytest.fixture
+def state(monkeypatch):
+    """A ChatState (with its parent states) whose ``async with self`` is a no-op."""
+
+    async def enter(self):
+        return self
+
+    async def leave(self, *exc_info):
+        pass
+
+    monkeypatch.setattr(BaseState, "__aenter__", enter)
+    monkeypatch.setattr(BaseState, "__aexit__", leave)
+    root = rx.State(_reflex_internal_init=True)
+    return root.get_substate(ChatState.get_full_name().split(".")[1:])
+
+
+def make_message(i, cursor=None):
+    return Message(
+        id=f"m{i}",
+        content=f"message {i}",
+        role="user" if i % 2 == 0 else "assistant",
+        timestamp=datetime(2024, 1, 1) + timedelta(seconds=i),
+        cursor=cursor,
+    )
+
+
+def ids(messages):
+    return [message.id for message in messages]
+
+
+def sse_response(events):
+    body = "".join(
+        f"event: {name}\ndata: {json.dumps(data)}\n\n" for name, data in events
+    )
+    return httpx.Response(
+        200, headers={"content-type": "text/event-stream"}, content=body.encode()
+    )
+
+
+class TestStreamedReply:
+    """Streamed deltas and the flush throttle."""
+
+    def stream(self, deltas):
+        return sse_response(
+            [("start", {"session_id": "s1"})]
+            + [("delta", {"text": text}) for text in deltas]
+            + [("done", {"biblical_references": ["Psalm 23:1"]})]
+        )
+
+    def count_flushes(self, state, monkeypatch):
+        flushes = []
+        apply = ChatState._apply_stream_delta
+
+        def counted(self, message_id, text):
+            flushes.append(text)
+            return apply(self, message_id, text)
+
+        monkeypatch.setattr(ChatState, "_apply_stream_delta", counted)
+        return flushes
+
+    @pytest.mark.asyncio
+    async def test_fast_deltas_are_batched_into_one_update(self, state, monkeypatch):
+        monkeypatch.setattr(chat_state, "STREAM_FLUSH_INTERVAL", 60)
+        flushes = self.count_flushes(state, monkeypatch)
+
+        assert await state._receive_streamed_reply(self.stream(["He", "l", "l", "o"]))
+        assert flushes == ["He", "llo"]
+        [reply] = state._messages
+        assert reply.content == "Hello"
+        assert reply.biblical_references == ["Psalm 23:1"]
+        assert state.session_id == "s1"
+
+    @pytest.mark.asyncio
+    async def test_each_delta_flushes_without_a_throttle(self, state, monkeypatch):
+        monkeypatch.setattr(chat_state, "STREAM_FLUSH_INTERVAL", 0)
+        flushes = self.count_flushes(state, monkeypatch)
+
+        assert await state._receive_streamed_reply(self.stream(["He", "l", "lo"]))
+        assert flushes == ["He", "l", "lo"]
+        assert state._messages[0].content == "Hello"
+
+    @pytest.mark.asyncio
+    async def test_error_event_reports_and_fails(self, state):
+        response = sse_response([("error", {"detail": "Model busy"})])
+        assert not await state._receive_streamed_reply(response)
+        assert state.chat_error == "Model busy"
+        assert state._messages == []
+
+
+class TestLiveTail:
+    """Appends, the live tail and the cap on held messages."""
+
+    def test_appends_fill_the_live_tail_then_fold_into_the_window(self, state):
+        for i in range(LIVE_TAIL_SIZE):
+            state._append_message(make_message(i))
+        assert state.window_messages == []
+        assert ids(state.live_messages) == [f"m{i}" for i in range(LIVE_TAIL_SIZE)]
+
+        state._append_message(make_message(LIVE_TAIL_SIZE))
+        newest = LIVE_TAIL_SIZE + 1
+        folded = newest - LIVE_TAIL_KEEP
+        assert ids(state.live_messages) == [f"m{i}" for i in range(folded, newest)]
+        assert ids(state.window_messages) == [f"m{i}" for i in range(folded)]
+        assert state.message_count == newest
+
+    def test_window_holds_at_most_the_window_size(self, state):
+        total = MESSAGE_WINDOW_SIZE + LIVE_TAIL_SIZE * 2
+        for i in range(total):
+            state._append_message(make_message(i))
+        state._sync_window()
+
+        mounted = state.window_messages + state.live_messages
+        hidden = total - MESSAGE_WINDOW_SIZE
+        assert ids(mounted) == [f"m{i}" for i in range(hidden, total)]
+        assert state.hidden_older_count == hidden
+
+    def test_held_messages_are_capped_and_the_cursor_follows_eviction(self, state):
+        loaded = MAX_MESSAGES_IN_STATE - 2
+        for i in range(loaded):
+            state._append_message(make_message(i, cursor=f"c{i}"))
+        assert len(state._messages) == loaded and state.history_cursor is None
+
+        for i in range(loaded, loaded + 4):
+            state._append_message(make_message(i))
+        assert len(state._messages) == MAX_MESSAGES_IN_STATE
+        assert state._messages[0].id == "m2"
+        assert state.history_cursor == "c2"
+        assert state.has_older_messages
+        assert state.message_count == MAX_MESSAGES_IN_STATE
+
+    def test_messages_without_a_server_cursor_never_become_the_cursor(self, state):
+        state._append_message(make_message(0, cursor="c0"))
+        for i in range(1, MAX_MESSAGES_IN_STATE + 2):
+            state._append_message(make_message(i))
+        assert state._messages[0].id == "m2"
+        assert state.history_cursor is None
+        assert not state.has_older_messages
+
+
+class TestOutboundQueue:
+    """In-order delivery, the depth limit, retries and worker takeover."""
+
+    @pytest.fixture
+    def deliveries(self, state, monkeypatch):
+        """Record delivered texts; texts in ``failing`` fail once."""
+        delivered, failing = [], set()
+
+        async def headers(self):
+            return {"Authorization": "Bearer token"}
+
+        async def deliver(self, message_id, text, session_id, request_headers):
+            if text in failing:
+                failing.discard(text)
+                return False
+            delivered.append(text)
+            return True
+
+        monkeypatch.setattr(ChatState, "get_auth_headers_unlocked", headers)
+        monkeypatch.setattr(ChatState, "_deliver_message", deliver)
+        state.is_authenticated = True
+        return delivered, failing
+
+    async def run_worker(self, state):
+        await ChatState.process_outbound_queue.fn(state, state._queue_worker_token)
+
+    def statuses(self, state):
+        return [message.status for message in state._messages]
+
+    @pytest.mark.asyncio
+    async def test_messages_are_delivered_in_order(self, state, deliveries):
+        delivered, _ = deliveries
+        assert state.send_message({"message": "one"}) is not None
+        assert state.send_message({"message": "two"}) is None
+        assert state.send_message({"message": "three"}) is None
+        assert state.pending_count == 3
+
+        await self.run_worker(state)
+        assert delivered == ["one", "two", "three"]
+        assert self.statuses(state) == ["delivered"] * 3
+        assert state.pending_count == 0
+        assert not state._queue_worker_active
+
+    @pytest.mark.asyncio
+    async def test_sends_past_the_depth_limit_are_refused(self, state, deliveries):
+        for i in range(chat_state.MAX_OUTBOUND_DEPTH):
+            state.send_message({"message": f"m{i}"})
+        state.send_message({"message": "one too many"})
+
+        assert len(state._messages) == chat_state.MAX_OUTBOUND_DEPTH
+        assert state.chat_error.startswith("Please wait for your earlier messages")
+
+    @pytest.mark.asyncio
+    async def test_failed_message_can_be_retried(self, state, deliveries):
+        delivered, failing = deliveries
+        failing.add("flaky")
+        state.send_message({"message": "flaky"})
+        await self.run_worker(state)
+        assert self.statuses(state) == ["failed"]
+
+        message_id = state._messages[0].id
+        assert state.retry_message(message_id) is not None
+        await self.run_worker(state)
+        assert delivered == ["flaky"]
+        assert self.statuses(state) == ["delivered"]
+
+    @pytest.mark.asyncio
+    async def test_worker_lost_with_a_restart_is_replaced(self, state, deliveries):
+        delivered, _ = deliveries
+        state.send_message({"message": "in flight"})
+        # The backend stopped mid-delivery: the flag and in-flight id were
+        # saved with the state, but no worker is running any more
+        state._in_flight_id = state._outbound_queue.pop(0)
+        chat_state._QUEUE_WORKERS.clear()
+
+        assert state.send_message({"message": "next"}) is not None
+        assert state._outbound_queue == [message.id for message in state._messages]
+        await self.run_worker(state)
+        assert delivered == ["in flight", "next"]
+
+    @pytest.mark.asyncio
+    async def test_replaced_worker_exits_untouched(self, state, deliveries):
+        delivered, _ = deliveries
+        state.send_message({"message": "one"})
+        stale = state._queue_worker_token
+        chat_state._QUEUE_WORKERS.clear()
+        state.send_message({"message": "two"})
+
+        await ChatState.process_outbound_queue.fn(state, stale)
+        assert delivered == [] and state._queue_worker_active
+        await self.run_worker(state)
+        assert delivered == ["one", "two"]
+
+
+class TestMessageWindow:
+    """Window arithmetic at the edges of the loaded history."""
+
+    def fill(self, state, count):
+        for i in range(count):
+            state._append_message(make_message(i, cursor=f"c{i}"))
+        state._sync_window()
+
+    def mounted(self, state):
+        return ids(state.window_messages + state.live_messages)
+
+    def test_show_older_slides_by_a_step_and_stops_at_the_top(self, state):
+        total = MESSAGE_WINDOW_SIZE + MESSAGE_WINDOW_STEP + 5
+        self.fill(state, total)
+
+        state.show_older_window()
+        assert state.window_end_offset == MESSAGE_WINDOW_STEP
+        assert state.live_messages == []
+        end = total - MESSAGE_WINDOW_STEP
+        start = end - MESSAGE_WINDOW_SIZE
+        assert self.mounted(state) == [f"m{i}" for i in range(start, end)]
+
+        # Only 5 hidden messages remain above: the last step is shortened
+        state.show_older_window()
+        assert state.window_end_offset == MESSAGE_WINDOW_STEP + 5
+        assert state.hidden_older_count == 0
+        assert self.mounted(state)[0] == "m0"
+
+        assert state.show_older_window() is None
+        assert state.window_end_offset == MESSAGE_WINDOW_STEP + 5
+
+    def test_top_of_the_window_falls_through_to_loading_a_page(self, state):
+        self.fill(state, 5)
+        state.has_older_messages = True
+        assert state.can_show_older
+        assert state.show_older_window() is ChatState.load_older_messages
+
+    def test_show_newer_clamps_at_the_latest_message(self, state):
+        self.fill(state, MESSAGE_WINDOW_SIZE * 2)
+        state.show_older_window()
+        state.show_newer_window()
+        state.show_newer_window()
+        assert state.window_end_offset == 0
+        assert self.mounted(state)[-1] == f"m{MESSAGE_WINDOW_SIZE * 2 - 1}"
+        assert state.live_messages
+
+    def test_append_while_pinned_to_the_bottom_follows(self, state):
+        self.fill(state, MESSAGE_WINDOW_SIZE)
+        state._append_message(make_message(MESSAGE_WINDOW_SIZE))
+        assert state.window_end_offset == 0
+        assert state.live_messages[-1].id == f"m{MESSAGE_WINDOW_SIZE}"
+
+    def test_append_while_scrolled_up_keeps_the_window_in_place(self, state):
+        self.fill(state, MESSAGE_WINDOW_SIZE * 2)
+        state.show_older_window()
+        before = self.mounted(state)
+
+        state._append_message(make_message(MESSAGE_WINDOW_SIZE * 2))
+        assert state.window_end_offset == MESSAGE_WINDOW_STEP + 1
+        state._sync_window()
+        assert self.mounted(state) == before
+
+    @pytest.mark.asyncio
+    async def test_prepended_page_slides_the_window_up(self, state, monkeypatch):
+        monkeypatch.setattr(chat_state, "HISTORY_CACHE_ENABLED", False)
+        self.fill(state, 10)
+        state.history_cursor = "c-older"
+        state.has_older_messages = True
+        older = []
+        for i in range(30):
+            stamp = datetime(2023, 1, 1, 0, 0, i).isoformat()
+            message = {"id": f"old{i}", "content": "", "role": "user"}
+            older.append(dict(message, timestamp=stamp))
+        requests = []
+
+        async def fetch(self, cursor=None, limit=None, after=None):
+            requests.append(cursor)
+            return {"messages": older, "next_cursor": None}
+
+        monkeypatch.setattr(ChatState, "_fetch_history_page", fetch)
+        await state.load_older_messages()
+
+        assert requests == ["c-older"]
+        assert ids(state._messages[:30]) == [f"old{i}" for i in range(30)]
+        assert state.window_end_offset == MESSAGE_WINDOW_STEP
+        assert self.mounted(state) == [f"old{i}" for i in range(MESSAGE_WINDOW_STEP)]
+        assert not state.has_older_messages and not state.can_show_older
@@ -0,0 +1,110 @@
+"""Tests for the compiled biblical content store."""
+
+import json
+
+import pytest
+
+from faith_motivator_chatbot.backend import content_store
+from faith_motivator_chatbot.backend.content_store import (
+    ContentStore,
+    ContentStoreError,
+    build,
+    compile_content,
+    get_content_store,
+    load_source,
+)
+
+SOURCE = {
+    "anxiety": {
+        "verses": [
+            {"reference": "1 Peter 5:7", "text": "Cast all your anxiety on him because he cares for you.", "theme": "gods_care"},
+            {"reference": "Psalm 56:3", "text": "When I am afraid, I put my trust in you.", "theme": "peace_and_trust"},
+        ],
+        "reflections": ["God cares for every worry."],
+        "action_steps": ["Pray about one worry", "Take three deep breaths"],
+    },
+    "fear": {
+        "verses": [
+            {"reference": "Psalm 56:3", "text": "When I am afraid, I put my trust in you.", "theme": "peace_and_trust"},
+        ],
+        "reflections": ["Courage is trusting God in the middle of fear — même là."],
+        "action_steps": [],
+    },
+}
+
+
+@pytest.fixture
+def store(tmp_path):
+    path = str(tmp_path / "content.fmcs")
+    compile_content(SOURCE, path)
+    store = ContentStore(path)
+    yield store
+    store.close()
+
+
+class TestContentStore:
+    """Round trip and inverted-index lookups."""
+
+    def test_round_trip_matches_source(self, store):
+        for emotion, entry in SOURCE.items():
+            assert store.for_emotion(emotion) == entry
+
+    def test_theme_lookup_spans_emotions(self, store):
+        references = [verse["reference"] for verse in store.verses(theme="peace_and_trust")]
+        assert references == ["Psalm 56:3", "Psalm 56:3"]
+        assert store.verses("anxiety", theme="gods_care")[0]["reference"] == "1 Peter 5:7"
+
+    def test_unknown_keys_are_empty(self, store):
+        assert store.verses("joy") == []
+        assert store.reflections("joy") == []
+        assert store.emotions() == ["anxiety", "fear"]
+        assert store.themes() == ["gods_care", "peace_and_trust"]
+
+    def test_rejects_files_that_are_not_stores(self, tmp_path):
+        path = tmp_path / "bogus.fmcs"
+        path.write_bytes(b"not a content store at all, just some bytes")
+        with pytest.raises(ContentStoreError):
+            ContentStore(str(path))
+
+    def test_bundled_source_compiles(self, tmp_path):
+        source = load_source()
+        path = str(tmp_path / "bundled.fmcs")
+        compile_content(source, path)
+        store = ContentStore(path)
+        try:
+            assert store.emotions() == sorted(source)
+            assert store.for_emotion("anxiety") == source["anxiety"]
+        finally:
+            store.close()
+
+
+class TestGetContentStore:
+    """Opening the configured, prebuilt store."""
+
+    @pytest.fixture
+    def configured(self, tmp_path, monkeypatch):
+        source_path = tmp_path / "content.json"
+        source_path.write_text(json.dumps(SOURCE), encoding="utf-8")
+        store_path = tmp_path / "cache" / "nested" / "content.fmcs"
+        monkeypatch.setattr(content_store, "CONTENT_SOURCE_PATH", str(source_path))
+        monkeypatch.setattr(content_store, "CONTENT_STORE_PATH", str(store_path))
+        monkeypatch.setattr(content_store, "_store", None)
+        yield source_path, store_path
+        if content_store._store is not None:
+            content_store._store.close()
+
+    def test_missing_store_is_compiled_at_the_configured_path(self, configured):
+        _, store_path = configured
+        store = get_content_store()
+        assert store.path == str(store_path)
+        assert store.emotions() == ["anxiety", "fear"]
+
+    def test_prebuilt_store_is_opened_without_rebuilding(self, configured, monkeypatch):
+        source_path, store_path = configured
+        build(str(source_path), str(store_path))
+
+        def rebuild(*args):
+            raise AssertionError("store was rebuilt")
+
+        monkeypatch.setattr(content_store, "build", rebuild)
+        assert get_content_store().for_emotion("fear") == SOURCE["fear"]
@@ -0,0 +1,61 @@
+"""Tests for crisis-phrase detection."""
+
+import pytest
+
+from faith_motivator_chatbot.backend.crisis import DURATION_METRIC, CrisisDetector, detect_crisis, normalize
+from faith_motivator_chatbot.backend.metrics import METRICS
+
+
+class TestCrisisDetector:
+    """Matching, normalisation and the automaton's failure transitions."""
+
+    @pytest.mark.parametrize(
+        "message, category",
+        [
+            ("I want to kill myself", "suicide"),
+            ("Honestly I can’t go on anymore!!", "suicide"),
+            ("sometimes i think everyone is better off without me", "suicide"),
+            ("I don't want to live like this", "suicide"),
+            ("I've been cutting myself again", "self_harm"),
+            ("I want to k1ll myself", "suicide"),
+            ("My husband hits me. He beats me when he drinks", "abuse"),
+        ],
+    )
+    def test_crisis_messages_match(self, message, category):
+        match = CrisisDetector().scan(message)
+        assert match is not None and match.category == category
+
+    @pytest.mark.parametrize(
+        "message",
+        [
+            "I feel anxious about my job interview",
+            "I'm killing time before church",
+            "This song makes me want to dance",
+            "",
+        ],
+    )
+    def test_ordinary_messages_do_not_match(self, message):
+        assert CrisisDetector().scan(message) is None
+
+    def test_overlapping_phrases_follow_failure_transitions(self):
+        detector = CrisisDetector({"test": ("a b d", "b c", "e")})
+        assert detector.scan("a b x") is None
+        assert detector.scan("a b d").phrase == "a b d"
+        # After "a b", the next word "c" completes "b c" via the failure link
+        assert detector.scan("a b c").phrase == "b c"
+        # A phrase that is a suffix of the current path is reported too
+        assert CrisisDetector({"test": ("x y z", "y")}).scan("x y").phrase == "y"
+
+    def test_normalize(self):
+        assert normalize("I CAN’T go on... $uicide") == ["i", "cant", "go", "on", "suicide"]
+
+
+def test_detection_is_timed_and_counted():
+    before = METRICS.snapshot()
+    assert detect_crisis("I want to end my life").category == "suicide"
+    after = METRICS.snapshot()
+    key = f"{DURATION_METRIC}\t"
+    assert after["histograms"][key][-1] - before["histograms"].get(key, [0])[-1] == 1
+    counted = 'crisis_detections_total\tcategory="suicide"'
+    assert after["events"][counted] - before["events"].get(counted, 0) == 1
+    assert "crisis_detection_seconds_bucket{le=" in METRICS.render(after)
@@ -0,0 +1,53 @@
+"""Tests for the local emotion classifier."""
+
+import time
+
+import pytest
+
+from faith_motivator_chatbot.backend.emotion import NEUTRAL, classify, classify_batch
+
+
+class TestClassify:
+    """Labels, negation and batch consistency."""
+
+    @pytest.mark.parametrize(
+        "text, label",
+        [
+            ("I'm so anxious about work and I can't sleep", "anxiety"),
+            ("Thank God, my prayers were answered!", "gratitude"),
+            ("My father passed away and I'm heartbroken", "sadness"),
+            ("I feel so alone, nobody cares about me", "loneliness"),
+            ("I'm excited, we got good news today", "joy"),
+            ("I'm hopeful things are getting better", "hope"),
+            ("Can you tell me about the book of Ruth?", NEUTRAL),
+        ],
+    )
+    def test_labels(self, text, label):
+        assert classify(text).label == label
+
+    def test_negated_words_are_ignored(self):
+        assert classify("I'm not worried about it").label == NEUTRAL
+        assert classify("I’m not happy").label == NEUTRAL
+
+    def test_mixed_message_reports_confidence(self):
+        result = classify("I'm scared of the surgery but I trust God")
+        assert result.label == "fear"
+        assert 0.5 < result.confidence < 1
+        assert set(result.scores) == {"fear", "hope"}
+
+    def test_batch_matches_single_messages(self):
+        texts = ["I'm worried", "", "so grateful and blessed", "hello", "angry and frustrated"]
+        batch = classify_batch(texts)
+        assert [r.label for r in batch] == [classify(t).label for t in texts]
+        assert [r.scores for r in batch] == [classify(t).scores for t in texts]
+
+    def test_empty_batch(self):
+        assert classify_batch([]) == []
+
+    def test_single_message_is_sub_millisecond(self):
+        text = "I'm anxious about my job interview tomorrow and what if I fail"
+        classify(text)
+        started = time.perf_counter()
+        for _ in range(200):
+            classify(text)
+        assert (time.perf_counter() - started) / 200 < 0.001
@@ -0,0 +1,197 @@
+"""Tests for the generation client and the stand-in model."""
+
+import threading
+import time
+
+import pytest
+
+from faith_motivator_chatbot.backend.generation import (
+    BedrockBackend,
+    ConcurrencyGate,
+    GenerationBackend,
+    GenerationClient,
+    GenerationOverloaded,
+    GenerationResult,
+    GenerationThrottled,
+    GenerationTimeout,
+    HTTPModelBackend,
+    TokenBucket,
+)
+from faith_motivator_chatbot.backend.model_standin import StandinModel, make_handler, parse_latency
+from faith_motivator_chatbot.backend.serving import make_server
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class SleepyBackend(GenerationBackend):
+    """Sleeps ``delay`` seconds per call and records the peak concurrency."""
+
+    def __init__(self, delay=0.05, throttle_first=0):
+        self.delay = delay
+        self.throttle_first = throttle_first
+        self.calls = self.active = self.peak = 0
+        self._lock = threading.Lock()
+
+    def generate(self, prompt, max_tokens, timeout):
+        with self._lock:
+            self.calls += 1
+            if self.calls <= self.throttle_first:
+                raise GenerationThrottled("slow down")
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        time.sleep(self.delay)
+        with self._lock:
+            self.active -= 1
+        return GenerationResult("ok", 10, 5)
+
+
+def unlimited(backend, **kwargs):
+    options = dict(requests_per_second=1e6, request_burst=1e6, tokens_per_second=1e9, token_burst=1e9)
+    options.update(kwargs)
+    return GenerationClient(backend, **options)
+
+
+class TestTokenBucket:
+    """Reservation pacing."""
+
+    def test_burst_then_wait(self):
+        clock = FakeClock()
+        bucket = TokenBucket(rate=2, capacity=2, clock=clock)
+        assert bucket.reserve(1) == 0
+        assert bucket.reserve(1) == 0
+        assert bucket.reserve(1) == pytest.approx(0.5)
+        assert bucket.reserve(1) == pytest.approx(1.0)
+        clock.now = 1.0
+        assert bucket.reserve(1) == pytest.approx(0.5)
+
+    def test_refund_returns_tokens(self):
+        bucket = TokenBucket(rate=1, capacity=10, clock=FakeClock())
+        bucket.reserve(10)
+        bucket.refund(4)
+        assert bucket.reserve(4) == 0
+
+
+class TestConcurrencyGate:
+    """Slots, FIFO hand-off and queue limits."""
+
+    def test_queue_full_is_refused(self):
+        gate = ConcurrencyGate(limit=1, max_queue=0)
+        gate.acquire(time.monotonic() + 1)
+        with pytest.raises(GenerationOverloaded):
+            gate.acquire(time.monotonic() + 1)
+
+    def test_waiter_times_out_and_leaves_queue(self):
+        gate = ConcurrencyGate(limit=1, max_queue=1)
+        gate.acquire(time.monotonic() + 1)
+        with pytest.raises(GenerationTimeout):
+            gate.acquire(time.monotonic() + 0.05)
+        assert gate.queued == 0
+        gate.release()
+        assert gate.active == 0
+
+    def test_waiters_are_served_in_order(self):
+        gate = ConcurrencyGate(limit=1, max_queue=5)
+        gate.acquire(time.monotonic() + 1)
+        order = []
+
+        def wait(name):
+            gate.acquire(time.monotonic() + 2)
+            order.append(name)
+            gate.release()
+
+        threads = []
+        for name in "abc":
+            thread = threading.Thread(target=wait, args=(name,))
+            thread.start()
+            threads.append(thread)
+            while gate.queued < len(threads):
+                time.sleep(0.001)
+        gate.release()
+        for thread in threads:
+            thread.join()
+        assert order == ["a", "b", "c"]
+        assert gate.active == 0
+
+
+class TestGenerationClient:
+    """Limits applied around a backend."""
+
+    def test_concurrency_is_bounded(self):
+        backend = SleepyBackend(delay=0.05)
+        client = unlimited(backend, max_concurrency=2, max_queue=10)
+        threads = [threading.Thread(target=client.generate, args=("hi",)) for _ in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert backend.calls == 6
+        assert backend.peak == 2
+
+    def test_request_rate_is_paced(self):
+        client = unlimited(SleepyBackend(delay=0), requests_per_second=20, request_burst=1)
+        started = time.monotonic()
+        for _ in range(4):
+            client.generate("hi")
+        assert time.monotonic() - started >= 0.14
+
+    def test_quota_beyond_deadline_fails_fast(self):
+        client = unlimited(SleepyBackend(delay=0), tokens_per_second=10, token_burst=10)
+        started = time.monotonic()
+        with pytest.raises(GenerationTimeout):
+            client.generate("hi", max_tokens=100, timeout=1)
+        assert time.monotonic() - started < 0.1
+
+    def test_throttling_is_retried_once(self):
+        backend = SleepyBackend(delay=0, throttle_first=1)
+        assert unlimited(backend).generate("hi", timeout=5).text == "ok"
+        backend = SleepyBackend(delay=0, throttle_first=2)
+        with pytest.raises(GenerationThrottled):
+            unlimited(backend).generate("hi", timeout=5)
+
+
+class TestStandinModel:
+    """The local stand-in and the HTTP backend that talks to it."""
+
+    def test_latency_specs(self):
+        assert parse_latency("fixed:0.3")() == 0.3
+        assert 0.1 <= parse_latency("uniform:0.1,0.2")() <= 0.2
+        assert parse_latency("lognormal:-3,0.1")() > 0
+        with pytest.raises(ValueError):
+            parse_latency("poisson:1")
+
+    def test_http_backend_round_trip(self):
+        pytest.importorskip("httpx")
+        model = StandinModel(latency="fixed:0.01", max_concurrency=1, seed=1)
+        server = make_server(("127.0.0.1", 0), make_handler(model), mode="threaded", workers=4)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        backend = HTTPModelBackend(f"http://127.0.0.1:{server.server_address[1]}")
+        try:
+            result = backend.generate("I feel anxious", max_tokens=5, timeout=2)
+            assert result.output_tokens == 5
+            assert len(result.text.split()) == 5
+
+            # Past the stand-in's concurrency cap, calls are throttled
+            model.active = 1
+            with pytest.raises(GenerationThrottled):
+                backend.generate("I feel anxious", max_tokens=5, timeout=2)
+            model.active = 0
+        finally:
+            backend.close()
+            server.shutdown()
+            server.server_close()
+
+
+def test_bedrock_client_times_out_with_the_generation_deadline(monkeypatch):
+    monkeypatch.setenv("AWS_DEFAULT_REGION", "us-east-1")
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "test")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "test")
+    config = BedrockBackend(timeout=7)._client.meta.config
+    assert (config.connect_timeout, config.read_timeout) == (7, 7)
+    assert config.retries["total_max_attempts"] == 1
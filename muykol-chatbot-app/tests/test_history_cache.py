@@ -0,0 +1,87 @@
+"""Tests for the local chat history cache."""
+
+import pytest
+import sqlmodel
+
+from faith_motivator_chatbot.services import history_cache
+from faith_motivator_chatbot.services.history_cache import (
+    CachedChatMessage,
+    _create_table,
+    clear_cached_history,
+    load_cached_history,
+    replace_cached_history,
+    store_messages,
+)
+
+
+@pytest.fixture(autouse=True)
+def cache_db(tmp_path, monkeypatch):
+    engine = sqlmodel.create_engine(f"sqlite:///{tmp_path / 'cache.db'}")
+    CachedChatMessage.__table__.create(engine)
+    monkeypatch.setattr(history_cache, "_engine", engine)
+    return engine
+
+
+def make_messages(start, stop):
+    return [
+        {
+            "id": f"msg_{i:03d}",
+            "cursor": f"cursor_{i:03d}",
+            "content": f"message {i}",
+            "role": "user" if i % 2 == 0 else "assistant",
+            "timestamp": f"2024-01-01T00:00:{i:02d}",
+            "biblical_references": ["Psalm 23:1"] if i % 2 else [],
+        }
+        for i in range(start, stop)
+    ]
+
+
+class TestHistoryCache:
+    """Storage, ordering and trimming."""
+
+    def test_round_trip_newest_page_oldest_first(self):
+        store_messages("user_001", "session_001", make_messages(0, 10))
+
+        session_id, messages = load_cached_history("user_001", limit=4)
+        assert session_id == "session_001"
+        assert [m["id"] for m in messages] == ["msg_006", "msg_007", "msg_008", "msg_009"]
+        assert messages[-1]["biblical_references"] == ["Psalm 23:1"]
+        assert messages[0]["cursor"] == "cursor_006"
+
+        assert load_cached_history("user_002", limit=4) == (None, [])
+
+    def test_overlapping_syncs_do_not_duplicate(self):
+        store_messages("user_001", "session_001", make_messages(0, 6))
+        store_messages("user_001", "session_001", make_messages(4, 8))
+
+        _, messages = load_cached_history("user_001", limit=100)
+        assert [m["id"] for m in messages] == [f"msg_{i:03d}" for i in range(8)]
+
+    def test_trims_to_newest_messages(self, monkeypatch):
+        monkeypatch.setattr(history_cache, "HISTORY_CACHE_MAX_MESSAGES", 5)
+        store_messages("user_001", "session_001", make_messages(0, 12))
+
+        _, messages = load_cached_history("user_001", limit=100)
+        assert [m["id"] for m in messages] == [f"msg_{i:03d}" for i in range(7, 12)]
+
+    def test_replace_and_clear_are_per_user(self):
+        store_messages("user_001", "session_001", make_messages(0, 5))
+        store_messages("user_002", "session_002", make_messages(0, 3))
+
+        replace_cached_history("user_001", "session_003", make_messages(10, 12))
+        assert load_cached_history("user_001", limit=100)[0] == "session_003"
+        assert len(load_cached_history("user_001", limit=100)[1]) == 2
+
+        clear_cached_history("user_001")
+        assert load_cached_history("user_001", limit=100) == (None, [])
+        assert len(load_cached_history("user_002", limit=100)[1]) == 3
+
+    def test_cache_from_an_older_schema_is_rebuilt(self, cache_db):
+        table = CachedChatMessage.__table__.name
+        with cache_db.begin() as connection:
+            connection.exec_driver_sql(f"DROP TABLE {table}")
+            connection.exec_driver_sql(f"CREATE TABLE {table} (id INTEGER PRIMARY KEY)")
+
+        _create_table(cache_db)
+        store_messages("user_001", "session_001", make_messages(0, 2))
+        assert load_cached_history("user_001", limit=1)[1][0]["cursor"] == "cursor_001"
@@ -0,0 +1,73 @@
+"""Tests for the shared, pooled HTTP client."""
+
+import asyncio
+
+import pytest
+
+from faith_motivator_chatbot.services import http_client
+from faith_motivator_chatbot.services.http_client import (
+    HTTPClientPool,
+    HTTPClientSettings,
+    get_http_pool,
+    http_client_lifespan,
+)
+
+
+@pytest.fixture(autouse=True)
+def fresh_pool(monkeypatch):
+    monkeypatch.setattr(http_client, "_pool", None)
+
+
+class TestHTTPClientPool:
+    """Per-host clients, settings and shutdown."""
+
+    @pytest.mark.asyncio
+    async def test_one_client_per_host(self):
+        pool = HTTPClientPool(HTTPClientSettings())
+        api = await pool.get_client("http://api.example.com/chat/send")
+        assert await pool.get_client("http://api.example.com/chat/history") is api
+        assert await pool.get_client("https://api.example.com/chat/send") is not api
+        assert await pool.get_client("http://auth.example.com/login") is not api
+        assert len(pool._clients) == 3
+        await pool.aclose()
+
+    @pytest.mark.asyncio
+    async def test_limits_come_from_the_environment(self, monkeypatch):
+        monkeypatch.setenv("HTTP_CLIENT_MAX_CONNECTIONS", "7")
+        monkeypatch.setenv("HTTP_CLIENT_MAX_KEEPALIVE", "3")
+        monkeypatch.setenv("HTTP_CLIENT_KEEPALIVE_EXPIRY", "12")
+        monkeypatch.setenv("HTTP_CLIENT_TIMEOUT", "9")
+        monkeypatch.setenv("HTTP_CLIENT_CONNECT_TIMEOUT", "2")
+
+        pool = HTTPClientPool()
+        client = await pool.get_client("http://api.example.com/")
+        connections = client._transport._pool
+        assert connections._max_connections == 7
+        assert connections._max_keepalive_connections == 3
+        assert connections._keepalive_expiry == 12.0
+        assert client.timeout.read == 9.0
+        assert client.timeout.connect == 2.0
+        await pool.aclose()
+
+    def test_lock_is_created_inside_the_event_loop(self):
+        # Built outside any loop, as a module-level pool would be
+        pool = HTTPClientPool(HTTPClientSettings())
+        assert pool._lock is None
+
+        async def use():
+            await pool.get_client("http://api.example.com/")
+            return pool._lock
+
+        assert isinstance(asyncio.run(use()), asyncio.Lock)
+
+    @pytest.mark.asyncio
+    async def test_lifespan_closes_the_pool(self):
+        async with http_client_lifespan() as pool:
+            assert get_http_pool() is pool
+            client = await pool.get_client("http://api.example.com/")
+
+        assert client.is_closed
+        with pytest.raises(RuntimeError):
+            await pool.get_client("http://api.example.com/")
+        # The next use after shutdown builds a fresh pool
+        assert get_http_pool() is not pool
@@ -0,0 +1,160 @@
+"""Tests for idempotency-key deduplication."""
+
+import threading
+import time
+
+import pytest
+
+from faith_motivator_chatbot.backend.idempotency import (
+    IdempotencyCache,
+    IdempotencyConflict,
+    IdempotencyError,
+    request_fingerprint,
+    validate_key,
+)
+
+
+class TestIdempotencyCache:
+    """Run-once and replay behaviour."""
+
+    def test_repeat_key_replays_without_rerunning(self):
+        cache = IdempotencyCache()
+        calls = []
+
+        def work():
+            calls.append(1)
+            return {"response": "hello"}
+
+        fingerprint = request_fingerprint({"message": "hi"})
+        first = cache.run("chat:key-1", fingerprint, work)
+        second = cache.run("chat:key-1", fingerprint, work)
+
+        assert first == ({"response": "hello"}, False)
+        assert second == ({"response": "hello"}, True)
+        assert len(calls) == 1
+
+    def test_concurrent_duplicates_wait_for_the_original(self):
+        cache = IdempotencyCache()
+        calls = []
+
+        def work():
+            calls.append(1)
+            time.sleep(0.05)
+            return "reply"
+
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(cache.run("k", "fp", work)))
+            for _ in range(5)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(calls) == 1
+        assert sorted(replayed for _, replayed in results) == [False, True, True, True, True]
+
+    def test_key_reused_with_different_body_is_rejected(self):
+        cache = IdempotencyCache()
+        cache.run("k", request_fingerprint({"message": "a"}), lambda: "a")
+        with pytest.raises(IdempotencyConflict):
+            cache.run("k", request_fingerprint({"message": "b"}), lambda: "b")
+
+    def test_failed_work_releases_the_key(self):
+        cache = IdempotencyCache()
+
+        def fail():
+            raise RuntimeError("model unavailable")
+
+        with pytest.raises(RuntimeError):
+            cache.run("k", "fp", fail)
+        assert cache.run("k", "fp", lambda: "ok") == ("ok", False)
+
+    def test_entries_expire_after_ttl_and_lru_is_bounded(self):
+        now = [0.0]
+        cache = IdempotencyCache(ttl=10, max_size=2, clock=lambda: now[0])
+        cache.run("a", "fp", lambda: 1)
+        cache.run("b", "fp", lambda: 2)
+        cache.run("c", "fp", lambda: 3)
+        assert len(cache) == 2
+        assert cache.run("a", "fp", lambda: 4) == (4, False)
+
+        now[0] = 11.0
+        assert cache.run("c", "fp", lambda: 5) == (5, False)
+
+    def test_no_key_always_runs(self):
+        cache = IdempotencyCache()
+        assert cache.run(None, "fp", lambda: 1) == (1, False)
+        assert cache.run(None, "fp", lambda: 2) == (2, False)
+        assert len(cache) == 0
+
+
+
+class TestSharedTier:
+    """Processes sharing one Redis run each submission once."""
+
+    @pytest.fixture
+    def redis_client(self):
+        fakeredis = pytest.importorskip("fakeredis")
+        return fakeredis.FakeRedis()
+
+    def test_other_process_replays_the_stored_result(self, redis_client):
+        first = IdempotencyCache(redis_client=redis_client)
+        second = IdempotencyCache(redis_client=redis_client)
+        assert first.run("chat:k", "fp", lambda: "hi") == ("hi", False)
+        assert second.run("chat:k", "fp", lambda: "again") == ("hi", True)
+        with pytest.raises(IdempotencyConflict):
+            second.run("chat:k", "other", lambda: "other")
+        assert redis_client.ttl("faith:idempotency:chat:k") > 0
+
+    def test_repeat_in_another_process_waits_for_the_owner(self, redis_client):
+        calls = []
+
+        def work():
+            calls.append(1)
+            time.sleep(0.2)
+            return "reply"
+
+        def run_in_new_process():
+            cache = IdempotencyCache(redis_client=redis_client)
+            results.append(cache.run("k", "fp", work))
+
+        results = []
+        owner = threading.Thread(target=run_in_new_process)
+        owner.start()
+        time.sleep(0.05)
+        run_in_new_process()
+        owner.join()
+
+        assert len(calls) == 1
+        assert sorted(results) == [("reply", False), ("reply", True)]
+
+    def test_failed_owner_releases_the_shared_claim(self, redis_client):
+        def fail():
+            raise RuntimeError("model unavailable")
+
+        with pytest.raises(RuntimeError):
+            IdempotencyCache(redis_client=redis_client).run("k", "fp", fail)
+        other = IdempotencyCache(redis_client=redis_client, wait_timeout=0.1)
+        assert other.run("k", "fp", lambda: "ok") == ("ok", False)
+
+    def test_redis_failures_fall_back_to_the_process(self):
+        class BrokenRedis:
+            def set(self, *args, **kwargs):
+                raise ConnectionError("down")
+
+        cache = IdempotencyCache(redis_client=BrokenRedis())
+        assert cache.run("k", "fp", lambda: 1) == (1, False)
+        assert cache.run("k", "fp", lambda: 2) == (1, True)
+
+class TestValidateKey:
+    """Header validation."""
+
+    def test_rejects_empty_and_oversized_keys(self):
+        assert validate_key(None) is None
+        assert validate_key(" msg_1 ") == "msg_1"
+        with pytest.raises(IdempotencyError):
+            validate_key("  ")
+        with pytest.raises(IdempotencyError):
+            validate_key("x" * 256)
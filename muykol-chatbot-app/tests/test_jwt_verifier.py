@@ -0,0 +1,148 @@
+"""Tests for the cached Cognito JWT verifier, using a local stand-in JWKS."""
+
+import time
+
+import httpx
+import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from jose import jwk, jwt
+
+from faith_motivator_chatbot.backend.jwt_verifier import (
+    CognitoJWTVerifier,
+    JWKSCache,
+    JWTVerificationError,
+    VerifiedTokenCache,
+)
+
+ISSUER = "http://localhost:4566/us-east-1_dev123"
+CLIENT_ID = "dev-client-id"
+
+
+def make_signing_key(kid):
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    private_pem = private_key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    ).decode()
+    public_pem = private_key.public_key().public_bytes(
+        serialization.Encoding.PEM,
+        serialization.PublicFormat.SubjectPublicKeyInfo,
+    ).decode()
+    public_jwk = jwk.construct(public_pem, "RS256").to_dict()
+    public_jwk.update({"kid": kid, "alg": "RS256", "use": "sig"})
+    return private_pem, public_jwk
+
+
+class StandInJWKS:
+    """Serves a JWKS document through an httpx mock transport."""
+
+    def __init__(self, *public_jwks):
+        self.keys = list(public_jwks)
+        self.requests = 0
+
+    def handler(self, request):
+        self.requests += 1
+        return httpx.Response(200, json={"keys": self.keys})
+
+    def client(self):
+        return httpx.AsyncClient(transport=httpx.MockTransport(self.handler))
+
+
+def make_token(private_pem, kid, **overrides):
+    now = int(time.time())
+    claims = {
+        "sub": "user_001",
+        "iss": ISSUER,
+        "client_id": CLIENT_ID,
+        "token_use": "access",
+        "iat": now,
+        "exp": now + 3600,
+    }
+    claims.update(overrides)
+    return jwt.encode(claims, private_pem, algorithm="RS256", headers={"kid": kid})
+
+
+@pytest.fixture(scope="module")
+def signing_key():
+    return make_signing_key("key-1")
+
+
+@pytest.fixture
+def stand_in(signing_key):
+    return StandInJWKS(signing_key[1])
+
+
+@pytest.fixture
+def verifier(stand_in):
+    jwks = JWKSCache(f"{ISSUER}/.well-known/jwks.json", http_client=stand_in.client())
+    return CognitoJWTVerifier("us-east-1_dev123", CLIENT_ID, issuer=ISSUER, jwks=jwks)
+
+
+class TestCognitoJWTVerifier:
+    """Verification and caching behaviour."""
+
+    @pytest.mark.asyncio
+    async def test_verifies_and_caches_claims(self, verifier, stand_in, signing_key):
+        token = make_token(signing_key[0], "key-1")
+
+        claims = await verifier.verify_authorization_header(f"Bearer {token}")
+        assert claims["sub"] == "user_001"
+        assert len(verifier.cache) == 1
+
+        # Second call is served from the verified-token LRU
+        assert await verifier.verify(token) == claims
+        assert stand_in.requests == 1
+
+    @pytest.mark.asyncio
+    async def test_rejects_wrong_issuer_client_and_expired(self, verifier, signing_key):
+        private_pem = signing_key[0]
+        bad_tokens = [
+            make_token(private_pem, "key-1", iss="https://evil.example.com"),
+            make_token(private_pem, "key-1", client_id="other-client"),
+            make_token(private_pem, "key-1", exp=int(time.time()) - 10),
+            make_token(private_pem, "key-1", token_use="id"),
+        ]
+        for token in bad_tokens:
+            with pytest.raises(JWTVerificationError):
+                await verifier.verify(token)
+        assert len(verifier.cache) == 0
+
+    @pytest.mark.asyncio
+    async def test_rejects_token_signed_by_another_key(self, verifier, signing_key):
+        other_private, _ = make_signing_key("key-1")
+        with pytest.raises(JWTVerificationError):
+            await verifier.verify(make_token(other_private, "key-1"))
+
+    @pytest.mark.asyncio
+    async def test_unknown_kid_triggers_refetch_after_rotation(self, verifier, stand_in, signing_key):
+        await verifier.verify(make_token(signing_key[0], "key-1"))
+
+        rotated_private, rotated_public = make_signing_key("key-2")
+        stand_in.keys.append(rotated_public)
+        verifier.jwks.min_refetch_interval = 0
+
+        claims = await verifier.verify(make_token(rotated_private, "key-2"))
+        assert claims["sub"] == "user_001"
+        assert stand_in.requests == 2
+
+    @pytest.mark.asyncio
+    async def test_missing_bearer_header(self, verifier):
+        with pytest.raises(JWTVerificationError):
+            await verifier.verify_authorization_header(None)
+
+
+class TestVerifiedTokenCache:
+    """LRU bounds."""
+
+    def test_entries_expire_at_exp_and_evict_lru(self):
+        cache = VerifiedTokenCache(max_size=2)
+        cache.put("a", {"sub": "a"}, expires_at=100.0)
+        cache.put("b", {"sub": "b"}, expires_at=200.0)
+        assert cache.get("a", now=50.0) == {"sub": "a"}
+
+        cache.put("c", {"sub": "c"}, expires_at=300.0)
+        assert cache.get("b", now=50.0) is None
+        assert cache.get("a", now=150.0) is None
+        assert cache.get("c", now=150.0) == {"sub": "c"}
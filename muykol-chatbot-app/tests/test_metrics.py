@@ -0,0 +1,79 @@
+"""Tests for the Prometheus request metrics."""
+
+import json
+import threading
+
+from faith_motivator_chatbot.backend.metrics import MetricsRegistry, describe_counter, merge, retire_snapshot
+
+
+def record(registry, route="/api/chat", status=200, duration=0.02, count=1):
+    for _ in range(count):
+        registry.request_started(route)
+        registry.request_finished(route, "POST", status, duration, 120, 900)
+
+
+class TestMetricsRegistry:
+    """Recording, rendering and merging."""
+
+    def test_counts_from_many_threads_are_summed(self):
+        registry = MetricsRegistry()
+        threads = [threading.Thread(target=record, args=(registry,), kwargs={"count": 500}) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        snapshot = registry.snapshot()
+        assert snapshot["counters"]["/api/chat\tPOST\t200"] == 4000
+        assert snapshot["gauges"]["/api/chat"] == 0
+
+    def test_render_prometheus_text(self):
+        registry = MetricsRegistry()
+        record(registry, duration=0.003)
+        record(registry, duration=0.2, status=500)
+        registry.request_started("/health")
+
+        text = registry.render()
+        assert 'http_requests_total{route="/api/chat",method="POST",status="500"} 1' in text
+        assert 'http_requests_in_flight{route="/health"} 1' in text
+        assert 'http_request_duration_seconds_bucket{route="/api/chat",le="0.005"} 1' in text
+        assert 'http_request_duration_seconds_bucket{route="/api/chat",le="+Inf"} 2' in text
+        assert 'http_request_duration_seconds_count{route="/api/chat"} 2' in text
+        assert 'http_response_size_bytes_sum{route="/api/chat"} 1800.0' in text
+
+    def test_merge_combines_process_snapshots(self):
+        first, second = MetricsRegistry(), MetricsRegistry()
+        record(first, count=2)
+        record(second, count=3)
+
+        merged = merge([first.snapshot(), second.snapshot()])
+        assert merged["counters"]["/api/chat\tPOST\t200"] == 5
+        assert merged["histograms"]["http_request_duration_seconds\t/api/chat"][-1] == 5
+
+    def test_collect_includes_other_workers_and_retired_ones(self, tmp_path):
+        other = MetricsRegistry()
+        record(other, count=4)
+        other.request_started("/api/chat")
+        (tmp_path / "worker-1.json").write_text(json.dumps(other.snapshot()))
+
+        registry = MetricsRegistry()
+        registry.share_via(str(tmp_path), interval=60)
+        record(registry, count=1)
+        assert registry.collect()["counters"]["/api/chat\tPOST\t200"] == 5
+        assert registry.collect()["gauges"]["/api/chat"] == 1
+
+        retire_snapshot(str(tmp_path), 1)
+        collected = registry.collect()
+        assert not (tmp_path / "worker-1.json").exists()
+        assert collected["counters"]["/api/chat\tPOST\t200"] == 5
+        assert collected["gauges"]["/api/chat"] == 0
+
+    def test_application_counters_render_and_merge(self):
+        describe_counter("widget_events_total", "Widget events, by kind.")
+        first, second = MetricsRegistry(), MetricsRegistry()
+        first.increment("widget_events_total", 'kind="a"')
+        second.increment("widget_events_total", 'kind="a"', 2)
+
+        text = first.render(merge([first.snapshot(), second.snapshot()]))
+        assert "# HELP widget_events_total Widget events, by kind." in text
+        assert 'widget_events_total{kind="a"} 3' in text
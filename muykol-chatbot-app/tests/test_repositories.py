@@ -0,0 +1,164 @@
+"""Tests for the async DynamoDB repositories."""
+
+import asyncio
+import time
+
+import pytest
+from botocore.exceptions import ClientError
+
+from faith_motivator_chatbot.backend.chat_history import encode_cursor
+from faith_motivator_chatbot.backend.repositories import (
+    AsyncDynamoDB,
+    ChatMessage,
+    ConsentLog,
+    DynamoDBSettings,
+    PrayerRequest,
+    Repositories,
+    UserProfile,
+    deserialize,
+    serialize,
+)
+from faith_motivator_chatbot.backend.session_summary import SessionSummary
+
+
+class FakeClient:
+    """A low-level client that records calls and replays canned responses."""
+
+    def __init__(self, delay=0.0, responses=None):
+        self.delay = delay
+        self.responses = responses or {}
+        self.calls = []
+        self.closed = False
+
+    def __getattr__(self, operation):
+        def call(**kwargs):
+            self.calls.append((operation, kwargs))
+            time.sleep(self.delay)
+            response = self.responses.get(operation, {})
+            if callable(response):
+                return response(**kwargs)
+            if isinstance(response, list):
+                return response.pop(0)
+            return response
+
+        return call
+
+    def close(self):
+        self.closed = True
+
+
+def repositories(client, pool=4):
+    return Repositories(AsyncDynamoDB(DynamoDBSettings(max_pool_connections=pool), client=client))
+
+
+class TestItemMapping:
+    """Typed records and the wire format."""
+
+    def test_round_trip_restores_plain_numbers(self):
+        item = {"request_id": "p1", "user_id": "u1", "prayer_text": "Pray", "prayer_count": 3, "score": 0.5, "tags": ["a"]}
+        wire = serialize(item)
+        assert wire["prayer_count"] == {"N": "3"}
+        assert deserialize(wire) == item
+        assert type(deserialize(wire)["prayer_count"]) is int
+
+    def test_unknown_attributes_survive_and_none_is_dropped(self):
+        user = UserProfile.from_item({"user_id": "u1", "email": "a@example.com", "nickname": "A"})
+        assert user.email == "a@example.com"
+        item = user.to_item()
+        assert item["nickname"] == "A"
+        assert "first_name" not in item
+
+
+class TestRepositories:
+    """Reads, writes and batching through the pooled client."""
+
+    @pytest.mark.asyncio
+    async def test_calls_run_concurrently_off_the_loop(self):
+        client = FakeClient(delay=0.1, responses={"get_item": {"Item": serialize({"user_id": "u1"})}})
+        repos = repositories(client, pool=8)
+        started = time.perf_counter()
+        results = await asyncio.gather(*(repos.users.get(f"u{i}") for i in range(8)))
+        assert time.perf_counter() - started < 0.4
+        assert all(user.user_id == "u1" for user in results)
+        assert client.calls[0] == (
+            "get_item",
+            {"TableName": "FaithChatbot-UserProfiles", "Key": {"user_id": {"S": "u0"}}, "ConsistentRead": False},
+        )
+
+    @pytest.mark.asyncio
+    async def test_batch_put_chunks_and_retries_unprocessed(self):
+        table = "FaithChatbot-ChatMessages"
+        leftover = {"PutRequest": {"Item": serialize({"session_id": "s1", "message_id": "m0"})}}
+        client = FakeClient(responses={"batch_write_item": [{"UnprocessedItems": {table: [leftover]}}, {}, {}, {}]})
+        messages = [ChatMessage("s1", f"m{i}", f"t{i}", "user", "hi") for i in range(60)]
+        assert await repositories(client).messages.batch_put(messages) == 60
+        sizes = [len(kwargs["RequestItems"][table]) for _, kwargs in client.calls]
+        assert sorted(sizes) == [1, 10, 25, 25]
+
+    @pytest.mark.asyncio
+    async def test_history_page_uses_the_timestamp_index(self):
+        items = [
+            serialize({"session_id": "s1", "message_id": f"m{i}", "timestamp": f"t{i}", "role": "user", "content": str(i)})
+            for i in (2, 1)
+        ]
+        last_key = serialize({"session_id": "s1", "message_id": "m1", "timestamp": "t1"})
+        client = FakeClient(responses={"query": {"Items": items, "LastEvaluatedKey": last_key}})
+        page = await repositories(client).messages.history_page("s1", limit=2)
+        assert [message["id"] for message in page["messages"]] == ["m1", "m2"]
+        assert page["next_cursor"] == encode_cursor("s1", "m1", "t1")
+        assert page["messages"][0]["cursor"] == page["next_cursor"]
+        assert page["prev_cursor"] == page["messages"][-1]["cursor"]
+        query = client.calls[0][1]
+        assert query["IndexName"] == "TimestampIndex" and query["ScanIndexForward"] is False
+        with pytest.raises(ValueError):
+            await repositories(client).messages.history_page("s2", cursor=page["next_cursor"])
+
+    @pytest.mark.asyncio
+    async def test_history_after_reads_forward_from_a_server_cursor(self):
+        item = {"session_id": "s1", "message_id": "m3", "timestamp": "t3"}
+        item = serialize(dict(item, role="user", content="3"))
+        client = FakeClient(responses={"query": [{"Items": [item]}, {"Items": []}]})
+        messages = repositories(client).messages
+        cursor = encode_cursor("s1", "m2", "t2")
+
+        newer = await messages.history_after("s1", cursor)
+        assert [message["id"] for message in newer["messages"]] == ["m3"]
+        assert newer["prev_cursor"] == encode_cursor("s1", "m3", "t3")
+        query = client.calls[0][1]
+        assert query["ScanIndexForward"] is True
+        assert query["ExpressionAttributeValues"][":after"] == {"S": "t2"}
+        assert (await messages.history_after("s1", cursor))["prev_cursor"] == cursor
+        with pytest.raises(ValueError):
+            await messages.history_after("s2", cursor)
+
+    @pytest.mark.asyncio
+    async def test_save_summary_reports_a_lost_race(self):
+        def conflict(**kwargs):
+            raise ClientError({"Error": {"Code": "ConditionalCheckFailedException"}}, "UpdateItem")
+
+        sessions = repositories(FakeClient(responses={"update_item": conflict})).sessions
+        assert await sessions.save_summary(SessionSummary("s1", "summary", 14, 8), 0) is False
+        client = FakeClient()
+        assert await repositories(client).sessions.save_summary(SessionSummary("s1", "summary", 14, 8), 0) is True
+        assert client.calls[0][1]["ExpressionAttributeValues"][":previous"] == {"N": "0"}
+
+    @pytest.mark.asyncio
+    async def test_prayer_and_consent_writes(self):
+        client = FakeClient(responses={"update_item": {"Attributes": serialize({"prayer_count": 16})}})
+        repos = repositories(client)
+        assert await repos.prayer_requests.increment_prayer_count("p1") == 16
+        await repos.consent_logs.put(ConsentLog("l1", "u1", "t", "privacy_policy", "granted"))
+        operation, kwargs = client.calls[-1]
+        assert operation == "put_item"
+        assert kwargs["ConditionExpression"] == "attribute_not_exists(log_id)"
+        await repos.prayer_requests.put(PrayerRequest("p1", "u1", "Pray"))
+        assert "ConditionExpression" not in client.calls[-1][1]
+
+    @pytest.mark.asyncio
+    async def test_close_releases_the_client(self):
+        client = FakeClient()
+        database = AsyncDynamoDB(DynamoDBSettings(max_pool_connections=2), client=client)
+        await database.close()
+        assert client.closed
+        with pytest.raises(RuntimeError):
+            await database.call("get_item")
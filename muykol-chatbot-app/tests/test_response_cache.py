@@ -0,0 +1,125 @@
+"""Tests for the generated-reply cache."""
+
+import pytest
+
+from faith_motivator_chatbot.backend.metrics import METRICS
+from faith_motivator_chatbot.backend.response_cache import REQUESTS_METRIC, ResponseCache, cache_key
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class Generator:
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return f"reply {self.calls}"
+
+
+def events():
+    snapshot = METRICS.snapshot()["events"]
+    return {key.split("\t")[1]: count for key, count in snapshot.items() if key.startswith(REQUESTS_METRIC)}
+
+
+class TestCacheKey:
+    """Normalised intent keys."""
+
+    def test_wording_differences_share_a_key(self):
+        assert cache_key("anxiety", "peace_and_trust", "I'm anxious about work!") == cache_key(
+            "Anxiety", "peace_and_trust", "  im ANXIOUS about   work"
+        )
+
+    def test_emotion_theme_and_verses_are_part_of_the_key(self):
+        base = cache_key("anxiety", "peace_and_trust", "anxious about work", ["Philippians 4:6-7"])
+        assert base != cache_key("fear", "peace_and_trust", "anxious about work", ["Philippians 4:6-7"])
+        assert base != cache_key("anxiety", "gods_care", "anxious about work", ["Philippians 4:6-7"])
+        assert base != cache_key("anxiety", "peace_and_trust", "anxious about work", ["1 Peter 5:7"])
+        assert base != cache_key("anxiety", "peace_and_trust", "not anxious about work", ["Philippians 4:6-7"])
+
+
+class TestResponseCache:
+    """Tiers, eviction and opt-out."""
+
+    def test_hit_after_miss(self):
+        cache, generate = ResponseCache(), Generator()
+        before = events()
+        assert cache.get_or_generate("k", generate) == ("reply 1", False)
+        assert cache.get_or_generate("k", generate) == ("reply 1", True)
+        after = events()
+        assert after['result="miss"'] - before.get('result="miss"', 0) == 1
+        assert after['result="hit_local"'] - before.get('result="hit_local"', 0) == 1
+
+    def test_personalized_turns_bypass_the_cache(self):
+        cache, generate = ResponseCache(), Generator()
+        cache.get_or_generate("k", generate)
+        assert cache.get_or_generate("k", generate, personalized=True) == ("reply 2", False)
+        assert cache.get("k") == ("reply 1", "local")
+
+    def test_unstored_replies_are_not_cached(self):
+        cache, generate = ResponseCache(), Generator()
+        assert cache.get_or_generate("k", generate, store=False) == ("reply 1", False)
+        assert len(cache) == 0
+        cache.set("k", "stored")
+        assert cache.get_or_generate("k", generate, store=False) == ("stored", True)
+
+    def test_disabled_cache_always_generates(self):
+        cache, generate = ResponseCache(enabled=False), Generator()
+        cache.get_or_generate("k", generate)
+        cache.get_or_generate("k", generate)
+        assert generate.calls == 2
+        assert len(cache) == 0
+
+    def test_lru_eviction(self):
+        cache = ResponseCache(max_size=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+        assert cache.get("b") == (None, None)
+        assert cache.get("a") == (1, "local")
+
+    def test_entries_expire(self):
+        clock = FakeClock()
+        cache = ResponseCache(ttl=10, clock=clock)
+        cache.set("a", 1)
+        clock.now = 10
+        assert cache.get("a") == (None, None)
+        assert len(cache) == 0
+
+
+class TestRedisTier:
+    """The shared tier, backed by fakeredis."""
+
+    @pytest.fixture
+    def redis_client(self):
+        fakeredis = pytest.importorskip("fakeredis")
+        return fakeredis.FakeRedis()
+
+    def test_other_process_hits_redis(self, redis_client):
+        ResponseCache(redis_client=redis_client).set("k", {"text": "shared"})
+        other = ResponseCache(redis_client=redis_client)
+        assert other.get("k") == ({"text": "shared"}, "redis")
+        assert other.get("k") == ({"text": "shared"}, "local")
+
+    def test_redis_entries_get_the_ttl(self, redis_client):
+        ResponseCache(ttl=30, redis_client=redis_client).set("k", "v")
+        assert 0 < redis_client.ttl("faith:reply:k") <= 30
+
+    def test_redis_failures_count_as_misses(self):
+        class BrokenRedis:
+            def get(self, key):
+                raise ConnectionError("down")
+
+            def setex(self, key, ttl, value):
+                raise ConnectionError("down")
+
+        cache, generate = ResponseCache(redis_client=BrokenRedis()), Generator()
+        assert cache.get_or_generate("k", generate) == ("reply 1", False)
+        assert cache.get_or_generate("k", generate) == ("reply 1", True)
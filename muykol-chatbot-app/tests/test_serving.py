@@ -0,0 +1,243 @@
+"""Tests for the standalone app's concurrent serving modes."""
+
+import http.client
+import os
+import signal
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+
+from faith_motivator_chatbot.backend import serving
+from faith_motivator_chatbot.backend.serving import (
+    SERVER_HEALTH_WORKERS,
+    AsyncioHTTPServer,
+    KeepAliveRequestHandler,
+    PooledHTTPServer,
+    RequestBodyError,
+    is_health_request_line,
+)
+
+
+class SlowHandler(KeepAliveRequestHandler):
+    """Answers /health at once, /slow after a delay and /stream in chunks."""
+
+    def do_GET(self):
+        if self.path == "/slow":
+            time.sleep(0.5)
+        if self.path == "/stream":
+            self.start_chunked(200, "text/plain")
+            for part in (b"a", b"b", b"c"):
+                self.write_chunk(part)
+            self.end_chunked()
+            return
+        self.send_body(200, "text/plain", self.path.encode())
+
+    def do_POST(self):
+        try:
+            body = self.read_body()
+        except RequestBodyError as e:
+            self.send_body(e.status, "text/plain", str(e).encode())
+            return
+        self.send_body(200, "text/plain", bytes(body))
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start(server):
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return thread
+
+
+@pytest.fixture(params=["threaded", "asyncio"])
+def server_port(request):
+    if request.param == "threaded":
+        server = PooledHTTPServer(("127.0.0.1", 0), SlowHandler, workers=2)
+        port = server.server_address[1]
+    else:
+        import socket
+
+        sock = socket.socket()
+        sock.bind(("127.0.0.1", 0))
+        sock.listen()
+        port = sock.getsockname()[1]
+        server = AsyncioHTTPServer(("127.0.0.1", port), SlowHandler, workers=2, sock=sock)
+    thread = start(server)
+    time.sleep(0.1)
+    yield port
+    server.begin_drain()
+    thread.join(timeout=5)
+    server.drain(timeout=1)
+
+
+def get(port, path, connection=None):
+    connection = connection or http.client.HTTPConnection("127.0.0.1", port, timeout=5)
+    connection.request("GET", path)
+    response = connection.getresponse()
+    return response, response.read()
+
+
+class TestServing:
+    """Keep-alive, streaming and health-lane behaviour in both modes."""
+
+    def test_connection_is_reused_across_requests(self, server_port):
+        connection = http.client.HTTPConnection("127.0.0.1", server_port, timeout=5)
+        first, body = get(server_port, "/one", connection)
+        sock = connection.sock
+        second, _ = get(server_port, "/stream", connection)
+        third, _ = get(server_port, "/two", connection)
+
+        assert body == b"/one"
+        assert second.getheader("Transfer-Encoding") == "chunked"
+        assert third.status == 200
+        assert connection.sock is sock
+
+    def test_health_check_does_not_wait_for_busy_workers(self, server_port):
+        slow = [threading.Thread(target=get, args=(server_port, "/slow")) for _ in range(4)]
+        for thread in slow:
+            thread.start()
+        time.sleep(0.1)
+
+        started = time.monotonic()
+        response, _ = get(server_port, "/health")
+        elapsed = time.monotonic() - started
+        for thread in slow:
+            thread.join()
+
+        assert response.status == 200
+        assert elapsed < 0.3
+
+    def test_keep_alive_health_connections_do_not_hold_the_health_lane(self, server_port):
+        held = [http.client.HTTPConnection("127.0.0.1", server_port, timeout=5) for _ in range(SERVER_HEALTH_WORKERS)]
+        for connection in held:
+            get(server_port, "/health", connection)
+
+        started = time.monotonic()
+        response, _ = get(server_port, "/health")
+        elapsed = time.monotonic() - started
+        for connection in held:
+            connection.close()
+
+        assert response.status == 200
+        assert elapsed < 0.3
+
+
+class TestRequestBody:
+    """Request bodies are bounded in size and in time, in both modes."""
+
+    @pytest.fixture(autouse=True)
+    def limits(self, monkeypatch):
+        monkeypatch.setattr(serving, "SERVER_MAX_BODY_BYTES", 1024)
+        monkeypatch.setattr(serving, "SERVER_BODY_TIMEOUT", 0.5)
+
+    def post_raw(self, port, head, body=b"", drip=None):
+        sock = socket.create_connection(("127.0.0.1", port), timeout=5)
+        sock.sendall(head + body)
+        if drip:
+            for _ in range(drip):
+                time.sleep(0.2)
+                try:
+                    sock.sendall(b"x")
+                except OSError:
+                    break
+        status_line = sock.makefile("rb").readline()
+        sock.close()
+        return int(status_line.split()[1])
+
+    def test_body_within_limit_is_echoed(self, server_port):
+        connection = http.client.HTTPConnection("127.0.0.1", server_port, timeout=5)
+        connection.request("POST", "/echo", body=b"x" * 1000)
+        response = connection.getresponse()
+        assert response.read() == b"x" * 1000
+
+    def test_oversized_body_is_refused_before_reading(self, server_port):
+        head = b"POST /echo HTTP/1.1\r\nHost: t\r\nContent-Length: 1000000\r\n\r\n"
+        started = time.monotonic()
+        assert self.post_raw(server_port, head) == 413
+        assert time.monotonic() - started < 0.4
+
+    def test_slow_body_times_out(self, server_port):
+        head = b"POST /echo HTTP/1.1\r\nHost: t\r\nContent-Length: 100\r\n\r\n"
+        started = time.monotonic()
+        assert self.post_raw(server_port, head, drip=20) == 408
+        assert time.monotonic() - started < 2
+
+
+def test_health_request_line_detection():
+    assert is_health_request_line(b"GET /health HTTP/1.1")
+    assert is_health_request_line(b"GET /health?probe=1 HTTP/1.1")
+    assert not is_health_request_line(b"POST /health HTTP/1.1")
+    assert not is_health_request_line(b"GET /api/chat HTTP/1.1")
+
+
+PREFORK_SCRIPT = """
+import sys
+sys.path.insert(0, {tests!r})
+from faith_motivator_chatbot.backend.serving import PreforkSupervisor
+from test_serving import SlowHandler
+PreforkSupervisor(("127.0.0.1", {port}), SlowHandler, processes=2, workers=2).run({on_started})
+"""
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def child_pids(pid):
+    output = subprocess.run(["ps", "-o", "pid=", "--ppid", str(pid)], capture_output=True, text=True).stdout
+    return {int(line) for line in output.split()}
+
+
+def wait_for(predicate, timeout=10):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if predicate():
+                return True
+        except OSError:
+            pass
+        time.sleep(0.1)
+    return False
+
+
+@pytest.mark.skipif(not hasattr(os, "fork") or sys.platform == "darwin", reason="prefork needs Linux fork")
+class TestPrefork:
+    """Worker processes sharing one port under a supervisor."""
+
+    def test_crashed_worker_is_replaced(self):
+        port = free_port()
+        script = PREFORK_SCRIPT.format(tests=os.path.dirname(__file__), port=port, on_started="")
+        supervisor = subprocess.Popen([sys.executable, "-c", script], cwd=os.path.dirname(os.path.dirname(__file__)))
+        try:
+            assert wait_for(lambda: get(port, "/health")[0].status == 200)
+            workers = child_pids(supervisor.pid)
+            assert len(workers) == 2
+
+            os.kill(next(iter(workers)), signal.SIGKILL)
+            assert wait_for(lambda: len(child_pids(supervisor.pid) - workers) == 1)
+            assert get(port, "/after-restart")[1] == b"/after-restart"
+        finally:
+            supervisor.send_signal(signal.SIGTERM)
+            assert supervisor.wait(timeout=15) == 0
+
+    def test_on_started_runs_once_in_the_supervisor(self):
+        port = free_port()
+        on_started = "lambda: print('started', __import__('os').getpid(), flush=True)"
+        script = PREFORK_SCRIPT.format(tests=os.path.dirname(__file__), port=port, on_started=on_started)
+        supervisor = subprocess.Popen(
+            [sys.executable, "-c", script], cwd=os.path.dirname(os.path.dirname(__file__)),
+            stdout=subprocess.PIPE, text=True,
+        )
+        try:
+            assert wait_for(lambda: get(port, "/health")[0].status == 200)
+        finally:
+            supervisor.send_signal(signal.SIGTERM)
+            output, _ = supervisor.communicate(timeout=15)
+        assert output.split() == ["started", str(supervisor.pid)]
@@ -0,0 +1,114 @@
+"""Tests for rolling session summaries and prompt building."""
+
+from faith_motivator_chatbot.backend.generation import GenerationError, GenerationResult, estimate_tokens
+from faith_motivator_chatbot.backend.session_summary import (
+    EARLIER_PREFIX,
+    ExtractiveSummarizer,
+    ModelSummarizer,
+    RollingSummarizer,
+    SessionSummary,
+    build_summary_update,
+)
+
+
+def turn(number, emotion="anxiety"):
+    return [
+        {"role": "user", "content": f"Message {number}. I am worried about work again.", "emotion_classification": emotion},
+        {"role": "assistant", "content": "Cast your cares on Him. " * 10, "biblical_references": [f"Psalm {number}:1"]},
+    ]
+
+
+def history(turns):
+    return [message for number in range(turns) for message in turn(number)]
+
+
+def replay(messages, rolling):
+    """Fold turn by turn as the service would, returning the final state and uncovered messages."""
+    session = SessionSummary("s1")
+    for end in range(2, len(messages) + 1, 2):
+        session.message_count = end
+        if rolling.should_fold(session):
+            session = rolling.fold(session, messages[session.summarized_count:end])
+    return session, messages[session.summarized_count:]
+
+
+class TestRollingSummarizer:
+    """Fold timing, the recent window and prompt size."""
+
+    def test_folds_every_n_turns_beyond_the_window(self):
+        rolling = RollingSummarizer(every_turns=4, recent_turns=3)
+        assert not rolling.should_fold(SessionSummary("s1", message_count=13))
+        assert rolling.should_fold(SessionSummary("s1", message_count=14))
+
+        session = rolling.fold(SessionSummary("s1", message_count=14), history(7))
+        assert session.summarized_count == 8
+        assert session.summary.splitlines()[0] == "User (anxiety): Message 0."
+        assert "Shared Psalm 3:1" in session.summary
+        assert "Psalm 4:1" not in session.summary
+
+    def test_prompt_holds_summary_and_uncovered_turns(self):
+        rolling = RollingSummarizer(every_turns=2, recent_turns=1)
+        session, pending = replay(history(6), rolling)
+        verses = [{"reference": "John 14:27", "text": "Peace I leave with you"}]
+        prompt = rolling.build_prompt(session, pending, "Please pray for me", verses)
+        assert "Conversation so far (summary):\nUser (anxiety): Message 0." in prompt
+        assert "User: Message 5." in prompt and "User: Message 0." not in prompt
+        assert "John 14:27 - Peace I leave with you" in prompt
+        assert prompt.endswith("User: Please pray for me\nAssistant:")
+
+    def test_prompt_size_stays_flat(self):
+        rolling = RollingSummarizer(ExtractiveSummarizer(max_chars=600), every_turns=4, recent_turns=3)
+        sizes = []
+        for turns in (20, 100, 400):
+            session, pending = replay(history(turns), rolling)
+            sizes.append(estimate_tokens(rolling.build_prompt(session, pending, "hello")))
+        assert max(sizes) - min(sizes) < 60
+        full = estimate_tokens(rolling.build_prompt(SessionSummary("s1"), history(400), "hello"))
+        assert max(sizes) * 20 < full
+
+    def test_unfetched_old_messages_are_skipped_not_miscounted(self):
+        rolling = RollingSummarizer(every_turns=4, recent_turns=3)
+        # 300 messages uncovered but only the newest 200 could be fetched
+        session = rolling.fold(SessionSummary("s1", message_count=300), history(150)[-200:])
+        assert session.summarized_count == 294
+
+
+class TestExtractiveSummarizer:
+    """Bounded summaries."""
+
+    def test_oldest_lines_collapse_into_topics(self):
+        summarizer = ExtractiveSummarizer(max_chars=120)
+        summary = ""
+        for number, emotion in enumerate(["anxiety", "sadness", "hope", "joy"]):
+            summary = summarizer.fold(summary, turn(number, emotion))
+        assert len(summary) <= 120
+        first = summary.splitlines()[0]
+        assert first.startswith(EARLIER_PREFIX)
+        assert "anxiety" in first and "Psalm 0:1" in first
+        assert summary.splitlines()[-1] == "Shared Psalm 3:1"
+
+
+class TestModelSummarizer:
+    """Model-written summaries."""
+
+    def test_falls_back_to_extractive_on_error(self):
+        class Client:
+            def __init__(self, fail):
+                self.fail = fail
+
+            def generate(self, prompt, max_tokens):
+                if self.fail:
+                    raise GenerationError("down")
+                assert "New messages:\nUser: Message 0." in prompt
+                return GenerationResult(" The user is worried about work. ", 10, 8)
+
+        assert ModelSummarizer(Client(False)).fold("", turn(0)) == "The user is worried about work."
+        assert ModelSummarizer(Client(True)).fold("", turn(0)).startswith("User (anxiety): Message 0.")
+
+
+def test_summary_update_is_conditional_on_the_count_read():
+    update = build_summary_update(SessionSummary("s1", "summary", 14, 8), previous_summarized_count=0)
+    assert update["Key"] == {"session_id": "s1"}
+    assert update["ExpressionAttributeValues"][":count"] == 8
+    assert update["ExpressionAttributeValues"][":previous"] == 0
+    assert "summarized_count = :previous" in update["ConditionExpression"]
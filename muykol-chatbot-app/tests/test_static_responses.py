@@ -0,0 +1,49 @@
+"""Tests for precompiled static responses."""
+
+import gzip
+
+from faith_motivator_chatbot.backend.static_responses import (
+    PrecompiledResponse,
+    parse_accept_encoding,
+)
+
+BODY = b'{"status": "healthy", "features": ["' + b"Design System " * 50 + b'"]}'
+
+
+class TestPrecompiledResponse:
+    """Encoding negotiation and ETags."""
+
+    def test_gzip_variant_decodes_to_identity_body(self):
+        response = PrecompiledResponse(BODY, "application/json")
+        variant = response.select("gzip, deflate")
+        assert variant.encoding == "gzip"
+        assert gzip.decompress(variant.body) == BODY
+        assert variant.length == str(len(variant.body))
+
+    def test_identity_when_compression_not_accepted(self):
+        response = PrecompiledResponse(BODY, "application/json")
+        assert response.select(None).encoding == "identity"
+        assert response.select("gzip;q=0, identity").encoding == "identity"
+
+    def test_variants_have_distinct_strong_etags(self):
+        response = PrecompiledResponse(BODY, "application/json")
+        etags = {variant.etag for variant in response.variants.values()}
+        assert len(etags) == len(response.variants)
+        assert all(tag.startswith('"') for tag in etags)
+
+    def test_if_none_match(self):
+        response = PrecompiledResponse(BODY, "application/json")
+        etag = response.select("gzip").etag
+        assert response.matches(etag)
+        assert response.matches(f'"other", W/{etag}')
+        assert response.matches("*")
+        assert not response.matches('"stale"')
+        assert not response.matches(None)
+
+    def test_tiny_bodies_skip_compression(self):
+        response = PrecompiledResponse(b"ok", "text/plain")
+        assert set(response.variants) == {"identity"}
+
+
+def test_parse_accept_encoding():
+    assert parse_accept_encoding("gzip;q=0.5, br, *;q=0") == {"gzip": 0.5, "br": 1.0, "*": 0.0}
@@ -0,0 +1,58 @@
+"""Tests for server-sent event parsing."""
+
+import httpx
+import pytest
+
+from faith_motivator_chatbot.services.streaming import is_event_stream, iter_sse_events
+
+
+def sse_response(*chunks):
+    async def body():
+        for chunk in chunks:
+            yield chunk
+
+    headers = {"content-type": "text/event-stream"}
+    return httpx.Response(200, headers=headers, content=body())
+
+
+async def parse(*chunks):
+    return [
+        (event.event, event.data, event.id)
+        async for event in iter_sse_events(sse_response(*chunks))
+    ]
+
+
+class TestIterSSEEvents:
+    """Event framing across network chunks."""
+
+    @pytest.mark.asyncio
+    async def test_events_split_across_chunks(self):
+        events = await parse(
+            b"event: del", b'ta\ndata: {"text": "Hel', b'lo"}\n', b"\n",
+            b"event: delta\r\ndata: {}\r\n\r\n",
+        )
+        assert events == [("delta", '{"text": "Hello"}', None), ("delta", "{}", None)]
+
+    @pytest.mark.asyncio
+    async def test_multi_line_data_is_joined(self):
+        events = await parse(b"id: 7\ndata: first\ndata:second\n: ping\n\n")
+        assert events == [("message", "first\nsecond", "7")]
+
+    @pytest.mark.asyncio
+    async def test_last_event_without_final_newline_is_delivered(self):
+        events = await parse(b"event: start\ndata: {}\n\n", b"event: done\ndata: 1")
+        assert events == [("start", "{}", None), ("done", "1", None)]
+
+    @pytest.mark.asyncio
+    async def test_done_sentinel_and_error_events(self):
+        events = await parse(
+            b'event: error\ndata: {"detail": "busy"}\n\n', b"data: [DONE]\n\n"
+        )
+        assert events == [("error", '{"detail": "busy"}', None), ("done", "", None)]
+        response = sse_response(b"data: [DONE]\n\n")
+        done = [event async for event in iter_sse_events(response)]
+        assert done[0].json() == {}
+
+    def test_content_type_detection(self):
+        assert is_event_stream(sse_response())
+        assert not is_event_stream(httpx.Response(200, json={}))
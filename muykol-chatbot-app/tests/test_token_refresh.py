@@ -0,0 +1,86 @@
+"""Tests for single-flight token refresh."""
+
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+
+from faith_motivator_chatbot.services.token_refresh import (
+    TokenRefreshCoordinator,
+    refresh_delay,
+    refresh_key,
+)
+
+
+class TestRefreshDelay:
+    """Proactive refresh scheduling tests."""
+
+    def test_refreshes_before_expiry_with_skew_and_jitter(self):
+        now = datetime(2024, 1, 1, 12, 0, 0)
+        expires_at = now + timedelta(seconds=3600)
+        delay = refresh_delay(expires_at, now=now, skew=60, jitter=30)
+        assert 3600 - 60 - 30 <= delay <= 3600 - 60
+
+    def test_never_negative(self):
+        now = datetime(2024, 1, 1, 12, 0, 0)
+        assert refresh_delay(now - timedelta(seconds=5), now=now) == 0.0
+        assert refresh_delay(None) == 0.0
+
+
+class TestTokenRefreshCoordinator:
+    """Coalescing tests."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_refreshes_share_one_call(self):
+        calls = []
+
+        async def fake_refresh(refresh_token):
+            calls.append(refresh_token)
+            await asyncio.sleep(0.01)
+            return {"access_token": "new-token"}
+
+        coordinator = TokenRefreshCoordinator(refresh_fn=fake_refresh)
+        results = await asyncio.gather(
+            *(coordinator.refresh("user_001", "refresh-token") for _ in range(10))
+        )
+
+        assert calls == ["refresh-token"]
+        assert all(result == {"access_token": "new-token"} for result in results)
+        assert not coordinator.is_refreshing("user_001")
+
+    @pytest.mark.asyncio
+    async def test_users_refresh_independently_and_sequential_calls_rerun(self):
+        calls = []
+
+        async def fake_refresh(refresh_token):
+            calls.append(refresh_token)
+            return {"access_token": refresh_token}
+
+        coordinator = TokenRefreshCoordinator(refresh_fn=fake_refresh)
+        await asyncio.gather(
+            coordinator.refresh("user_001", "a"),
+            coordinator.refresh("user_002", "b"),
+        )
+        await coordinator.refresh("user_001", "a")
+
+        assert sorted(calls) == ["a", "a", "b"]
+
+    @pytest.mark.asyncio
+    async def test_sessions_of_one_user_never_share_a_refresh(self):
+        calls = []
+
+        async def fake_refresh(refresh_token):
+            calls.append(refresh_token)
+            await asyncio.sleep(0.01)
+            return {"access_token": f"access-{refresh_token}"}
+
+        coordinator = TokenRefreshCoordinator(refresh_fn=fake_refresh)
+        device_a, device_b, tab_a = await asyncio.gather(
+            coordinator.refresh(refresh_key("refresh-a"), "refresh-a"),
+            coordinator.refresh(refresh_key("refresh-b"), "refresh-b"),
+            coordinator.refresh(refresh_key("refresh-a"), "refresh-a"),
+        )
+
+        assert sorted(calls) == ["refresh-a", "refresh-b"]
+        assert device_a == tab_a == {"access_token": "access-refresh-a"}
+        assert device_b == {"access_token": "access-refresh-b"}
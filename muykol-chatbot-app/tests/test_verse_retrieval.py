@@ -0,0 +1,51 @@
+"""Tests for local verse retrieval."""
+
+import numpy as np
+
+from faith_motivator_chatbot.backend.verse_retrieval import VerseIndex, stem
+
+VERSES = [
+    {"reference": "1 Peter 5:7", "text": "Cast all your anxiety on him because he cares for you.", "theme": "gods_care"},
+    {"reference": "Psalm 34:18", "text": "The LORD is close to the brokenhearted and saves those who are crushed in spirit.", "theme": "gods_presence"},
+    {"reference": "Psalm 68:6", "text": "God sets the lonely in families,", "theme": "belonging"},
+    {"reference": "Psalm 107:1", "text": "Give thanks to the LORD, for he is good; his love endures forever.", "theme": "thanksgiving"},
+]
+EMOTIONS = [["anxiety"], ["sadness"], ["loneliness"], ["gratitude", "joy"]]
+
+
+def build():
+    return VerseIndex(VERSES, EMOTIONS, dim=128)
+
+
+class TestVerseIndex:
+    """Ranking, emotion filtering and the embedding matrix."""
+
+    def test_matrix_rows_are_normalised(self):
+        index = build()
+        assert index.matrix.shape == (4, 128)
+        assert np.allclose(np.linalg.norm(index.matrix, axis=1), 1.0, atol=1e-5)
+
+    def test_related_words_match_through_emotion_concepts(self):
+        results = build().search("I'm so stressed and worried about my job interview", k=2, min_score=-1)
+        assert [r["reference"] for r in results][0] == "1 Peter 5:7"
+        assert results[0]["score"] > 0.3 > results[1]["score"]
+
+    def test_emotion_filter_restricts_candidates(self):
+        results = build().search("thank you God", k=3, emotion="joy")
+        assert [r["reference"] for r in results] == ["Psalm 107:1"]
+        assert build().search("thank you God", k=3, emotion="fear") == []
+
+    def test_unknown_words_do_not_match(self):
+        assert build().search("hello there", k=3, min_score=0.0) == []
+
+    def test_k_larger_than_corpus(self):
+        results = build().search("lonely and sad, nobody cares", k=10)
+        assert 1 <= len(results) <= 4
+        assert results[0]["reference"] in {"Psalm 68:6", "Psalm 34:18"}
+
+
+def test_stem_merges_word_forms():
+    assert stem("worrying") == stem("worries") == stem("worried") == stem("worry")
+    assert stem("cares") == stem("care")
+    assert stem("families") == "family"
+    assert stem("is") == "is"